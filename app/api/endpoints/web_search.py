@@ -1,15 +1,67 @@
-from fastapi import APIRouter
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Awaitable, List, Literal, Optional, TypeVar
+from app.config.config import settings
+from app.exception.exce import AdmissionError
 from app.service.web_search import web_search
+from app.utils.admission import admission
 from app.api.resp import RESPModel, resp, RespStatus
-from app.schemas.search_schema import SearchData
+from app.schemas.search_schema import (
+    BatchSearchData,
+    BatchSearchRequest,
+    Engine,
+    SearchData,
+)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+# 总耗时预算(秒), 超出时返回已完成的部分结果, 不传时使用 settings.REQUEST_BUDGET
+Budget = Query(None, gt=0)
+
+
+def _client_id(request: Request) -> str:
+    # 排队时按客户端公平调度, 优先使用请求头中的客户端标识
+    client = request.headers.get(settings.ADMISSION_CLIENT_HEADER)
+    if client:
+        return client
+    return request.client.host if request.client else ""
+
+
+async def _cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    # 客户端断开连接时取消检索, 正在进行的浏览器任务随之取消
+    task: "asyncio.Future[T]" = asyncio.ensure_future(awaitable)
+
+    async def watch() -> None:
+        while not task.done():
+            message: Any = await request.receive()
+            if message["type"] == "http.disconnect":
+                task.cancel()
+                return
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        return await task
+    finally:
+        watcher.cancel()
+
 
 @router.get("/web_delta_search", response_model=RESPModel[List[SearchData]])
-def api_web_search(query: str, num: int = 5):
-    data = web_search.delta_search(query, num)
+async def api_web_search(
+    request: Request,
+    query: str,
+    num: int = 5,
+    no_cache: bool = False,
+    engines: Optional[List[Engine]] = Query(None),
+    budget: Optional[float] = Budget,
+):
+    data = await _cancel_on_disconnect(
+        request,
+        web_search.adelta_search(query, num, no_cache, engines, budget, _client_id(request)),
+    )
 
     if data:
         return resp(status_code=RespStatus.success, msg="success", data=data)
@@ -18,18 +70,101 @@ def api_web_search(query: str, num: int = 5):
 
 
 @router.get("/web_full_search", response_model=RESPModel[List[SearchData]])
-def api_full_search(query: str, num: int = 5):
-    data = web_search.full_search(query, num)
+async def api_full_search(
+    request: Request,
+    query: str,
+    num: int = 5,
+    no_cache: bool = False,
+    engines: Optional[List[Engine]] = Query(None),
+    budget: Optional[float] = Budget,
+    mode: Literal["page", "passage"] = "page",
+    top_k: Optional[int] = Query(None, gt=0),
+):
+    data = await _cancel_on_disconnect(
+        request,
+        web_search.afull_search(
+            query, num, no_cache, engines, budget, _client_id(request), mode, top_k
+        ),
+    )
     if data:
         return resp(status_code=RespStatus.success, msg="success", data=data)
     else:
         return resp(status_code=RespStatus.error, msg="error", data=data)
 
 
+def _encode_event(event: dict, format: str) -> str:
+    data = event["data"]
+    if hasattr(data, "model_dump"):
+        data = data.model_dump()
+    payload = json.dumps(data, ensure_ascii=False)
+    if format == "sse":
+        return f"event: {event['event']}\ndata: {payload}\n\n"
+    return json.dumps({"event": event["event"], "data": data}, ensure_ascii=False) + "\n"
+
+
+@router.get("/web_full_search_stream")
+async def api_full_search_stream(
+    request: Request,
+    query: str,
+    num: int = 5,
+    no_cache: bool = False,
+    format: Literal["ndjson", "sse"] = "ndjson",
+    engines: Optional[List[Engine]] = Query(None),
+    budget: Optional[float] = Budget,
+):
+    """每个网页解析完成后立即以 NDJSON 行或 SSE 事件返回, 最后返回 summary 事件"""
+    client = _client_id(request)
+    # 响应开始后无法再返回 429, 排队已满时在这里提前拒绝
+    admission.check(client)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in web_search.astream_full_search(
+                query, num, no_cache, engines, budget, client
+            ):
+                yield _encode_event(event, format)
+        except AdmissionError as e:
+            # 排队超过了请求预算
+            error = {"message": e.value, "retry_after": e.retry_after}
+            yield _encode_event({"event": "error", "data": error}, format)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+
 @router.get("/web_url_search", response_model=RESPModel[List[SearchData]])
-def api_url_search(query: str):
-    data = web_search.url_search(query)
+async def api_url_search(
+    request: Request,
+    query: str,
+    links: bool = False,
+    images: bool = False,
+    budget: Optional[float] = Budget,
+):
+    data = await _cancel_on_disconnect(
+        request, web_search.aurl_search(query, links, images, budget, _client_id(request))
+    )
     if data:
         return resp(status_code=RespStatus.success, msg="success", data=data)
     else:
         return resp(status_code=RespStatus.error, msg="error", data=data)
+
+
+@router.post("/web_batch_search", response_model=RESPModel[BatchSearchData])
+async def api_batch_search(request: Request, body: BatchSearchRequest):
+    """多个查询和链接一次提交, 相同的网页只抓取解析一次, 结果按查询分组返回"""
+    data = await _cancel_on_disconnect(
+        request,
+        web_search.abatch_search(
+            body.queries,
+            body.urls,
+            body.num,
+            body.no_cache,
+            body.engines,  # type:ignore
+            body.budget,
+            _client_id(request),
+        ),
+    )
+    if data.pages or not (body.queries or body.urls):
+        return resp(status_code=RespStatus.success, msg="success", data=data)
+    else:
+        return resp(status_code=RespStatus.error, msg="error", data=data)
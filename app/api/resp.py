@@ -9,6 +9,7 @@ class RespStatus(Enum):
     successTip = 201
     warning = 400
     noAuth = 403
+    tooManyRequests = 429
     error = 500
 
 
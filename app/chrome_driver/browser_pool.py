@@ -0,0 +1,338 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Iterator, List, Optional, TypeVar
+from loguru import logger
+from app.chrome_driver.interception import RoutePolicy, route_policy
+from app.config.config import settings
+from app.utils.metrics import BROWSERS, PAGES_IN_USE, STAGE_SECONDS
+from app.utils.proxy_pool import ProxyPool, is_proxy_error, proxy_pool
+
+T = TypeVar("T")
+
+
+class PooledBrowser:
+    """A launched Chromium instance plus the bookkeeping the pool needs."""
+
+    def __init__(self, browser: Any):
+        self.browser = browser
+        self.uses = 0
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.retiring = False
+
+
+class BrowserPool:
+    """
+    Long-lived pool of Chromium browsers shared by every request.
+
+    Browsers are launched once (normally from the FastAPI lifespan) and each
+    caller leases an isolated context/page via :meth:`page`. A browser is
+    recycled after ``max_uses`` leases and closed after ``idle_timeout``
+    seconds without leases; empty slots are relaunched on demand.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_contexts: Optional[int] = None,
+        max_uses: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        headless: Optional[bool] = None,
+        policy: Optional[RoutePolicy] = None,
+        proxies: Optional[ProxyPool] = None,
+        **launch_kwargs: Any,
+    ):
+        self.size = size or settings.BROWSER_POOL_SIZE
+        self.max_contexts = max_contexts or settings.BROWSER_MAX_CONTEXTS
+        self.max_uses = max_uses or settings.BROWSER_MAX_USES
+        self.idle_timeout = (
+            settings.BROWSER_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        )
+        self.headless = settings.BROWSER_HEADLESS if headless is None else headless
+        self.launch_kwargs = launch_kwargs
+        # 每个 context 安装的请求拦截策略
+        self.route_policy = policy or route_policy
+        # 每个 context 从代理池轮换出口代理
+        self.proxy_pool = proxies or proxy_pool
+
+        self._playwright: Any = None
+        self._slots: List[Optional[PooledBrowser]] = []
+        self._slot_locks: List[asyncio.Lock] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._starting: Optional[asyncio.Future] = None
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        """
+        Start Playwright and launch every browser in the pool.
+
+        Concurrent callers wait for the same start, so requests that arrive
+        while the pool is still launching are served as soon as a browser is up.
+        """
+        if self.started:
+            return
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        starting = self._starting
+        try:
+            await asyncio.shield(starting)
+        finally:
+            if starting.done() and self._starting is starting:
+                self._starting = None
+
+    async def _start(self) -> None:
+        try:
+            from playwright.async_api import async_playwright  # type:ignore
+        except ImportError as e:
+            raise ImportError(
+                "playwright is required for the browser pool. "
+                "Please install it with `pip install playwright`."
+            ) from e
+
+        self._loop = asyncio.get_running_loop()
+        self._slots = [None] * self.size
+        self._slot_locks = [asyncio.Lock() for _ in range(self.size)]
+        self._semaphore = asyncio.Semaphore(self.size * self.max_contexts)
+        self._playwright = await async_playwright().start()
+        await asyncio.gather(*(self._ensure(i) for i in range(self.size)))
+        if self.idle_timeout > 0:
+            self._reaper = asyncio.create_task(self._reap_idle())
+        logger.info(f"Browser pool started with {self.size} browsers")
+
+    async def warm_up(self) -> None:
+        """
+        Start the pool and lease one page per browser, so the renderer
+        processes and stealth scripts are warm before the first request.
+        """
+        await self.start()
+
+        async def touch() -> None:
+            async with self.page() as page:
+                await page.goto("about:blank")
+
+        await asyncio.gather(*(touch() for _ in range(self.size)))
+
+    async def close(self) -> None:
+        """Close every browser and stop Playwright."""
+        if not self.started:
+            return
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for i, slot in enumerate(self._slots):
+            if slot is not None:
+                await self._close_browser(slot)
+                self._slots[i] = None
+        await self._playwright.stop()
+        self._playwright = None
+        self._loop = None
+        logger.info("Browser pool closed")
+
+    @property
+    def browsers(self) -> int:
+        """Number of launched browsers."""
+        return sum(slot is not None for slot in self._slots)
+
+    @property
+    def leases(self) -> int:
+        """Number of contexts currently leased."""
+        return sum(slot.leases for slot in self._slots if slot is not None)
+
+    async def _launch(self) -> PooledBrowser:
+        with STAGE_SECONDS.time(stage="browser_launch"):
+            browser = await self._playwright.chromium.launch(
+                headless=self.headless, **self.launch_kwargs
+            )
+        return PooledBrowser(browser)
+
+    async def _ensure(self, index: int) -> PooledBrowser:
+        # 同一个槽位只允许一个协程去启动浏览器
+        async with self._slot_locks[index]:
+            slot = self._slots[index]
+            if slot is None or not slot.browser.is_connected():
+                slot = await self._launch()
+                self._slots[index] = slot
+            return slot
+
+    async def _close_browser(self, slot: PooledBrowser) -> None:
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.warning(f"close browser error:{e}")
+
+    async def _acquire(self) -> PooledBrowser:
+        # 优先选择当前租用数最少、且未进入回收状态的浏览器
+        candidates = [
+            (slot.leases if slot else 0, i)
+            for i, slot in enumerate(self._slots)
+            if slot is None or not slot.retiring
+        ]
+        if not candidates:
+            # 所有浏览器都在回收中, 新开一个槽位的浏览器
+            candidates = [(0, i) for i, slot in enumerate(self._slots)]
+        _, index = min(candidates)
+        slot = self._slots[index]
+        if slot is None or slot.retiring or not slot.browser.is_connected():
+            if slot is not None and slot.retiring:
+                # 旧实例在归还最后一个租约时关闭
+                self._slots[index] = None
+            slot = await self._ensure(index)
+        slot.uses += 1
+        slot.leases += 1
+        slot.last_used = time.monotonic()
+        if slot.uses >= self.max_uses:
+            slot.retiring = True
+        return slot
+
+    async def _release(self, slot: PooledBrowser) -> None:
+        slot.leases -= 1
+        slot.last_used = time.monotonic()
+        if slot.retiring and slot.leases == 0:
+            if slot in self._slots:
+                self._slots[self._slots.index(slot)] = None
+            await self._close_browser(slot)
+            logger.info(f"Browser recycled after {slot.uses} uses")
+
+    async def _reap_idle(self) -> None:
+        interval = max(self.idle_timeout / 2, 1)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for i, slot in enumerate(self._slots):
+                if (
+                    slot is not None
+                    and slot.leases == 0
+                    and now - slot.last_used > self.idle_timeout
+                ):
+                    self._slots[i] = None
+                    await self._close_browser(slot)
+                    logger.info("Idle browser evicted")
+
+    @asynccontextmanager
+    async def page(self, **context_kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Lease an isolated browser context and page from the pool.
+
+        Unless ``proxy`` is given, the context gets a proxy from the proxy
+        pool (if it is enabled and has a healthy one); an error raised in the
+        block counts as a failure of that proxy.
+
+        Args:
+            **context_kwargs: Extra options passed to ``browser.new_context``.
+        Yields:
+            Page: A fresh Playwright page with stealth and the route policy
+            applied. Its context is closed when the block exits.
+        """
+        from undetected_playwright import Malenia  # type:ignore
+
+        if not self.started and self._starting is not None:
+            # 预热阶段到达的请求等待浏览器启动
+            await self.start()
+        if not self.started:
+            raise RuntimeError("Browser pool is not started")
+        assert self._semaphore is not None
+        if "proxy" not in context_kwargs:
+            proxy = self.proxy_pool.pick()
+            if proxy is not None:
+                context_kwargs["proxy"] = proxy
+
+        async with self._semaphore:
+            slot = await self._acquire()
+            context = None
+            try:
+                with STAGE_SECONDS.time(stage="new_context"):
+                    context = await slot.browser.new_context(**context_kwargs)
+                with STAGE_SECONDS.time(stage="stealth"):
+                    await Malenia.apply_stealth(context)
+                await self.route_policy.install(context)
+                with STAGE_SECONDS.time(stage="new_page"):
+                    page = await context.new_page()
+                yield page
+            except Exception as e:
+                # 只有代理或网络层面的错误才记为代理失败
+                if context_kwargs.get("proxy") and is_proxy_error(e):
+                    self.proxy_pool.report(context_kwargs["proxy"]["server"], ok=False)
+                raise
+            else:
+                if context_kwargs.get("proxy"):
+                    self.proxy_pool.report(context_kwargs["proxy"]["server"], ok=True)
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"close context error:{e}")
+                await self._release(slot)
+
+    async def _standalone(self, coro: Coroutine[Any, Any, T]) -> T:
+        await self.start()
+        try:
+            return await coro
+        finally:
+            await self.close()
+
+    def run_sync(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a scraping coroutine from synchronous code.
+
+        When the pool is running on another thread's event loop (the uvicorn
+        loop), the coroutine is submitted there so it can share the browsers.
+        Otherwise a temporary pool is started for the duration of the call.
+        """
+        if self._loop is not None and self._loop.is_running():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is self._loop:
+                coro.close()
+                raise RuntimeError("run_sync cannot be called on the pool's loop")
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        return asyncio.run(self._standalone(coro))
+
+    def iter_sync(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Iterate an async generator from synchronous code.
+
+        Items are pulled one at a time from the pool's loop, so the caller can
+        handle each of them as soon as it is produced. Without a running pool
+        the generator is drained in a temporary pool first.
+        """
+        if not (self._loop is not None and self._loop.is_running()):
+
+            async def drain() -> List[T]:
+                return [item async for item in agen]
+
+            yield from self.run_sync(drain())
+            return
+
+        done = object()
+
+        async def next_item() -> Any:
+            try:
+                return await agen.__anext__()
+            except StopAsyncIteration:
+                return done
+
+        async def close() -> None:
+            await agen.aclose()  # type:ignore
+
+        try:
+            while True:
+                item = self.run_sync(next_item())
+                if item is done:
+                    break
+                yield item
+        finally:
+            self.run_sync(close())
+
+
+browser_pool = BrowserPool()
+BROWSERS.set_function(lambda: browser_pool.browsers)
+PAGES_IN_USE.set_function(lambda: browser_pool.leases)
@@ -1,49 +1,100 @@
 import asyncio
-import html2text
-import random
-from typing import Any, Iterator, List, Optional, AsyncIterator
-from langchain_community.document_loaders.base import BaseLoader
+import functools
+import math
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional, Tuple
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
 from loguru import logger
-from lxml import etree
-from readability.readability import Document as rDocument  # type:ignore
+from app.chrome_driver.browser_pool import browser_pool
+from app.chrome_driver.engines import get_engine, parse_serp
+from app.chrome_driver.fetcher import (
+    TIER_BROWSER,
+    TIER_CACHE,
+    TIER_HTTP,
+    http_fetcher,
+    needs_browser,
+)
+from app.chrome_driver.readiness import wait_ready
+from app.chrome_driver.worker_client import browser_worker
 from app.config.config import settings
-from app.utils.cleanup_html import cleanup_html
-from app.utils.utils import dynamic_import
-
-filter_str = [
-    "播报",
-    "暂停",
-    " 快捷键说明",
-    " 空格",
-    ": 播放 / 暂停",
-    "Esc",
-    ": 退出全屏",
-    " ↑",
-    ": 音量提高10%",
-    " ↓",
-    ": 音量降低10%",
-    " →",
-    ": 单次快进5秒",
-    " ←",
-    ": 单次快退5秒",
-    "按住此处可拖拽",
-    " 不再出现",
-    " 可在播放器设置中重新打开小窗播放",
-    "\ue610",
-    "\ue66a",
-    "\ue734",
-    "\n" "详情",
-    "人物经历",
-    "个人履历",
-    "职务任免",
-    "成长历程",
-    "成功经历",
-    "出诊时间",
-    "百度百科",
-]
-
-converter = html2text.HTML2Text()
+from app.exception.exce import AdmissionError, BrowserWorkerError
+from app.utils import deadline
+from app.utils.extract import ExtractedContent, extract_content
+from app.utils.limiter import fetch_limiter
+from app.utils.metrics import FETCHES, PARSE_FAILURES, STAGE_SECONDS, TIMEOUTS
+from app.utils.page_cache import CachedPage, content_hash, page_cache
+from app.utils.parse_pool import parse_pool
+
+
+@functools.lru_cache(maxsize=None)
+def _converter() -> Any:
+    import html2text
+
+    return html2text.HTML2Text()
+
+
+def legacy_extract(
+    html_content: str, url: str, links: bool = False, images: bool = False
+) -> ExtractedContent:
+    """cleanup_html -> readability -> html2text, each step re-parsing the page."""
+    # 旧版抽取依赖 bs4、readability 和 html2text, 只在使用时导入
+    from readability.readability import Document as rDocument  # type:ignore
+    from app.utils.cleanup_html import CleanupOutput, cleanup_html
+
+    outputs = CleanupOutput.TITLE | CleanupOutput.BODY
+    if links:
+        outputs |= CleanupOutput.LINKS
+    if images:
+        outputs |= CleanupOutput.IMAGES
+    with STAGE_SECONDS.time(stage="cleanup_html"):
+        title, minimized_body, link_urls, image_urls = cleanup_html(
+            html_content, url, outputs
+        )
+    with STAGE_SECONDS.time(stage="readability"):
+        rdoc = rDocument(str(minimized_body))
+        article = rdoc.summary()
+    with STAGE_SECONDS.time(stage="html2text"):
+        markdown = _converter().handle(article)
+    return ExtractedContent(title, markdown, link_urls, image_urls)
+
+
+def legacy_html_to_markdown(html_content: str, url: str) -> str:
+    return legacy_extract(html_content, url).markdown
+
+
+def extract_page(
+    html_content: str, url: str, links: bool = False, images: bool = False
+) -> ExtractedContent:
+    """
+    Extract the main content of a page as markdown, plus optional link and
+    image URLs taken from the same parse.
+
+    Uses the single-pass lxml extractor unless ``settings.EXTRACT_ENGINE`` is
+    ``legacy``.
+
+    Raises:
+        ValueError: If the page has no body.
+    """
+    if settings.EXTRACT_ENGINE == "legacy":
+        return legacy_extract(html_content, url, links, images)
+    with STAGE_SECONDS.time(stage="extract"):
+        return extract_content(html_content, url, links=links, images=images)
+
+
+def html_to_markdown(html_content: str, url: str) -> str:
+    """Extract the main content of a page as markdown, see :func:`extract_page`."""
+    return extract_page(html_content, url).markdown
+
+
+def parse_keyword_html(html_content: str) -> List[Tuple[str, dict]]:
+    """
+    Parse a Baidu SERP into (content, metadata) pairs.
+
+    Plain tuples rather than Documents are returned so the result stays
+    compact when it is sent back from a parse worker process.
+    """
+    return parse_serp(html_content, "baidu")
+
 
 class ChromiumLoader(BaseLoader):
     def __init__(
@@ -52,21 +103,25 @@ class ChromiumLoader(BaseLoader):
         keywords: Optional[List[str]]= None,
         *,
         backend: str = "playwright",
-        headless: bool = True,
-        **kwargs: Any,
+        use_page_cache: bool = True,
+        engine: str = "baidu",
+        num: Optional[int] = None,
     ):
-        message = (
-            f"{backend} is required for ChromiumLoader. "
-            f"Please install it with `pip install {backend}`."
-        )
-
-        dynamic_import(backend, message)
-
+        # 浏览器的启动参数 (headless 等) 由全局的 browser_pool 统一配置, 见 settings.BROWSER_*
         self.backend = backend
-        self.browser_config = kwargs
-        self.headless = headless
         self.urls = urls
         self.keywords = keywords
+        # 为 False 时不读取解析结果缓存, 总是返回原始 html
+        self.use_page_cache = use_page_cache
+        # 关键词搜索使用的搜索引擎, 见 app.chrome_driver.engines.ENGINES
+        self.engine = engine
+        # 关键词搜索需要的结果数, 第一页不足时才继续抓取后续页
+        self.num = num
+        # 关键词搜索的结果已经到底: 最后一页没有下一页, 或已达到 SERP_MAX_PAGES
+        # 有结果页抓取失败或预算用完时为 False, 更深的搜索可能拿到更多结果
+        self.serp_exhausted = False
+        # 关键词搜索中有结果页抓取失败
+        self.serp_failed = False
 
     async def ascrape_url_playwright(self, url: str) -> str:
         """
@@ -75,227 +130,301 @@ class ChromiumLoader(BaseLoader):
         Args:
             url (str): The URL to scrape.
         Returns:
-            str: The scraped HTML content or an error message if an exception occurs.
+            str: The scraped HTML content.
+        Raises:
+            Exception: The page could not be loaded, e.g. a navigation
+                timeout, or the browser worker failed.
 
         """
-        from playwright.async_api import async_playwright  # type:ignore
-        from undetected_playwright import Malenia  # type:ignore
-
         logger.info("Starting scraping...")
-        results = ""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=self.headless, **self.browser_config
-            )
+        if browser_worker.enabled:
+            # 浏览器在独立的 worker 进程中
+            return await browser_worker.scrape_url(url)
+
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError  # type:ignore
+
+        async with browser_pool.page() as page:
             try:
-                context = await browser.new_context()
-                await Malenia.apply_stealth(context)
-                page = await context.new_page()
-                await page.goto(url)
-                # 等待页面完成
-                await page.wait_for_load_state(
-                    "domcontentloaded", timeout=30000
-                )
-                results = await page.content()  # Simply get the HTML content
-                logger.info("Content scraped")
+                with STAGE_SECONDS.time(stage="goto"):
+                    await page.goto(
+                        url,
+                        wait_until="domcontentloaded",
+                        timeout=deadline.timeout_ms(
+                            settings.SCRAPE_TIMEOUT, settings.BUDGET_RESERVE
+                        ),
+                    )
             except Exception as e:
-                results = f"Error: {e}"
-            await browser.close()
+                if isinstance(e, PlaywrightTimeoutError):
+                    TIMEOUTS.inc(stage="goto")
+                # 预算用完时返回已经加载的部分内容
+                if not deadline.expired(settings.BUDGET_RESERVE):
+                    raise
+                logger.warning(f"budget exhausted while loading {url}: {e}")
+            else:
+                # 正文出现、DOM 稳定或预算即将用完时立即截取
+                signal = await wait_ready(page, settings.READY_SELECTOR)
+                logger.debug(f"{url} ready by {signal}")
+            with STAGE_SECONDS.time(stage="content"):
+                results = await page.content()  # Simply get the HTML content
+            logger.info("Content scraped")
         return results
 
-    async def ascrape_keyword_playwright(self, keyword: str) -> List[str]:
+    async def afetch_url(self, url: str) -> Document:
         """
-        Asynchronously scrape the content of a given URL using Playwright's async API.
+        Fetch a URL through the page cache and the tiered fetcher.
+
+        A fresh entry in ``page_cache`` is returned as is. Otherwise a pooled
+        plain HTTP GET is tried first (conditional when a stale entry has
+        validators); the page is rendered with the browser backend only when
+        ``needs_browser`` says the HTTP body is not usable (empty body, JS-only
+        shell or a known SPA domain). A re-fetched page whose HTML hash matches
+        the stale entry is served from the cache without re-parsing.
 
         Args:
-            keyword (str): use keyword to search data by baidu or bing.
+            url (str): The URL to fetch.
         Returns:
-            str: The scraped HTML content or an error message if an exception occurs.
-
+            Document: Raw HTML, or already parsed content when ``tier`` is
+            ``cache``. The metadata records the serving tier and validators.
+            When the browser tier fails the content is empty and
+            ``metadata["error"]`` holds the reason.
+        Raises:
+            AdmissionError: The browser worker is overloaded.
         """
-        from playwright.async_api import async_playwright
-        from undetected_playwright import Malenia
-
-        logger.info("Starting scraping Page 1")
-        results = []
-        result = ""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=self.headless, **self.browser_config
-            )
-            try:
-                context = await browser.new_context()
-                await Malenia.apply_stealth(context)
-                page = await context.new_page()
-                # 访问 baidu
-                await page.goto(settings.BAIDU_URL)
-                # 如果下面的代码无法输入，则使用 page.locator('input[name=\"wd\"]').type(keyword) 模拟键盘输入
-                await page.locator('input[name="wd"]').fill(keyword)
-                await page.locator("#su").click()  # 点击搜索
-                await page.wait_for_load_state(
-                    "domcontentloaded"
-                )  # 等待页面搜索完成
-                await page.wait_for_selector(
-                    "#content_left", state="attached", timeout=random.randint(6000, 10000)
+        cached = await page_cache.aget(url) if self.use_page_cache else None
+        if cached is not None and cached.fresh:
+            FETCHES.inc(tier=TIER_CACHE)
+            return self._cached_document(cached)
+
+        if settings.HTTP_FETCH_ENABLED:
+            headers = cached.validators() if cached is not None else None
+            result = await http_fetcher.get(url, headers=headers)
+            if result is not None and result.status == 304 and cached is not None:
+                FETCHES.inc(tier=TIER_CACHE)
+                await page_cache.atouch(url)
+                return self._cached_document(cached)
+
+            html_content = result.html if result is not None else None
+            if html_content and not needs_browser(url, html_content):
+                logger.info(f"Content fetched over http: {url}")
+                FETCHES.inc(tier=TIER_HTTP)
+                metadata = {
+                    "source": url,
+                    "tier": TIER_HTTP,
+                    "etag": result.etag,  # type:ignore
+                    "last_modified": result.last_modified,  # type:ignore
+                }
+                return await self._revalidated(
+                    Document(page_content=html_content, metadata=metadata), cached
                 )
-                result = await page.content()  # Simply get the HTML content
-                logger.warning("Page 1 content scraped")
-                results.append(await page.content())
-                try:
-                    logger.info("Starting scraping Page 2")
-                    next_page_result = ""
-                    # 假设".pn-next"是下一页的链接选择器，这需要根据实际页面结构调整
-                    next_page_button = await page.query_selector("a.n")
-                    if next_page_button:
-                        await next_page_button.click()
-                        await page.wait_for_load_state("networkidle")
-                        await page.wait_for_selector("#content_left", state="attached", timeout=random.randint(10000, 15000))
-                        # await page.screenshot(path='screenshot_after_next_page_click.png')
-                        # 收集第二页内容
-                        next_page_result = await page.content()
-                        results.append(next_page_result)
-                        logger.warning("Page 2 content scraped")
-                    else:
-                        logger.warning("No 'Next Page' button found.")
-                except Exception as e:
-                    logger.error(f"next page error:{e}")
-                    results.append(result)
 
-            except Exception as e:
-                result = f"Error: {e}"
-                results.append(result)
-            finally:
-                await browser.close()
-        return results
+        scraping_fn = getattr(self, f"ascrape_url_{self.backend}")
+        metadata = {"source": url, "tier": TIER_BROWSER}
+        try:
+            with STAGE_SECONDS.time(stage="browser_fetch"):
+                html_content = await scraping_fn(url)
+        except AdmissionError:
+            raise
+        except Exception as e:
+            # 抓取失败不能当作网页内容返回, 否则会被解析并写入缓存
+            logger.error(f"browser fetch error:{url} {e}")
+            return Document(page_content="", metadata={**metadata, "error": str(e)})
+        FETCHES.inc(tier=TIER_BROWSER)
+        return await self._revalidated(
+            Document(page_content=html_content, metadata=metadata), cached
+        )
+
+    @staticmethod
+    def _cached_document(cached: CachedPage) -> Document:
+        metadata = {"source": cached.url, "tier": TIER_CACHE}
+        return Document(page_content=cached.content, metadata=metadata)
+
+    async def _revalidated(
+        self, document: Document, cached: Optional[CachedPage]
+    ) -> Document:
+        # 网页内容没有变化时直接使用缓存的解析结果
+        html_hash = content_hash(document.page_content)
+        document.metadata["content_hash"] = html_hash
+        if cached is not None and cached.content_hash == html_hash:
+            await page_cache.atouch(cached.url)
+            return self._cached_document(cached)
+        return document
+
+    async def ascrape_keyword_playwright(
+        self, keyword: str, missing: Callable[[], int] = lambda: 0
+    ) -> AsyncIterator[str]:
+        """
+        Asynchronously scrape the result pages of a keyword using Playwright's async API.
+
+        The first page is loaded through ``self.engine``'s search form. While
+        ``missing()`` reports that more results are needed and the last page
+        links to a next one, the following pages are loaded directly by
+        offset, as many per round as are needed to cover the missing results,
+        each in its own tab of the same context.
 
-    def parse_url_content(self, html_str: str) -> str:
-        # 转换为 markdown
-        markdown_content = "parse url content error!"
+        Args:
+            keyword (str): use keyword to search data by ``self.engine``.
+            missing (Callable[[], int]): number of results still needed, checked
+                after the caller has consumed each round of pages.
+        Yields:
+            str: The scraped SERP HTML pages. Failures are logged and recorded
+            so :attr:`serp_exhausted` stays False; a failure of the first page,
+            or of every page of a round, ends the iteration and the pages
+            scraped before it are kept.
 
+        """
+        if browser_worker.enabled:
+            try:
+                async for html in browser_worker.scrape_keyword(keyword, self.engine, missing):
+                    yield html
+            except BrowserWorkerError as e:
+                self.serp_failed = True
+                logger.error(f"serp scrape error:{keyword} {e}")
+            return
+
+        engine = get_engine(self.engine)
+        max_offset = settings.SERP_MAX_PAGES * engine.per_page
         try:
-            rdoc = rDocument(html_str)
-            article = rdoc.summary()
+            async with browser_pool.page() as page:
+                last_page = await engine.scrape(page, keyword)
+                yield last_page
+
+                offset = engine.per_page
+                # 最后抓到的一页没有下一页链接时, 结果已经到底, 不再翻页
+                while (
+                    engine.has_next_page(last_page)
+                    and missing() > 0
+                    and offset < max_offset
+                    and not deadline.expired(settings.BUDGET_RESERVE)
+                ):
+                    pages = min(
+                        math.ceil(missing() / engine.per_page),
+                        (max_offset - offset) // engine.per_page,
+                    )
+                    offsets = [offset + i * engine.per_page for i in range(pages)]
+                    offset += pages * engine.per_page
+                    logger.info(f"Starting scraping {keyword} at offsets {offsets}")
+                    html_contents = await asyncio.gather(
+                        *(self._ascrape_serp_tab(page.context, keyword, o) for o in offsets),
+                        return_exceptions=True,
+                    )
+                    scraped = [html for html in html_contents if isinstance(html, str)]
+                    for html in html_contents:
+                        if isinstance(html, BaseException):
+                            self.serp_failed = True
+                            logger.error(f"next page error:{html}")
+                    if not scraped:
+                        break
+                    for html in scraped:
+                        yield html
+                    last_page = scraped[-1]
         except Exception as e:
-            logger.error(f"error:{e}")
-            article = "not found html content"
-        else:
-            # 转换为 markdown
-            markdown_content = converter.handle(article)
+            self.serp_failed = True
+            logger.error(f"serp scrape error:{keyword} {e}")
 
-        return markdown_content
+    async def _ascrape_serp_tab(self, context: Any, keyword: str, offset: int) -> str:
+        tab = await context.new_page()
+        try:
+            return await get_engine(self.engine).scrape_page(tab, keyword, offset)
+        finally:
+            await tab.close()
 
     def parse_content(
         self, url_document: Document, metadata_list: List[dict]
     ) -> Document:
         # 初步解析网页
-        metadata = {"title": "", "source": url_document.metadata["source"]}
-        for item in metadata_list:
-            if url_document.metadata["source"] == item["source"]:
-                metadata = item
+        metadata = self._page_metadata(url_document, metadata_list)
+
+        # 缓存命中的内容已经解析过
+        if url_document.metadata.get("tier") == TIER_CACHE:
+            return Document(page_content=url_document.page_content, metadata=metadata)
 
         try:
-            minimized_body = cleanup_html(
+            # 抽取网页主要内容并转换为 markdown
+            markdown_content = html_to_markdown(
                 str(url_document.page_content), url_document.metadata["source"]
-            )[1]
+            )
         except Exception as e:
             logger.error(f"error:{e}")
+            PARSE_FAILURES.inc(stage="parse_content")
 
             return Document(page_content="not found", metadata=metadata)
         else:
-            # 抽取网页主要内容
-            rdoc = rDocument(str(minimized_body))
-            article = rdoc.summary()
-
-            # 转换为 markdown
-            markdown_content = converter.handle(article)
-
             parse_doc = Document(page_content=markdown_content, metadata=metadata)
 
             return parse_doc
 
-    def parse_keyword_html(self, html_content: str) -> List[Document]:
-        docs:list[Document] = []
-        filter_list:list = []
-        
+    @staticmethod
+    def _page_metadata(url_document: Document, metadata_list: List[dict]) -> dict:
+        # 使用搜索结果中的标题等信息, 并记录网页由哪一层抓取
+        metadata = {"title": "", "source": url_document.metadata["source"]}
+        for item in metadata_list:
+            if url_document.metadata["source"] == item["source"]:
+                metadata = dict(item)
+        if "tier" in url_document.metadata:
+            metadata["tier"] = url_document.metadata["tier"]
+        return metadata
+
+    async def aextract_url_content(
+        self, html_str: str, url: str, links: bool = False, images: bool = False
+    ) -> ExtractedContent:
+        """
+        Extract markdown and, on request, link/image URLs in the parse pool.
+
+        Raises:
+            ValueError: If the page has no body.
+        """
+        return await parse_pool.run(extract_page, html_str, url, links, images)
+
+    async def aparse_content(
+        self, url_document: Document, metadata_list: List[dict]
+    ) -> Document:
+        """Async version of :meth:`parse_content`, parsing in the parse pool."""
+        metadata = self._page_metadata(url_document, metadata_list)
+
+        if url_document.metadata.get("tier") == TIER_CACHE:
+            return Document(page_content=url_document.page_content, metadata=metadata)
+
         try:
-            html_tree = etree.HTML(html_content)
-            all_divs = html_tree.xpath("//*[@id='content_left']//div")  # type:ignore
-            # if isinstance(all_divs, list):
-            for div in all_divs:  # type:ignore
-                tpl = div.attrib.get("tpl")  # type:ignore
-                if tpl in ["sg_kg_entity_san", "bk_polysemy", "se_com_default"]:
-                    title_strings = [str(element) for element in div.xpath(".//h3/a//text()")]  # type:ignore
-                    title = "".join(title_strings)
-                    link_strings = [str(element) for element in div.xpath(".//h3/a//@href")]  # type:ignore
-                    link = "".join(link_strings)
-                    content_tag: list[str] = div.xpath(".//h3/following-sibling::div/div//text()")  # type:ignore
-                
-                    # 过滤并拼接内容
-                    filter_content = list(filter(lambda x: x not in filter_str, content_tag))
-                    filter_content = [item for item in filter_content if "\n" not in item]
-                    doc_content = "".join(filter_content)
-                    
-                    # 构建Document对象
-                    metadata = {"title": title, "source": link}
-                    doc = Document(page_content=doc_content, metadata=metadata)
-                    
-                    # 去重
-                    if (doc_content, metadata) not in filter_list:
-                        docs.append(doc)
-                        filter_list.append((doc_content, metadata))
-
-                elif tpl == "news-realtime":
-                    pass
-        except etree.HTMLParseError as e:
-            print(f"HTML解析错误: {e}")
-            return [Document(page_content="html 解析错误")]
-        else:        
-            return docs
+            markdown_content = await parse_pool.run(
+                html_to_markdown,
+                str(url_document.page_content),
+                url_document.metadata["source"],
+            )
+        except Exception as e:
+            logger.error(f"error:{e}")
+            PARSE_FAILURES.inc(stage="parse_content")
+            return Document(page_content="not found", metadata=metadata)
+        return Document(page_content=markdown_content, metadata=metadata)
 
+    def parse_keyword_html(self, html_content: str) -> List[Document]:
+        return [
+            Document(page_content=content, metadata={**metadata, "engine": self.engine})
+            for content, metadata in parse_serp(html_content, self.engine)
+        ]
 
     def lazy_load(self) -> Iterator[Document]:
         """
         Lazily load text content from the provided URLs.
 
         This method yields Documents one at a time as they're scraped,
-        instead of waiting to scrape all URLs before returning.
+        instead of waiting to scrape all URLs before returning. It is a
+        synchronous bridge over :meth:`alazy_load`.
 
         Yields:
             Document: The scraped content encapsulated within a Document object.
 
         """
         
-        if self.urls:
-            scraping_fn = getattr(self, f"ascrape_url_{self.backend}")
+        # 在浏览器池的事件循环上运行 alazy_load, 逐个取回结果
+        yield from browser_pool.iter_sync(self.alazy_load())
 
-            for url in self.urls:
-                html_content = asyncio.run(scraping_fn(url))
-                metadata = {"source": url}
-                yield Document(page_content=html_content, metadata=metadata)
-        
-        elif self.keywords:
-            documents = []
-            scraping_fn = getattr(self, f"ascrape_keyword_{self.backend}")
-            
-            for keyword in self.keywords:
-                html_contents = asyncio.run(scraping_fn(keyword))
-                
-                for html in html_contents:
-                    docs = self.parse_keyword_html(html)
-                    documents.extend(docs)
-                
-            for doc in documents:
-                yield doc
-
-    
     async def alazy_load(self) -> AsyncIterator[Document]:
         """
         Asynchronously load text content from the provided URLs.
 
-        This method leverages asyncio to initiate the scraping of all provided URLs
-        simultaneously. It improves performance by utilizing concurrent asynchronous
-        requests. Each Document is yielded as soon as its content is available,
-        encapsulating the scraped content.
+        All URLs are scraped concurrently, bounded by the global and per-domain
+        limits of ``fetch_limiter``. Each Document is yielded as soon as its
+        content is available, so the order follows completion, not input.
 
         Yields:
             Document: A Document object containing the scraped content, along with its
@@ -303,19 +432,55 @@ class ChromiumLoader(BaseLoader):
         """
 
         if self.urls:
-            scraping_fn = getattr(self, f"ascrape_{self.backend}")
 
-            tasks = [scraping_fn(url) for url in self.urls]
-            results = await asyncio.gather(*tasks)
-            for url, content in zip(self.urls, results):
-                metadata = {"source": url}
-                yield Document(page_content=content, metadata=metadata)
+            async def fetch(url: str) -> Document:
+                async with fetch_limiter.limit(url):
+                    return await self.afetch_url(url)
+
+            tasks = [asyncio.ensure_future(fetch(url)) for url in self.urls]
+            try:
+                # 请求预算用完时放弃还没完成的页面, 只返回已完成的部分
+                for next_done in asyncio.as_completed(tasks, timeout=deadline.remaining()):
+                    yield await next_done
+            except asyncio.TimeoutError:
+                pending = sum(not task.done() for task in tasks)
+                TIMEOUTS.inc(pending, stage="budget")
+                logger.warning(f"Budget exhausted, {pending} pages dropped")
+            finally:
+                # 调用方提前退出时取消剩余的抓取
+                for task in tasks:
+                    task.cancel()
 
         elif self.keywords:
             scraping_fn = getattr(self, f"ascrape_keyword_{self.backend}")
+            engine = get_engine(self.engine)
 
             for keyword in self.keywords:
-                html_content = asyncio.run(scraping_fn(keyword))
-
-                metadata = {"title": keyword}
-                yield Document(page_content=html_content, metadata=metadata)
+                seen: set = set()
+                pages = 0
+                last_page = ""
+                self.serp_failed = False
+
+                def missing() -> int:
+                    return self.num - len(seen) if self.num else 0
+
+                async for html in scraping_fn(keyword, missing):
+                    pages += 1
+                    last_page = html
+                    # 解析是 CPU 密集操作, 放到解析进程池中执行, 不阻塞事件循环
+                    results = await parse_pool.run(parse_serp, html, self.engine)
+                    for content, metadata in results:
+                        # 翻页时搜索结果可能重复
+                        key = metadata.get("source") or content
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        metadata["engine"] = self.engine
+                        yield Document(page_content=content, metadata=metadata)
+
+                # 只有确实翻到了最后一页才算到底, 中途失败或预算用完都不算
+                self.serp_exhausted = (
+                    not self.serp_failed
+                    and not deadline.expired(settings.BUDGET_RESERVE)
+                    and (pages >= settings.SERP_MAX_PAGES or not engine.has_next_page(last_page))
+                )
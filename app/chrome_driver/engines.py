@@ -0,0 +1,210 @@
+import re
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import quote_plus, urljoin
+from loguru import logger
+from lxml import etree
+from app.chrome_driver.readiness import wait_ready
+from app.config.config import settings
+from app.utils import deadline
+from app.utils.extract import strip_xml_declaration
+from app.utils.metrics import PARSE_FAILURES, STAGE_SECONDS
+
+# 百度搜索结果摘要中需要过滤掉的文本
+filter_str = [
+    "播报",
+    "暂停",
+    " 快捷键说明",
+    " 空格",
+    ": 播放 / 暂停",
+    "Esc",
+    ": 退出全屏",
+    " ↑",
+    ": 音量提高10%",
+    " ↓",
+    ": 音量降低10%",
+    " →",
+    ": 单次快进5秒",
+    " ←",
+    ": 单次快退5秒",
+    "按住此处可拖拽",
+    " 不再出现",
+    " 可在播放器设置中重新打开小窗播放",
+    "",
+    "",
+    "",
+    "\n" "详情",
+    "人物经历",
+    "个人履历",
+    "职务任免",
+    "成长历程",
+    "成功经历",
+    "出诊时间",
+    "百度百科",
+]
+
+
+class SearchEngine:
+    """
+    A SERP backend: how to load result pages in a browser page and how to
+    parse them.
+
+    Subclasses keep their XPath extractors precompiled at class level so
+    parsing never recompiles expressions, and ``parse`` returns plain
+    (content, metadata) tuples so it can run in a parse worker process.
+    """
+
+    name: str = ""
+    results_selector: str = ""
+    per_page: int = 10  # 每页的搜索结果数
+    # 结果页中指向下一页的链接, 没有时说明搜索结果已经到底
+    next_page: Pattern = re.compile(r"(?!)")
+
+    def search_url(self, keyword: str, offset: int = 0) -> str:
+        raise NotImplementedError
+
+    async def scrape(self, page: Any, keyword: str) -> str:
+        """Load the first result page for ``keyword`` and return its HTML."""
+        return await self.scrape_page(page, keyword, 0)
+
+    async def scrape_page(self, page: Any, keyword: str, offset: int) -> str:
+        """Load the result page starting at ``offset`` directly by URL."""
+        with STAGE_SECONDS.time(stage="serp_goto"):
+            await page.goto(
+                self.search_url(keyword, offset),
+                wait_until="domcontentloaded",
+                timeout=deadline.timeout_ms(settings.SCRAPE_TIMEOUT, settings.BUDGET_RESERVE),
+            )
+        await wait_ready(page, self.results_selector, stable=False)
+        logger.warning(f"{self.name} page at offset {offset} scraped")
+        return await page.content()
+
+    def parse(self, html_content: str) -> List[Tuple[str, dict]]:
+        raise NotImplementedError
+
+    def has_next_page(self, html_content: str) -> bool:
+        """Whether a result page links to a following page of results."""
+        return bool(self.next_page.search(html_content))
+
+    def _tree(self, html_content: str) -> Optional[Any]:
+        # 解析失败时记录日志并返回 None, 视为没有搜索结果
+        try:
+            return etree.HTML(strip_xml_declaration(html_content))
+        except (etree.ParserError, ValueError) as e:
+            logger.error(f"{self.name} serp parse error:{e}")
+            PARSE_FAILURES.inc(stage="parse_serp")
+            return None
+
+
+class BaiduEngine(SearchEngine):
+    name = "baidu"
+    results_selector = "#content_left"
+    next_page = re.compile(r"""<a\b[^>]*\bclass=["']n["'][^>]*>\s*下一页""")
+
+    _results = etree.XPath("//*[@id='content_left']//div[@tpl]")
+    _title = etree.XPath(".//h3/a//text()")
+    _link = etree.XPath(".//h3/a//@href")
+    _content = etree.XPath(".//h3/following-sibling::div/div//text()")
+    _tpls = ("sg_kg_entity_san", "bk_polysemy", "se_com_default")
+
+    def search_url(self, keyword: str, offset: int = 0) -> str:
+        url = urljoin(settings.BAIDU_URL, f"s?wd={quote_plus(keyword)}")
+        return f"{url}&pn={offset}" if offset else url
+
+    async def scrape(self, page: Any, keyword: str) -> str:
+        logger.info("Starting scraping Page 1")
+        # 访问 baidu, 首页通过搜索框提交, 后续页直接按 pn 偏移访问
+        with STAGE_SECONDS.time(stage="serp_goto"):
+            await page.goto(
+                settings.BAIDU_URL,
+                wait_until="domcontentloaded",
+                timeout=deadline.timeout_ms(settings.SCRAPE_TIMEOUT, settings.BUDGET_RESERVE),
+            )
+        # 如果下面的代码无法输入，则使用 page.locator('input[name=\"wd\"]').type(keyword) 模拟键盘输入
+        await page.locator('input[name="wd"]').fill(keyword)
+        await page.locator("#su").click()  # 点击搜索
+        # 等待搜索结果出现, 最多等到请求预算即将用完
+        await wait_ready(page, self.results_selector, stable=False)
+        logger.warning("Page 1 content scraped")
+        return await page.content()  # Simply get the HTML content
+
+    def parse(self, html_content: str) -> List[Tuple[str, dict]]:
+        docs: List[Tuple[str, dict]] = []
+        filter_list: list = []
+
+        html_tree = self._tree(html_content)
+        if html_tree is None:
+            return docs
+        for div in self._results(html_tree):  # type:ignore
+            tpl = div.attrib.get("tpl")
+            if tpl in self._tpls:
+                title = "".join(str(element) for element in self._title(div))  # type:ignore
+                link = "".join(str(element) for element in self._link(div))  # type:ignore
+                content_tag = [str(element) for element in self._content(div)]  # type:ignore
+
+                # 过滤并拼接内容
+                filter_content = [
+                    item
+                    for item in content_tag
+                    if item not in filter_str and "\n" not in item
+                ]
+                doc_content = "".join(filter_content)
+
+                metadata = {"title": title, "source": link}
+
+                # 去重
+                if (doc_content, metadata) not in filter_list:
+                    docs.append((doc_content, metadata))
+                    filter_list.append((doc_content, metadata))
+
+            elif tpl == "news-realtime":
+                pass
+        return docs
+
+
+class BingEngine(SearchEngine):
+    name = "bing"
+    results_selector = "#b_results"
+    next_page = re.compile(r"""class=["'][^"']*\bsb_pagN\b""")
+
+    _results = etree.XPath("//*[@id='b_results']/li[contains(@class, 'b_algo')]")
+    _title = etree.XPath(".//h2/a//text()")
+    _link = etree.XPath("(.//h2/a/@href)[1]")
+    _content = etree.XPath(".//div[contains(@class, 'b_caption')]//p//text() | ./p//text()")
+
+    def search_url(self, keyword: str, offset: int = 0) -> str:
+        url = urljoin(settings.BING_URL, f"search?q={quote_plus(keyword)}")
+        return f"{url}&first={offset + 1}" if offset else url
+
+    def parse(self, html_content: str) -> List[Tuple[str, dict]]:
+        docs: List[Tuple[str, dict]] = []
+        seen = set()
+        html_tree = self._tree(html_content)
+        if html_tree is None:
+            return docs
+        for item in self._results(html_tree):  # type:ignore
+            title = "".join(str(element) for element in self._title(item)).strip()  # type:ignore
+            links = self._link(item)
+            link = str(links[0]) if links else ""  # type:ignore
+            content = "".join(str(element) for element in self._content(item)).strip()  # type:ignore
+            if not link or link in seen:
+                continue
+            seen.add(link)
+            docs.append((content, {"title": title, "source": link}))
+        return docs
+
+
+ENGINES: Dict[str, SearchEngine] = {
+    engine.name: engine for engine in (BaiduEngine(), BingEngine())
+}
+
+
+def get_engine(name: str) -> SearchEngine:
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown search engine: {name}") from None
+
+
+def parse_serp(html_content: str, engine: str) -> List[Tuple[str, dict]]:
+    """Parse a SERP with the named engine; picklable entry point for the parse pool."""
+    return get_engine(engine).parse(html_content)
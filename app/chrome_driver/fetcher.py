@@ -0,0 +1,168 @@
+import asyncio
+import re
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import urlparse
+from loguru import logger
+from app.config.config import settings
+from app.utils import deadline
+from app.utils.metrics import STAGE_SECONDS, TIMEOUTS
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+TIER_CACHE = "cache"
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+_SCRIPT_STYLE = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>", re.I | re.S)
+_TAG = re.compile(r"<[^>]+>")
+_SPACE = re.compile(r"\s+")
+# 只有挂载点、没有内容的前端应用骨架
+_SPA_MOUNT = re.compile(
+    r"""<div[^>]+id=["'](app|root|__next|__nuxt)["'][^>]*>\s*</div>""", re.I
+)
+_JS_REQUIRED = re.compile(
+    r"(enable|开启|启用)\s*javascript|javascript\s*(is\s*)?(required|disabled)", re.I
+)
+
+
+def visible_text_length(html: str) -> int:
+    """Rough length of the text a reader would see, without building a tree."""
+    text = _SCRIPT_STYLE.sub(" ", html)
+    text = _TAG.sub(" ", text)
+    return len(_SPACE.sub("", text))
+
+
+def needs_browser(url: str, html: Optional[str]) -> bool:
+    """
+    Decide whether a plain HTTP response must be re-fetched with Chromium.
+
+    Args:
+        url (str): The requested URL.
+        html (Optional[str]): The body returned by the HTTP tier, if any.
+    Returns:
+        bool: True for known SPA domains, empty bodies and JS-only shells.
+    """
+    host = urlparse(url).hostname or ""
+    for domain in settings.BROWSER_ONLY_DOMAINS:
+        if host == domain or host.endswith("." + domain):
+            return True
+
+    if not html or not html.strip():
+        return True
+
+    text_length = visible_text_length(html)
+    if text_length < settings.HTTP_MIN_TEXT_LENGTH:
+        return True
+
+    # 空挂载点 + 提示开启 javascript 或正文很少, 视为前端渲染的页面
+    if _SPA_MOUNT.search(html) and (
+        _JS_REQUIRED.search(html) or text_length < 4 * settings.HTTP_MIN_TEXT_LENGTH
+    ):
+        return True
+
+    return False
+
+
+def decode_body(content: bytes, encoding: Optional[str]) -> str:
+    # 优先使用响应头里的编码, 其次是页面 meta 声明的编码
+    if not encoding:
+        match = _META_CHARSET.search(content[:4096])
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return content.decode(encoding, errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
+
+
+class FetchResult(NamedTuple):
+    status: int
+    html: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class HttpFetcher:
+    """
+    Pooled keep-alive HTTP client used as the first fetch tier.
+
+    The client is bound to the event loop it was created on; when called from
+    a different loop a new client is created transparently.
+    """
+
+    def __init__(self):
+        self._client: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _new_client(self) -> Any:
+        import httpx
+
+        return httpx.AsyncClient(
+            headers={"User-Agent": settings.HTTP_USER_AGENT},
+            timeout=settings.HTTP_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            ),
+        )
+
+    @property
+    def client(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = self._new_client()
+            self._loop = loop
+        return self._client
+
+    async def start(self) -> None:
+        _ = self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    async def get(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[FetchResult]:
+        """
+        GET a page over plain HTTP.
+
+        Args:
+            url (str): The URL to fetch.
+            headers (Optional[Dict[str, str]]): Extra request headers, e.g.
+                conditional validators.
+        Returns:
+            Optional[FetchResult]: The status, decoded HTML and validators.
+            ``html`` is None for 304 responses and for non-HTML or failed
+            responses. None when the request itself fails.
+        """
+        try:
+            with STAGE_SECONDS.time(stage="http_fetch"):
+                response = await self.client.get(
+                    url,
+                    headers=headers,
+                    timeout=deadline.remaining(
+                        settings.HTTP_TIMEOUT, settings.BUDGET_RESERVE
+                    ),
+                )
+        except Exception as e:
+            import httpx
+
+            if isinstance(e, httpx.TimeoutException):
+                TIMEOUTS.inc(stage="http_fetch")
+            logger.warning(f"http fetch error:{url} {e}")
+            return None
+
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        content_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or (
+            content_type and "html" not in content_type
+        ):
+            return FetchResult(response.status_code, None, etag, last_modified)
+        html = decode_body(response.content, response.charset_encoding)
+        return FetchResult(response.status_code, html, etag, last_modified)
+
+
+http_fetcher = HttpFetcher()
@@ -0,0 +1,114 @@
+import asyncio
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from loguru import logger
+from app.config.config import settings
+from app.utils.metrics import ALLOWED_BYTES, BLOCKED_REQUESTS
+
+
+def _match_domain(host: str, domains: Dict[str, List[str]]) -> Optional[List[str]]:
+    for domain, resource_types in domains.items():
+        if host == domain or host.endswith("." + domain):
+            return resource_types
+    return None
+
+
+class RoutePolicy:
+    """
+    Request interception policy installed on every browser context.
+
+    Requests whose resource type is in ``block_types`` or whose URL matches
+    one of ``block_patterns`` are aborted before they are sent. Domains in
+    ``allow_domains`` map to the resource types they are still allowed to
+    load (an empty list allows everything), for sites that break without
+    them. The top-level document is never blocked.
+
+    Blocked requests are never downloaded, so they are counted per resource
+    type; allowed requests are counted together with their transferred bytes.
+    """
+
+    def __init__(
+        self,
+        block_types: Optional[List[str]] = None,
+        block_patterns: Optional[List[str]] = None,
+        allow_domains: Optional[Dict[str, List[str]]] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.enabled = settings.ROUTE_BLOCK_ENABLED if enabled is None else enabled
+        self.block_types = set(
+            settings.ROUTE_BLOCK_RESOURCE_TYPES if block_types is None else block_types
+        )
+        patterns = (
+            settings.ROUTE_BLOCK_URL_PATTERNS if block_patterns is None else block_patterns
+        )
+        # 所有 url 规则合并成一个正则, 每个请求只匹配一次
+        self._pattern = re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+        self.allow_domains = (
+            settings.ROUTE_ALLOW_DOMAINS if allow_domains is None else allow_domains
+        )
+
+        self.blocked_requests: Counter = Counter()
+        self.allowed_requests: Counter = Counter()
+        self.allowed_bytes: Counter = Counter()
+        self._pending: set = set()
+
+    def blocks(self, url: str, resource_type: str) -> bool:
+        """Whether a request for ``url`` of ``resource_type`` is aborted."""
+        allowed = _match_domain(urlparse(url).hostname or "", self.allow_domains)
+        if allowed is not None and (not allowed or resource_type in allowed):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return bool(self._pattern and self._pattern.search(url))
+
+    async def install(self, context: Any) -> None:
+        """Route every request of a Playwright browser context through the policy."""
+        if not self.enabled:
+            return
+        await context.route("**/*", self._handle)
+        context.on("requestfinished", self._on_finished)
+
+    async def _handle(self, route: Any) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        # 主文档的导航请求总是放行
+        main_document = request.is_navigation_request() and request.frame.parent_frame is None
+        if not main_document and self.blocks(request.url, resource_type):
+            self.blocked_requests[resource_type] += 1
+            BLOCKED_REQUESTS.inc(type=resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _on_finished(self, request: Any) -> None:
+        # 传输大小需要异步获取, 放到后台任务中统计
+        task = asyncio.ensure_future(self._record(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _record(self, request: Any) -> None:
+        resource_type = request.resource_type
+        self.allowed_requests[resource_type] += 1
+        try:
+            sizes = await request.sizes()
+        except Exception as e:
+            logger.debug(f"request sizes error:{e}")
+            return
+        size = max(sizes.get("responseBodySize", 0), 0) + max(
+            sizes.get("responseHeadersSize", 0), 0
+        )
+        self.allowed_bytes[resource_type] += size
+        ALLOWED_BYTES.inc(size, type=resource_type)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Counters of blocked and allowed requests and allowed bytes, per resource type."""
+        return {
+            "blocked_requests": dict(self.blocked_requests),
+            "allowed_requests": dict(self.allowed_requests),
+            "allowed_bytes": dict(self.allowed_bytes),
+        }
+
+
+route_policy = RoutePolicy()
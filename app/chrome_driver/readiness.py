@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Dict, Optional
+from loguru import logger
+from app.config.config import settings
+from app.utils import deadline
+from app.utils.metrics import STAGE_SECONDS, TIMEOUTS
+
+READY_SELECTOR = "selector"
+READY_STABLE = "stable"
+READY_BUDGET = "budget"
+
+# DOM 在 quietMs 毫秒内没有变化时 resolve
+_DOM_STABLE_JS = """
+(quietMs) => new Promise((resolve) => {
+    let timer;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    function done() {
+        observer.disconnect();
+        resolve(true);
+    }
+    observer.observe(document, {childList: true, subtree: true, characterData: true});
+    timer = setTimeout(done, quietMs);
+})
+"""
+
+
+async def wait_ready(
+    page: Any,
+    selector: Optional[str] = None,
+    stable: bool = True,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Wait until a loaded page is worth capturing.
+
+    Races the readiness signals and returns as soon as the first one fires:
+    ``selector`` is attached, the DOM has been stable for ``DOM_STABLE_MS``
+    or the request budget (minus ``BUDGET_RESERVE``) is nearly used up.
+
+    Args:
+        page: A Playwright page after navigation.
+        selector: CSS selector of the main content, if known.
+        stable: Whether DOM stability counts as ready.
+        timeout: Upper bound in seconds when no budget is set.
+    Returns:
+        str: The signal that fired, one of ``READY_SELECTOR``,
+        ``READY_STABLE`` or ``READY_BUDGET``.
+    """
+    wait = deadline.remaining(
+        settings.SCRAPE_TIMEOUT if timeout is None else timeout,
+        settings.BUDGET_RESERVE,
+    )
+    waiters: Dict[asyncio.Future, str] = {}
+    if selector:
+        waiters[
+            asyncio.ensure_future(
+                page.wait_for_selector(selector, state="attached", timeout=wait * 1000 + 1)  # type:ignore
+            )
+        ] = READY_SELECTOR
+    if stable:
+        waiters[
+            asyncio.ensure_future(page.evaluate(_DOM_STABLE_JS, settings.DOM_STABLE_MS))
+        ] = READY_STABLE
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    end = start + wait  # type:ignore
+    pending = set(waiters)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(end - loop.time(), 0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    STAGE_SECONDS.observe(loop.time() - start, stage="ready")
+                    return waiters[task]
+                logger.debug(f"readiness {waiters[task]} error:{task.exception()}")
+    finally:
+        for task in pending:
+            task.cancel()
+        # 取回被取消任务的异常, 避免 "exception was never retrieved"
+        await asyncio.gather(*pending, return_exceptions=True)
+    STAGE_SECONDS.observe(loop.time() - start, stage="ready")
+    TIMEOUTS.inc(stage="ready")
+    return READY_BUDGET
@@ -0,0 +1,186 @@
+import asyncio
+import base64
+import binascii
+import html
+import re
+from typing import List, Optional
+from urllib.parse import parse_qs, urljoin, urlsplit
+from langchain_core.documents import Document
+from loguru import logger
+from app.chrome_driver.fetcher import http_fetcher
+from app.config.config import settings
+from app.utils import deadline
+from app.utils.cache import TTLCache
+from app.utils.metrics import REDIRECTS, STAGE_SECONDS, TIMEOUTS
+from app.utils.url import canonical_url
+
+# 跳转页没有 Location 时, 目标地址写在 meta refresh 或脚本里
+_META_REFRESH = re.compile(
+    r"""<meta[^>]+http-equiv=["']?refresh["']?[^>]*content=["']?\d*\s*;\s*url=['"]?([^"'>\s]+)""",
+    re.I,
+)
+_JS_LOCATION = re.compile(
+    r"""(?:window\.|document\.)?location(?:\.href)?(?:\.replace\(|\s*=\s*)\s*["']([^"']+)["']""",
+    re.I,
+)
+# 跳转页本身很小, 只读取开头部分
+_BODY_LIMIT = 16 * 1024
+# 跳转链接可能嵌套, 例如跳到另一个搜索引擎的跳转链接
+_MAX_HOPS = 3
+
+
+def _bing_target(url: str) -> Optional[str]:
+    # bing 的 ck/a 链接把目标地址以 "a1" + base64url 的形式放在参数 u 中, 无需请求即可还原
+    parts = urlsplit(url)
+    if not parts.path.startswith("/ck/a"):
+        return None
+    value = parse_qs(parts.query).get("u", [""])[0]
+    if not value.startswith("a1"):
+        return None
+    encoded = value[2:]
+    try:
+        target = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return target if target.startswith(("http://", "https://")) else None
+
+
+def _stub_pattern(base_url: str, path: str) -> str:
+    parts = urlsplit(base_url)
+    return f"^{re.escape(parts.scheme)}://{re.escape(parts.netloc)}{re.escape(path)}"
+
+
+def refresh_target(page: str) -> Optional[str]:
+    """Target of a meta refresh or ``location`` script in a redirect page."""
+    match = _META_REFRESH.search(page) or _JS_LOCATION.search(page)
+    return html.unescape(match.group(1)) if match else None
+
+
+class RedirectResolver:
+    """
+    Resolve search engine redirect stubs (``baidu.com/link?url=...``) to the
+    URLs they point to.
+
+    Stubs are the URLs matching ``REDIRECT_STUB_PATTERNS``, plus ``/link?``
+    on the ``BAIDU_URL`` host, so a Baidu stand-in is handled without extra
+    settings.
+
+    Each stub costs one plain HTTP request that does not follow redirects:
+    the target is read from the ``Location`` header, or from the meta
+    refresh or script of the small page some stubs answer with. Bing stubs
+    are decoded without a request. Resolutions run concurrently, bounded by
+    ``REDIRECT_CONCURRENCY`` and the request budget, and are kept in a
+    bounded TTL cache. A stub that cannot be resolved is left as is, the
+    browser then follows it like before.
+    """
+
+    def __init__(self):
+        self.patterns = [re.compile(pattern) for pattern in settings.REDIRECT_STUB_PATTERNS]
+        # BAIDU_URL 指向其它地址 (例如压测用的本地服务) 时, 该地址下的 /link? 也是跳转链接
+        self.patterns.append(re.compile(_stub_pattern(settings.BAIDU_URL, "/link?")))
+        self.cache: TTLCache[str] = TTLCache(
+            ttl=settings.REDIRECT_CACHE_TTL,
+            max_bytes=settings.REDIRECT_CACHE_MAX_BYTES,
+            sizeof=len,
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def is_stub(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self.patterns)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.REDIRECT_CONCURRENCY)
+        return self._semaphore
+
+    async def _follow(self, url: str) -> Optional[str]:
+        # 只请求跳转链接本身, 不跟随到目标网页
+        timeout = deadline.remaining(settings.REDIRECT_TIMEOUT, settings.BUDGET_RESERVE)
+        async with self.semaphore:
+            async with http_fetcher.client.stream(
+                "GET", url, follow_redirects=False, timeout=timeout
+            ) as response:
+                if response.is_redirect:
+                    location = response.headers.get("location")
+                elif response.status_code == 200:
+                    body = b""
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) >= _BODY_LIMIT:
+                            break
+                    location = refresh_target(body.decode("utf-8", errors="replace"))
+                else:
+                    location = None
+        return urljoin(url, location) if location else None
+
+    async def _resolve(self, url: str) -> str:
+        target = url
+        for _ in range(_MAX_HOPS):
+            if not self.is_stub(target):
+                break
+            next_target = _bing_target(target) or await self._follow(target)
+            if not next_target:
+                break
+            target = next_target
+        return target
+
+    async def resolve(self, url: str) -> str:
+        """
+        Resolve a redirect stub, going through the cache.
+
+        Args:
+            url (str): A result link, stub or not.
+        Returns:
+            str: The target URL, or ``url`` itself if it is not a stub or
+            could not be resolved.
+        """
+        if not self.is_stub(url):
+            return url
+        cached = self.cache.get(url)
+        if cached is not None:
+            REDIRECTS.inc(result="cached")
+            return cached
+        try:
+            target = await self.cache.get_or_load(
+                url, lambda: self._resolve(url), cacheable=lambda target: target != url
+            )
+        except Exception as e:
+            import httpx
+
+            if isinstance(e, httpx.TimeoutException):
+                TIMEOUTS.inc(stage="redirect")
+            REDIRECTS.inc(result="failed")
+            logger.warning(f"redirect resolve error:{url} {e}")
+            return url
+        REDIRECTS.inc(result="resolved" if target != url else "failed")
+        return target
+
+    async def resolve_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Replace the redirect stubs in ``metadata["source"]`` by their targets
+        and drop results pointing to a page seen earlier in the list.
+
+        The stub is kept in ``metadata["serp_link"]``.
+        """
+        sources = [doc.metadata.get("source") or "" for doc in documents]
+        if not any(self.is_stub(source) for source in sources):
+            return documents
+        with STAGE_SECONDS.time(stage="redirect"):
+            targets = await asyncio.gather(*(self.resolve(source) for source in sources))
+
+        resolved = []
+        seen = set()
+        for doc, source, target in zip(documents, sources, targets):
+            key = canonical_url(target) if target else id(doc)
+            if key in seen:
+                continue
+            seen.add(key)
+            if target != source:
+                metadata = {**doc.metadata, "source": target, "serp_link": source}
+                doc = Document(page_content=doc.page_content, metadata=metadata)
+            resolved.append(doc)
+        return resolved
+
+
+redirect_resolver = RedirectResolver()
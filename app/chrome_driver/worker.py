@@ -0,0 +1,165 @@
+"""
+Out-of-process browser tier.
+
+A worker process owns the Playwright browsers and serves scrape jobs from
+the API processes over a Unix socket, so several uvicorn workers share one
+set of browsers and the two tiers scale independently. Run one (or several,
+each on its own socket) next to the API and list the sockets in
+``BROWSER_WORKER_SOCKETS``:
+
+    python -m app.chrome_driver.worker --socket /tmp/websearch-browser.sock
+    BROWSER_WORKER_SOCKETS='["/tmp/websearch-browser.sock"]' uvicorn app.main:app
+
+Protocol: one connection per job, newline-delimited JSON messages. The
+client sends ``{"op": "url", "url": ...}``, ``{"op": "keyword", "keyword":
+..., "engine": ..., "missing": n}`` or ``{"op": "ping"}`` with the remaining
+``budget`` in seconds and a ``client`` id. The worker answers with
+``{"html": ...}`` messages, then ``{"done": true, "failed": bool}``, or with
+``{"error": ..., "busy": bool, "retry_after": s}``. For keyword jobs the
+client acknowledges every page with ``{"missing": n}``. Closing the
+connection cancels the job.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from app.chrome_driver.browser_pool import BrowserPool, browser_pool
+from app.chrome_driver.chromium import ChromiumLoader
+from app.chrome_driver.worker_client import (
+    FRAME_LIMIT,
+    browser_worker,
+    read_frame,
+    write_frame,
+)
+from app.config.config import settings
+from app.exception.exce import AdmissionError
+from app.utils import deadline
+from app.utils.admission import AdmissionController
+
+# 任务类型对应的调度优先级, 见 app.utils.admission.PRIORITIES
+_PRIORITIES = {"keyword": "delta", "url": "url"}
+
+
+class BrowserWorker:
+    """Unix socket server running scrape jobs on a local browser pool."""
+
+    def __init__(self, path: str, pool: Optional[BrowserPool] = None):
+        self.path = path
+        self.pool = pool or browser_pool
+        # 排队已满时立即拒绝, 由 api 进程返回 429
+        self.admission = AdmissionController(
+            max_active=self.pool.size * self.pool.max_contexts,
+            max_queue=settings.BROWSER_WORKER_QUEUE,
+            client_queue=settings.BROWSER_WORKER_QUEUE,
+        )
+
+    async def serve(self) -> None:
+        await self.pool.warm_up()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle, path=self.path, limit=FRAME_LIMIT)
+        logger.info(f"Browser worker listening on {self.path}")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            await self.pool.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            logger.info("Browser worker stopped")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            job = await read_frame(reader)
+            if job is None:
+                return
+            inbox: asyncio.Queue = asyncio.Queue()
+
+            async def receive() -> None:
+                while True:
+                    frame = await read_frame(reader)
+                    if frame is None:
+                        return
+                    inbox.put_nowait(frame)
+
+            job_task = asyncio.ensure_future(self._run(job, inbox, writer))
+            receive_task = asyncio.ensure_future(receive())
+            await asyncio.wait({job_task, receive_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not job_task.done():
+                # 客户端已断开, 取消任务并释放浏览器页面
+                job_task.cancel()
+                logger.info(f"Job cancelled by client: {job.get('op')}")
+            receive_task.cancel()
+            await asyncio.gather(job_task, receive_task, return_exceptions=True)
+        except Exception as e:
+            logger.error(f"browser worker connection error:{e}")
+        finally:
+            writer.close()
+
+    async def _run(
+        self, job: Dict[str, Any], inbox: asyncio.Queue, writer: asyncio.StreamWriter
+    ) -> None:
+        op = job.get("op")
+        try:
+            if op == "ping":
+                await write_frame(writer, {"done": True})
+                return
+            if op not in _PRIORITIES:
+                raise ValueError(f"unknown op: {op}")
+            failed = False
+            with deadline.budget(job.get("budget")):
+                async with self.admission.admit(_PRIORITIES[op], job.get("client", "")):
+                    if op == "url":
+                        loader = ChromiumLoader(urls=[job["url"]])
+                        html = await loader.ascrape_url_playwright(job["url"])
+                        await write_frame(writer, {"html": html})
+                    else:
+                        failed = await self._run_keyword(job, inbox, writer)
+            await write_frame(writer, {"done": True, "failed": failed})
+        except AdmissionError as e:
+            frame = {"error": str(e.value), "busy": True, "retry_after": e.retry_after}
+            await write_frame(writer, frame)
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await write_frame(writer, {"error": f"{type(e).__name__}: {e}"})
+
+    @staticmethod
+    async def _run_keyword(
+        job: Dict[str, Any], inbox: asyncio.Queue, writer: asyncio.StreamWriter
+    ) -> bool:
+        missing = job.get("missing", 0)
+        loader = ChromiumLoader(keywords=[job["keyword"]], engine=job.get("engine", "baidu"))
+        async for html in loader.ascrape_keyword_playwright(job["keyword"], lambda: missing):
+            await write_frame(writer, {"html": html})
+            # 等待客户端解析完这一页, 再根据还缺的结果数决定是否继续翻页
+            missing = (await inbox.get()).get("missing", 0)
+        # 有结果页抓取失败时告知客户端, 这些结果不能当作已经到底
+        return loader.serp_failed
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--socket",
+        default=(settings.BROWSER_WORKER_SOCKETS or ["/tmp/websearch-browser.sock"])[0],
+    )
+    args = parser.parse_args(argv)
+
+    # worker 进程自己启动浏览器, 不再转发给其他 worker
+    browser_worker.sockets = []
+    asyncio.run(BrowserWorker(args.socket).serve())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
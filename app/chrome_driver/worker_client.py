@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from app.config.config import settings
+from app.exception.exce import AdmissionError, BrowserWorkerError
+from app.utils import deadline
+
+# 单个消息的长度上限, 网页 html 可能很大
+FRAME_LIMIT = 64 * 1024 * 1024
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one newline-delimited JSON message, None at end of stream."""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+async def write_frame(writer: asyncio.StreamWriter, frame: Dict[str, Any]) -> None:
+    writer.write(json.dumps(frame, ensure_ascii=False).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+class BrowserWorkerClient:
+    """
+    Client of the out-of-process browser tier (``app.chrome_driver.worker``).
+
+    Each scrape job opens its own Unix socket connection to the worker with
+    the fewest jobs in flight from this process. The job carries the
+    remaining request budget. Closing the connection, e.g. when the request
+    is cancelled because the HTTP client went away, cancels the job in the
+    worker. A worker whose queue is full answers right away, which is
+    raised as :class:`AdmissionError` so the API can shed load with a 429.
+    """
+
+    def __init__(self, sockets: Optional[List[str]] = None):
+        self.sockets = settings.BROWSER_WORKER_SOCKETS if sockets is None else sockets
+        self._in_flight: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sockets)
+
+    @asynccontextmanager
+    async def _connect(
+        self, path: Optional[str] = None
+    ) -> AsyncIterator[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]:
+        if path is None:
+            path = min(self.sockets, key=lambda p: self._in_flight.get(p, 0))
+        self._in_flight[path] = self._in_flight.get(path, 0) + 1
+        try:
+            try:
+                reader, writer = await asyncio.open_unix_connection(path, limit=FRAME_LIMIT)
+            except OSError as e:
+                raise BrowserWorkerError(f"browser worker unavailable: {path} {e}") from e
+            try:
+                yield reader, writer
+            finally:
+                # 断开连接即取消 worker 中的任务
+                writer.close()
+        finally:
+            self._in_flight[path] -= 1
+
+    @staticmethod
+    def _job(op: str, **fields: Any) -> Dict[str, Any]:
+        return {
+            "op": op,
+            "budget": deadline.remaining(),
+            "client": str(os.getpid()),
+            **fields,
+        }
+
+    @staticmethod
+    async def _receive(reader: asyncio.StreamReader) -> Dict[str, Any]:
+        frame = await read_frame(reader)
+        if frame is None:
+            raise BrowserWorkerError("browser worker closed the connection")
+        if "error" in frame:
+            if frame.get("busy"):
+                raise AdmissionError(frame["error"], frame.get("retry_after", 1))
+            raise BrowserWorkerError(frame["error"])
+        return frame
+
+    async def scrape_url(self, url: str) -> str:
+        """Render ``url`` in a worker browser and return its HTML."""
+        async with self._connect() as (reader, writer):
+            await write_frame(writer, self._job("url", url=url))
+            frame = await self._receive(reader)
+            return frame["html"]
+
+    async def scrape_keyword(
+        self, keyword: str, engine: str, missing: Callable[[], int]
+    ) -> AsyncIterator[str]:
+        """
+        Scrape the SERP pages of ``keyword`` in a worker browser.
+
+        After each page the worker waits for the current ``missing()`` count
+        before deciding whether to fetch further pages, so pages are only
+        scraped as fast as they are consumed. :class:`BrowserWorkerError` is
+        raised after the last page if some result pages failed in the worker.
+        """
+        async with self._connect() as (reader, writer):
+            job = self._job("keyword", keyword=keyword, engine=engine, missing=missing())
+            await write_frame(writer, job)
+            while True:
+                frame = await self._receive(reader)
+                if frame.get("done"):
+                    if frame.get("failed"):
+                        # 部分结果页抓取失败, 已返回的结果仍然可用
+                        raise BrowserWorkerError("some result pages failed in the worker")
+                    return
+                yield frame["html"]
+                await write_frame(writer, {"missing": missing()})
+
+    async def wait_ready(self, timeout: float = 120) -> None:
+        """Wait until every worker accepts jobs (its browsers are warm)."""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+
+        async def ping(path: str) -> None:
+            while True:
+                try:
+                    async with self._connect(path) as (reader, writer):
+                        await write_frame(writer, {"op": "ping"})
+                        await self._receive(reader)
+                    return
+                except BrowserWorkerError:
+                    if loop.time() > end:
+                        raise
+                    await asyncio.sleep(0.5)
+
+        await asyncio.gather(*(ping(path) for path in self.sockets))
+
+
+browser_worker = BrowserWorkerClient()
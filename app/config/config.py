@@ -6,6 +6,7 @@
 @IDE: vscode
 """
 
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 
@@ -28,5 +29,123 @@ class Setting(BaseSettings):
     LOG_DIR: str = "logs/crawl_data{time}.log"
     LOG_LEVEL: str
 
+    # browser pool
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_MAX_CONTEXTS: int = 4  # 每个浏览器同时租出的 context 上限
+    BROWSER_MAX_USES: int = 200  # 浏览器累计租用次数达到后回收重启
+    BROWSER_IDLE_TIMEOUT: float = 300  # 空闲超过该秒数的浏览器被关闭, 0 表示不回收
+    BROWSER_HEADLESS: bool = True
+
+    # browser worker, 浏览器放在独立的 worker 进程中, api 进程通过 unix socket 提交抓取任务
+    BROWSER_WORKER_SOCKETS: List[str] = []  # 为空表示在 api 进程内启动浏览器
+    BROWSER_WORKER_QUEUE: int = 64  # 每个 worker 排队的任务数上限, 超出时返回 429
+
+    # 浏览器请求拦截, 不下载图片、字体等页面解析用不到的资源
+    ROUTE_BLOCK_ENABLED: bool = True
+    ROUTE_BLOCK_RESOURCE_TYPES: List[str] = ["image", "media", "font", "stylesheet"]
+    # 广告和统计脚本, 正则
+    ROUTE_BLOCK_URL_PATTERNS: List[str] = [
+        r"hm\.baidu\.com",
+        r"pos\.baidu\.com",
+        r"cpro\.baidu(static)?\.com",
+        r"google-analytics\.com",
+        r"googletagmanager\.com",
+        r"doubleclick\.net",
+        r"googlesyndication\.com",
+        r"cnzz\.com",
+        r"51\.la",
+    ]
+    # 不拦截的域名 -> 允许加载的资源类型, 空列表表示全部允许
+    ROUTE_ALLOW_DOMAINS: Dict[str, List[str]] = {"baidu.com": ["stylesheet"]}
+
+    # proxy pool, 后台检测代理可用性并打分, 浏览器 context 轮换使用
+    PROXY_ENABLED: bool = False
+    PROXY_SERVERS: List[str] = []  # 候选代理, 如 http://127.0.0.1:8899
+    PROXY_FREE_ENABLED: bool = False  # 同时从 free-proxy 获取候选代理
+    PROXY_FREE_COUNTRIES: List[str] = []
+    PROXY_CHECK_URL: str = "http://www.baidu.com/"
+    PROXY_CHECK_TIMEOUT: float = 5
+    PROXY_CHECK_INTERVAL: float = 300  # 秒
+    PROXY_CHECK_CONCURRENCY: int = 20
+    PROXY_MIN_SUCCESS_RATE: float = 0.5  # 成功率低于该值的代理不使用
+    PROXY_MAX_FAILURES: int = 3  # 连续失败次数达到时停用该代理, 且不再是候选代理时移出代理池
+
+    # deadline, 单次 api 请求的总耗时预算, 超出时返回已完成的部分结果
+    REQUEST_BUDGET: float = 30  # 秒, 0 表示不限制
+    BUDGET_RESERVE: float = 1  # 留给解析和返回结果的秒数
+    SCRAPE_TIMEOUT: float = 15  # 没有预算时单个页面加载的等待上限, 秒
+    # 正文容器出现或 DOM 稳定 DOM_STABLE_MS 毫秒后即可截取网页
+    READY_SELECTOR: str = "article, main, [role=main], #content, .article, .content"
+    DOM_STABLE_MS: int = 500
+
+    # admission, 浏览器层之前的排队和限流, 队列满时直接返回 429
+    ADMISSION_MAX_ACTIVE: int = 0  # 同时执行的请求数, 0 表示 BROWSER_POOL_SIZE * BROWSER_MAX_CONTEXTS
+    ADMISSION_MAX_QUEUE: int = 32  # 排队的请求数上限
+    ADMISSION_CLIENT_QUEUE: int = 8  # 单个客户端排队的请求数上限
+    ADMISSION_CLIENT_HEADER: str = "X-Client-Id"  # 标识客户端的请求头, 缺省时使用客户端 ip
+
+    # fetch
+    FETCH_CONCURRENCY: int = 8  # 全局同时抓取的页面数
+    FETCH_PER_DOMAIN: int = 4  # 单个域名同时抓取的页面数
+
+    # http fetch tier, 先用普通 http 请求, 必要时再用浏览器渲染
+    HTTP_FETCH_ENABLED: bool = True
+    HTTP_TIMEOUT: float = 10
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_MIN_TEXT_LENGTH: int = 200  # 可见文本少于该长度时改用浏览器
+    HTTP_USER_AGENT: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    )
+    # 必须用浏览器渲染的域名 (单页应用等)
+    BROWSER_ONLY_DOMAINS: List[str] = ["weixin.qq.com", "zhihu.com", "bilibili.com"]
+
+    # serp, 关键词搜索使用的搜索引擎, 多个引擎时并发搜索并合并结果
+    SERP_ENGINES: List[str] = ["baidu"]
+    SERP_MAX_PAGES: int = 5  # 单个查询最多抓取的搜索结果页数
+    FULL_SEARCH_SLACK: int = 2  # 全量检索时额外抓取的网页数, 用于及时补上失败的网页
+
+    # redirect, 把搜索结果中的跳转链接 (baidu.com/link?url=...) 解析为目标网址, 再按网址去重
+    REDIRECT_RESOLVE_ENABLED: bool = True
+    REDIRECT_STUB_PATTERNS: List[str] = [  # 跳转链接, 正则
+        r"^https?://(www\.)?baidu\.com/link\?",
+        r"^https?://(www|cn)\.bing\.com/ck/a\?",
+    ]
+    REDIRECT_TIMEOUT: float = 3  # 单个跳转链接的请求超时, 秒
+    REDIRECT_CONCURRENCY: int = 16  # 同时解析的跳转链接数
+    REDIRECT_CACHE_TTL: float = 86400  # 秒, 0 表示不缓存
+    REDIRECT_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+
+    # passage, 全量检索的段落模式: 网页切分为段落并向量化, 只返回与查询最相关的段落
+    PASSAGE_TOP_K: int = 8  # 默认返回的段落数
+    PASSAGE_CHUNK_SIZE: int = 500  # 每个段落的字符数上限
+    PASSAGE_EMBED_MODEL: str = ""  # sentence-transformers 模型名或路径, 为空时使用字符 n-gram 哈希向量
+    PASSAGE_EMBED_DIM: int = 2048  # 哈希向量的维度
+    PASSAGE_BATCH_SIZE: int = 64  # 每批向量化的段落数
+    PASSAGE_CACHE_TTL: float = 3600  # 秒, 0 表示不缓存
+    PASSAGE_CACHE_MAX_BYTES: int = 128 * 1024 * 1024
+
+    # batch search, 单次批量请求的查询数和链接数上限
+    BATCH_MAX_QUERIES: int = 20
+    BATCH_MAX_URLS: int = 50
+
+    # serp cache
+    SERP_CACHE_TTL: float = 300  # 秒, 0 表示不缓存
+    SERP_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # page cache, 解析后的网页内容持久化缓存 (sqlite), 路径为空表示不缓存
+    PAGE_CACHE_PATH: str = "cache/pages.sqlite3"
+    PAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PAGE_CACHE_FRESH_TTL: float = 3600  # 超过该秒数的缓存需要重新校验
+
+    # 正文抽取: lxml 为单次解析的抽取器, legacy 为 bs4 + readability + html2text
+    EXTRACT_ENGINE: str = "lxml"
+
+    # parse pool, 网页解析使用的进程池, 0 表示在线程中解析
+    PARSE_WORKERS: int = 2
+    PARSE_INLINE_THRESHOLD: int = 20000  # 小于该字符数的网页直接在事件循环中解析
+    PARSE_START_METHOD: str = "spawn"
+
 
 settings = Setting()  # type: ignore
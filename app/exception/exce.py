@@ -4,3 +4,20 @@ class VectorError(Exception):
 
     def __str__(self):
         return repr(self.value)
+
+
+class AdmissionError(Exception):
+    def __init__(self, value, retry_after: int = 1):
+        self.value = value
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return repr(self.value)
+
+
+class BrowserWorkerError(Exception):
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
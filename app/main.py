@@ -1,5 +1,11 @@
+import time
+
+_import_start = time.perf_counter()
+
 import os.path
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import (
     get_swagger_ui_oauth2_redirect_html,
@@ -7,7 +13,31 @@ from fastapi.openapi.docs import (
 )
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import api_router
+from app.api.resp import RespStatus, resp
+from app.chrome_driver.browser_pool import browser_pool
+from app.chrome_driver.fetcher import http_fetcher
 from app.config.config import settings
+from app.exception.exce import AdmissionError
+from app.utils.metrics import registry
+from app.utils.parse_pool import parse_pool
+from app.utils.proxy_pool import proxy_pool
+from app.utils.warmup import warmup
+
+warmup.record("import", time.perf_counter() - _import_start)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 轻量的组件直接启动, 浏览器池和解析进程池在后台预热, 完成后 /ready 返回 200
+    await http_fetcher.start()
+    await proxy_pool.start()
+    warmup.start()
+    yield
+    await warmup.close()
+    await proxy_pool.close()
+    await http_fetcher.close()
+    await browser_pool.close()
+    await parse_pool.close()
 
 
 # 自定义swagger 文档
@@ -16,6 +46,7 @@ app = FastAPI(
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=None,
+    lifespan=lifespan,
 )
 # swagger 文档
 app.mount(
@@ -30,6 +61,29 @@ def read_main():
     return {"message": "This is your main app"}
 
 
+@app.get("/ready", include_in_schema=False)
+def ready():
+    # 预热完成前返回 503, 供负载均衡的就绪探针使用
+    content = {"ready": warmup.ready, "timings": warmup.timings, "error": warmup.error}
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=content)
+
+
+@app.exception_handler(AdmissionError)
+async def admission_error_handler(request: Request, exc: AdmissionError):
+    # 排队已满, 立即拒绝并告知客户端多久后重试
+    return JSONResponse(
+        status_code=429,
+        content=resp(status_code=RespStatus.tooManyRequests, msg=str(exc.value)).model_dump(),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus 文本格式
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # io = gr.Interface(lambda x: "Hello, " + x + "!", "textbox", "textbox")
 # app = gr.mount_gradio_app(app, io, path=settings.CUSTOM_PATH)
 
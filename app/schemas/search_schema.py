@@ -1,9 +1,33 @@
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from app.config.config import settings
 # from pydantic import HttpUrl
 
+# 可选的搜索引擎, 对应 app.chrome_driver.engines.ENGINES
+Engine = Literal["baidu", "bing"]
+
 
 class SearchData(BaseModel):
     content: Optional[str] = None
     metadata: Optional[dict] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(default_factory=list, max_length=settings.BATCH_MAX_QUERIES)
+    urls: List[str] = Field(default_factory=list, max_length=settings.BATCH_MAX_URLS)
+    num: int = 5  # 每个查询返回的网页数量
+    no_cache: bool = False
+    engines: Optional[List[Engine]] = None
+    budget: Optional[float] = Field(None, gt=0)
+
+
+class QueryResult(BaseModel):
+    query: str
+    results: List[SearchData]
+
+
+class BatchSearchData(BaseModel):
+    queries: List[QueryResult]  # 按请求中的查询顺序分组
+    urls: List[SearchData]  # 与请求中的 urls 一一对应
+    pages: int  # 去重后实际抓取解析的网页数
@@ -1,18 +1,180 @@
+import asyncio
 import time
+from app.chrome_driver.browser_pool import browser_pool
 from app.chrome_driver.chromium import ChromiumLoader
-from app.utils.cleanup_html import cleanup_html
+from app.chrome_driver.fetcher import TIER_CACHE
+from app.chrome_driver.redirects import redirect_resolver
+from app.config.config import settings
+from app.exception.exce import AdmissionError, VectorError
+from app.utils import deadline
+from app.utils.admission import admission
+from app.utils.cache import TTLCache, normalize_query
+from app.utils.limiter import fetch_limiter
+from app.utils.metrics import REQUEST_SECONDS, STAGE_SECONDS, TIMEOUTS
+from app.utils.page_cache import page_cache
+from app.utils.url import canonical_url
+from langchain_core.documents import Document
 from loguru import logger
-from typing import List
-from app.schemas.search_schema import SearchData
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+from app.schemas.search_schema import BatchSearchData, QueryResult, SearchData
+
+
+class SerpEntry(NamedTuple):
+    documents: List[Document]
+    # 翻页在凑够 num 个结果之前就结束了, 更深的搜索也拿不到更多结果
+    exhausted: bool = False
+
+
+def _entry_size(entry: SerpEntry) -> int:
+    # 近似的内存占用, 按字符数估算
+    return sum(len(doc.page_content) + len(str(doc.metadata)) for doc in entry.documents)
+
+
+def _usable(doc: Optional[Document]) -> bool:
+    # 抓取失败 (超时、浏览器出错)、正文为空或解析为 "not found" 的网页不可用
+    return doc is not None and bool(doc.page_content.strip()) and doc.page_content != "not found"
+
+
+def _budget(budget: Optional[float]):
+    # 请求的总耗时预算, 未指定时使用 settings.REQUEST_BUDGET
+    return deadline.budget(settings.REQUEST_BUDGET if budget is None else budget)
 
 
 class WebSearch:
-    
-    def delta_search(self, message: str, num:int) -> List[SearchData]:
+
+    def __init__(self):
+        # 解析后的搜索结果页缓存, key 为 (搜索引擎, 归一化后的查询词)
+        self.serp_cache: TTLCache[SerpEntry] = TTLCache(
+            ttl=settings.SERP_CACHE_TTL,
+            max_bytes=settings.SERP_CACHE_MAX_BYTES,
+            sizeof=_entry_size,
+        )
+
+    async def _asearch_keyword(
+        self,
+        message: str,
+        no_cache: bool = False,
+        engine: str = "baidu",
+        num: Optional[int] = None,
+    ) -> List[Document]:
+        """
+        Scrape and parse the SERP of one engine, going through the SERP cache.
+
+        Result pages after the first are only scraped while fewer than
+        ``num`` results were found. A cached entry with fewer than ``num``
+        results is refreshed with a deeper search, unless pagination reached
+        the last result page when it was loaded; an entry cut short by a
+        failed page or the budget is not reused for a larger ``num``.
+        Redirect stubs are resolved to their targets before caching, see
+        ``RedirectResolver``.
+        """
+
+        async def load() -> SerpEntry:
+            loader = ChromiumLoader(keywords=[message], engine=engine, num=num)
+            documents = await loader.aload()
+            if settings.REDIRECT_RESOLVE_ENABLED:
+                # 缓存解析跳转后的结果, 同一网页的不同跳转链接在抓取前就已去重
+                documents = await redirect_resolver.resolve_documents(documents)
+            return SerpEntry(documents, loader.serp_exhausted)
+
+        key = (engine, normalize_query(message))
+        cached = None if no_cache else self.serp_cache.get(key)
+        if cached is not None and (
+            num is None or len(cached.documents) >= num or cached.exhausted
+        ):
+            return list(cached.documents)
+        entry = await self.serp_cache.get_or_load(
+            key,
+            load,
+            bypass=no_cache or cached is not None,
+            cacheable=lambda entry: bool(entry.documents),
+        )
+        return list(entry.documents)
+
+    async def _asearch_engines(
+        self,
+        message: str,
+        num: Optional[int] = None,
+        engines: Optional[List[str]] = None,
+        no_cache: bool = False,
+    ) -> List[Document]:
+        """
+        Search several engines concurrently and merge their results.
+
+        Results are interleaved by rank in the order of ``engines`` and
+        deduplicated by canonical URL. Each engine pages on until it has
+        ``num`` results, and the merge returns as soon as the engines finished
+        so far yield ``num`` unique results; the other engines' scrapes are
+        then cancelled unless another request is waiting for them.
+        """
+        engines = list(dict.fromkeys(engines or settings.SERP_ENGINES))
+
+        async def search(engine: str) -> Tuple[str, List[Document]]:
+            try:
+                return engine, await self._asearch_keyword(
+                    message, no_cache, engine, num
+                )
+            except AdmissionError:
+                # 浏览器 worker 排队已满, 由接口返回 429
+                raise
+            except Exception as e:
+                logger.error(f"{engine} search error:{e}")
+                return engine, []
+
+        tasks = [asyncio.ensure_future(search(engine)) for engine in engines]
+        results: Dict[str, List[Document]] = {}
+        merged: List[Document] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                engine, documents = await next_done
+                results[engine] = documents
+                merged = self._merge_results(results, engines)
+                if num is not None and len(merged) >= num:
+                    break
+        finally:
+            # 提前返回或请求被取消时取消剩余的搜索, 没有其他请求等待的加载随之取消
+            for task in tasks:
+                task.cancel()
+        return merged
+
+    @staticmethod
+    def _merge_results(
+        results: Dict[str, List[Document]], engines: List[str]
+    ) -> List[Document]:
+        # 按排名轮流从各引擎取结果, 相同网页只保留排名靠前的一条
+        merged = []
+        seen = set()
+        ranked = [results[engine] for engine in engines if engine in results]
+        for position in range(max((len(docs) for docs in ranked), default=0)):
+            for documents in ranked:
+                if position >= len(documents):
+                    continue
+                doc = documents[position]
+                source = doc.metadata.get("source")
+                key = canonical_url(source) if source else id(doc)
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(doc)
+        return merged
+
+    async def adelta_search(
+        self,
+        message: str,
+        num: int,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+        client: str = "",
+    ) -> List[SearchData]:
         """
         func:增量检索
         params:
             message: key words
+            no_cache: 跳过搜索结果缓存, 重新抓取
+            engines: 使用的搜索引擎, 默认为 settings.SERP_ENGINES
+            budget: 总耗时预算(秒), 超出时返回已完成的部分结果, 默认为 settings.REQUEST_BUDGET
+            client: 调用方标识, 排队时按客户端轮转调度
         return:
             [
                 {
@@ -26,23 +188,40 @@ class WebSearch:
             ]
         """
         data = []
-        loader = ChromiumLoader(keywords=[message])
-        documents = loader.load()
+        with _budget(budget), REQUEST_SECONDS.time(method="delta"):
+            async with admission.admit("delta", client):
+                documents = await self._asearch_engines(message, num, engines, no_cache)
         for doc in documents:
             data.append(
                 SearchData(content=doc.page_content, metadata=doc.metadata)
             )
-        
+
         if len(data) >= num:
             return data[:num]
         else:
             return data
 
-    def full_search(self, message: str, num:int) -> List[SearchData]:
+    async def afull_search(
+        self,
+        message: str,
+        num: int,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+        client: str = "",
+        mode: str = "page",
+        top_k: Optional[int] = None,
+    ) -> List[SearchData]:
         """
         func: 全量检索
         params:
             message: key words
+            no_cache: 跳过搜索结果缓存, 重新抓取
+            engines: 使用的搜索引擎, 默认为 settings.SERP_ENGINES
+            budget: 总耗时预算(秒), 超出时返回已完成的部分结果, 默认为 settings.REQUEST_BUDGET
+            client: 调用方标识, 排队时按客户端轮转调度
+            mode: page 返回整个网页; passage 把 num 个网页切分为段落, 只返回与查询最相关的段落
+            top_k: passage 模式返回的段落数, 默认为 settings.PASSAGE_TOP_K
         return:
             [
                 {
@@ -52,46 +231,250 @@ class WebSearch:
                 }
                 ...
             ]
+            passage 模式的 content 为段落, metadata 另有 score 和 passage (段落在网页中的序号), 按 score 排序
         """
         data = []
-        url_parsed_docs = []
-        loader = ChromiumLoader(keywords=[message])
-        documents = loader.load()
-        metadata_list = [doc.metadata for doc in documents]
-        time.sleep(1)
-        url_loader = ChromiumLoader(
-            urls=[item["source"] for item in metadata_list])
-        url_documents = url_loader.load()
-        for url_doc in url_documents:
-            if url_doc.page_content:
-                doc = url_loader.parse_content(url_doc, metadata_list)
-                url_parsed_docs.append(doc)
+        with _budget(budget), REQUEST_SECONDS.time(method="full"):
+            async with admission.admit("full", client):
+                url_parsed_docs = [
+                    doc
+                    async for doc in self.aiter_full_search(message, no_cache, engines, num)
+                ]
+
+        # 按搜索结果排名恢复顺序, 解析失败的网页已由后续结果补上
+        url_parsed_docs = [doc for doc in url_parsed_docs if _usable(doc)]
+        url_parsed_docs.sort(key=lambda doc: doc.metadata["rank"])
+        url_parsed_docs = url_parsed_docs[:num]
+
+        if mode == "passage":
+            # 段落检索只在使用时才导入 numpy 和 faiss
+            from app.utils.passages import passage_retriever
+
+            try:
+                url_parsed_docs = await passage_retriever.aretrieve(
+                    message, url_parsed_docs, top_k or settings.PASSAGE_TOP_K
+                )
+            except VectorError as e:
+                logger.error(f"passage retrieval error:{e}")
             else:
-                continue
+                return [
+                    SearchData(content=doc.page_content, metadata=doc.metadata)
+                    for doc in url_parsed_docs
+                ]
 
         for doc in url_parsed_docs:
             data.append(
                 SearchData(content=doc.page_content, metadata=doc.metadata)
             )
-        
+
         if len(data) >= num:
             return data[:num]
         else:
             return data
-    def url_search(self, url: str) -> List[SearchData]:
+
+    async def aiter_full_search(
+        self,
+        message: str,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        num: Optional[int] = None,
+    ) -> AsyncIterator[Document]:
+        """
+        Search a query and yield each result page as soon as it is parsed.
+
+        Pages are yielded in completion order; ``metadata["rank"]`` holds the
+        position of the page in the search results. ``num`` is the number of
+        usable pages wanted. Pages are fetched in rank order with only
+        ``num + FULL_SEARCH_SLACK`` fetches in flight; a page that fails or
+        parses to nothing usable is replaced by the next result. Fetching
+        stops, and the fetches still in flight are cancelled, as soon as the
+        ``num`` best-ranked usable pages are known.
+        """
+        with STAGE_SECONDS.time(stage="serp_search"):
+            documents = await self._asearch_engines(message, num, engines, no_cache)
+        loader = ChromiumLoader(urls=[])
+        ranked = self._aiter_ranked(
+            documents,
+            len(documents) if num is None else num,
+            lambda url: asyncio.ensure_future(self._aload_page(loader, url)),
+            lambda task: task.cancel(),
+        )
+        try:
+            async for rank, doc in ranked:
+                if doc is None:
+                    continue
+                metadata = {
+                    **documents[rank].metadata,
+                    "rank": rank,
+                    "tier": doc.metadata.get("tier"),
+                }
+                yield Document(page_content=doc.page_content, metadata=metadata)
+        finally:
+            # 调用方提前退出时立即取消剩余的抓取, 不等垃圾回收关闭生成器
+            await ranked.aclose()
+
+    @staticmethod
+    async def _aiter_ranked(
+        documents: List[Document],
+        target: int,
+        load: Callable[[str], asyncio.Future],
+        release: Callable[[asyncio.Future], None],
+    ) -> AsyncIterator[Tuple[int, Optional[Document]]]:
+        """
+        Fetch the result pages of ``documents`` in rank order and yield
+        ``(rank, page)`` as each fetch completes, until the ``target``
+        best-ranked usable pages are known or the budget runs out.
+
+        ``load(url)`` starts or joins the fetch of a page; ``release(task)``
+        is called once for every loaded task when iteration stops, so the
+        caller can cancel fetches that are no longer needed.
+        """
+        # fetch 任务 -> 使用它的排名, 同一网页可能出现在多个排名
+        pending: Dict[asyncio.Future, List[int]] = {}
+        loaded: List[asyncio.Future] = []
+        # rank -> 是否得到了可用的网页
+        resolved: Dict[int, bool] = {}
+        next_rank = 0
+        usable = 0
+
+        def refill() -> None:
+            nonlocal next_rank
+            # 可用的网页数加上在途的抓取数保持在 target + slack, 够数后不再补充
+            window = target + settings.FULL_SEARCH_SLACK if usable < target else 0
+            while next_rank < len(documents) and len(pending) + usable < window:
+                task = load(documents[next_rank].metadata["source"])
+                if task not in pending:
+                    loaded.append(task)
+                pending.setdefault(task, []).append(next_rank)
+                next_rank += 1
+
+        def finished() -> bool:
+            # 排名靠前的 target 个可用网页都已确定, 不会再被更靠前的网页替换
+            count = 0
+            for rank in range(next_rank):
+                if rank not in resolved:
+                    return False
+                count += resolved[rank]
+                if count >= target:
+                    return True
+            return False
+
+        refill()
+        try:
+            while pending and not finished():
+                done, _ = await asyncio.wait(
+                    pending, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    TIMEOUTS.inc(len(pending), stage="budget")
+                    logger.warning(f"Budget exhausted, {len(pending)} pages dropped")
+                    break
+                for task in done:
+                    doc = None if task.cancelled() else task.result()
+                    for rank in pending.pop(task):
+                        # 不可用的网页由后续结果补上
+                        resolved[rank] = _usable(doc)
+                        usable += resolved[rank]
+                        yield rank, doc
+                refill()
+        finally:
+            # 够数或调用方提前退出时释放剩余的抓取
+            for task in loaded:
+                release(task)
+
+    async def astream_full_search(
+        self,
+        message: str,
+        num: int,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+        client: str = "",
+    ) -> AsyncIterator[dict]:
+        """
+        func: 流式全量检索, 每解析完一个网页就返回一条结果
+        params:
+            message: key words
+            num: 返回的网页数量
+            no_cache: 跳过搜索结果缓存, 重新抓取
+            engines: 使用的搜索引擎, 默认为 settings.SERP_ENGINES
+            budget: 总耗时预算(秒), 超出时返回已完成的部分结果, 默认为 settings.REQUEST_BUDGET
+            client: 调用方标识, 排队时按客户端轮转调度
+        return:
+            {"event": "data", "data": SearchData} ...
+            {"event": "summary", "data": {"query", "count", "failed", "partial", "elapsed"}}
+        """
+        start = time.perf_counter()
+        count = 0
+        failed = 0
+        with _budget(budget), REQUEST_SECONDS.time(method="stream"):
+            async with admission.admit("full", client):
+                async for doc in self.aiter_full_search(message, no_cache, engines, num):
+                    if not _usable(doc):
+                        failed += 1
+                        continue
+                    count += 1
+                    yield {
+                        "event": "data",
+                        "data": SearchData(content=doc.page_content, metadata=doc.metadata),
+                    }
+                    if count >= num:
+                        break
+            partial = count < num and deadline.expired()
+
+        yield {
+            "event": "summary",
+            "data": {
+                "query": message,
+                "count": count,
+                "failed": failed,
+                "partial": partial,
+                "elapsed": round(time.perf_counter() - start, 3),
+            },
+        }
+
+    async def aurl_search(
+        self,
+        url: str,
+        links: bool = False,
+        images: bool = False,
+        budget: Optional[float] = None,
+        client: str = "",
+    ) -> List[SearchData]:
         """
         func: 请求链接，解析结果
             request url 请求
+            links: 在 metadata["links"] 中返回网页中的链接
+            images: 在 metadata["images"] 中返回网页中的图片
+            budget: 总耗时预算(秒), 超出时返回已加载的部分网页
+            client: 调用方标识, 排队时按客户端轮转调度
             :return:
         """
         data = []
-        loader = ChromiumLoader(urls=[url])
-        document = loader.load()
+        # 需要链接或图片时必须拿到原始 html, 不读取解析结果缓存
+        loader = ChromiumLoader(urls=[url], use_page_cache=not (links or images))
+        with _budget(budget), REQUEST_SECONDS.time(method="url"):
+            async with admission.admit("url", client):
+                document = await loader.aload()
+        if not document or not document[0].page_content:
+            # 抓取失败
+            return [SearchData(content="parser content error!", metadata={"source": url})]
+        metadata = {"source": url, "tier": document[0].metadata.get("tier")}
 
         try:
-            title, minimized_body, link_urls, image_urls = cleanup_html(
-                str(document[0].page_content), url
-            )
+            if document[0].metadata.get("tier") == TIER_CACHE:
+                parsed_content = document[0].page_content
+            else:
+                # 正文、链接和图片来自同一次解析
+                extracted = await loader.aextract_url_content(
+                    str(document[0].page_content), url, links, images
+                )
+                parsed_content = extracted.markdown
+                await self._acache_page(document[0], parsed_content)
+                if links:
+                    metadata["links"] = extracted.link_urls
+                if images:
+                    metadata["images"] = extracted.image_urls
         except Exception as e:
             logger.error(f"error:{e}")
             return [
@@ -100,11 +483,207 @@ class WebSearch:
                 )
             ]
         else:
-            parsed_content = loader.parse_url_content(minimized_body)
-            data = [
-                SearchData(content=parsed_content, metadata={"source": url})
-            ]
+            data = [SearchData(content=parsed_content, metadata=metadata)]
             return data
 
+    async def abatch_search(
+        self,
+        queries: List[str],
+        urls: Optional[List[str]] = None,
+        num: int = 5,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+        client: str = "",
+    ) -> BatchSearchData:
+        """
+        func: 批量检索, 多个查询的搜索结果页并发抓取, 所有查询和链接中相同的网页只抓取解析一次
+            每个查询与 full_search 一样补抓失败的网页; 每个查询和链接分别占用一个排队名额
+        params:
+            queries: 查询词列表
+            urls: 需要直接解析的链接列表
+            num: 每个查询返回的网页数量
+            no_cache: 跳过搜索结果缓存, 重新抓取
+            engines: 使用的搜索引擎, 默认为 settings.SERP_ENGINES
+            budget: 总耗时预算(秒), 超出时返回已完成的部分结果, 默认为 settings.REQUEST_BUDGET
+            client: 调用方标识, 排队时按客户端轮转调度
+        return:
+            {
+                "queries": [{"query": "xxx", "results": [SearchData, ...]}, ...],
+                "urls": [SearchData, ...],
+                "pages": 去重后抓取的网页数
+            }
+        """
+        queries = list(dict.fromkeys(queries))
+        urls = urls or []
+        loader = ChromiumLoader(urls=[])
+        # 规范化后的 url -> 抓取解析任务, 同一网页只抓取一次
+        pages: Dict[str, asyncio.Future] = {}
+        # 抓取任务 -> 仍在使用它的查询和链接数, 降为 0 时才取消
+        users: Dict[asyncio.Future, int] = {}
+        # 每个查询和链接各占一个排队名额; 限制同时排队的数量, 以免超出单个客户端的排队上限
+        gate = asyncio.Semaphore(settings.ADMISSION_CLIENT_QUEUE)
+
+        def load_page(url: str) -> asyncio.Future:
+            key = canonical_url(url)
+            if key not in pages:
+                pages[key] = asyncio.ensure_future(self._aload_page(loader, url))
+            task = pages[key]
+            users[task] = users.get(task, 0) + 1
+            return task
+
+        def release_page(task: asyncio.Future) -> None:
+            users[task] -= 1
+            if not users[task]:
+                task.cancel()
+
+        async def search(query: str) -> QueryResult:
+            async with gate, admission.admit("full", client):
+                try:
+                    documents = await self._asearch_engines(query, num, engines, no_cache)
+                except AdmissionError:
+                    raise
+                except Exception as e:
+                    logger.error(f"batch search error:{query} {e}")
+                    return QueryResult(query=query, results=[])
+                # 与 full_search 相同的窗口: 失败的网页由后续结果补上, 够数后停止抓取
+                found: Dict[int, Document] = {}
+                ranked = self._aiter_ranked(documents, num, load_page, release_page)
+                try:
+                    async for rank, page in ranked:
+                        if _usable(page):
+                            found[rank] = page  # type: ignore
+                finally:
+                    await ranked.aclose()
+            results = []
+            for rank in sorted(found)[:num]:
+                page = found[rank]
+                metadata = {
+                    **documents[rank].metadata,
+                    "rank": rank,
+                    "tier": page.metadata.get("tier"),
+                }
+                results.append(SearchData(content=page.page_content, metadata=metadata))
+            return QueryResult(query=query, results=results)
+
+        async def fetch(url: str) -> SearchData:
+            async with gate, admission.admit("url", client):
+                task = load_page(url)
+                try:
+                    await asyncio.wait([task], timeout=deadline.remaining())
+                finally:
+                    release_page(task)
+            page = task.result() if task.done() and not task.cancelled() else None
+            if not _usable(page):
+                return SearchData(content="parser content error!", metadata={"source": url})
+            metadata = {"source": url, "tier": page.metadata.get("tier")}  # type: ignore
+            return SearchData(content=page.page_content, metadata=metadata)  # type: ignore
+
+        with _budget(budget), REQUEST_SECONDS.time(method="batch"):
+            jobs = [asyncio.ensure_future(search(query)) for query in queries]
+            jobs += [asyncio.ensure_future(fetch(url)) for url in urls]
+            try:
+                results = await asyncio.gather(*jobs)
+            finally:
+                # 出错或被取消时放弃其余的查询和还没完成的网页
+                for job in jobs:
+                    job.cancel()
+                for task in pages.values():
+                    task.cancel()
+
+        return BatchSearchData(
+            queries=results[: len(queries)],
+            urls=results[len(queries) :],
+            pages=sum(
+                task.done() and not task.cancelled() and task.result() is not None
+                for task in pages.values()
+            ),
+        )
+
+    async def _aload_page(
+        self, loader: ChromiumLoader, url: str
+    ) -> Optional[Document]:
+        # 抓取并解析一个网页, 失败时返回 None
+        try:
+            async with fetch_limiter.limit(url):
+                url_doc = await loader.afetch_url(url)
+        except AdmissionError:
+            raise
+        except Exception as e:
+            logger.error(f"fetch error:{url} {e}")
+            return None
+        if not url_doc.page_content:
+            return None
+        doc = await loader.aparse_content(url_doc, [])
+        if _usable(doc):
+            await self._acache_page(url_doc, doc.page_content)
+        return doc
+
+    @staticmethod
+    async def _acache_page(url_doc: Document, content: str) -> None:
+        # 保存解析结果, 以及用于重新校验的 ETag/Last-Modified 和网页哈希
+        metadata = url_doc.metadata
+        if metadata.get("tier") == TIER_CACHE or "content_hash" not in metadata:
+            return
+        await page_cache.aput(
+            metadata["source"],
+            content,
+            metadata["content_hash"],
+            metadata.get("etag"),
+            metadata.get("last_modified"),
+        )
+
+    def delta_search(
+        self,
+        message: str,
+        num: int,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+    ) -> List[SearchData]:
+        """同步版本的 adelta_search"""
+        return browser_pool.run_sync(
+            self.adelta_search(message, num, no_cache, engines, budget)
+        )
+
+    def full_search(
+        self,
+        message: str,
+        num: int,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+        mode: str = "page",
+        top_k: Optional[int] = None,
+    ) -> List[SearchData]:
+        """同步版本的 afull_search"""
+        return browser_pool.run_sync(
+            self.afull_search(message, num, no_cache, engines, budget, "", mode, top_k)
+        )
+
+    def url_search(
+        self,
+        url: str,
+        links: bool = False,
+        images: bool = False,
+        budget: Optional[float] = None,
+    ) -> List[SearchData]:
+        """同步版本的 aurl_search"""
+        return browser_pool.run_sync(self.aurl_search(url, links, images, budget))
+
+    def batch_search(
+        self,
+        queries: List[str],
+        urls: Optional[List[str]] = None,
+        num: int = 5,
+        no_cache: bool = False,
+        engines: Optional[List[str]] = None,
+        budget: Optional[float] = None,
+    ) -> BatchSearchData:
+        """同步版本的 abatch_search"""
+        return browser_pool.run_sync(
+            self.abatch_search(queries, urls, num, no_cache, engines, budget)
+        )
+
 
 web_search = WebSearch()
@@ -0,0 +1,194 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from app.config.config import settings
+from app.exception.exce import AdmissionError
+from app.utils import deadline
+from app.utils.metrics import ADMISSION_REJECTED, QUEUED_JOBS
+
+# 优先级, 数值越小越先调度: 轻量的增量检索排在全量检索之前
+PRIORITIES = {"delta": 0, "url": 1, "full": 2}
+
+
+class AdmissionController:
+    """
+    Admission control in front of the browser layer.
+
+    At most ``max_active`` jobs run at once. Further jobs wait in a bounded
+    queue, ordered by priority class and, within a class, round-robin across
+    clients so a single client cannot starve the others. A job arriving at
+    a full queue takes the place of the newest waiter of a lower priority
+    class, if there is one, so that under load priority decides admission
+    and not only the order of dequeueing. When the queue (or the client's
+    share of it) is full, or a job's request budget runs out while it
+    waits, :class:`AdmissionError` is raised right away with a
+    ``retry_after`` estimate instead of letting the request time out.
+    """
+
+    def __init__(
+        self,
+        max_active: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        client_queue: Optional[int] = None,
+    ):
+        self.max_active = (
+            max_active
+            or settings.ADMISSION_MAX_ACTIVE
+            or settings.BROWSER_POOL_SIZE * settings.BROWSER_MAX_CONTEXTS
+        )
+        self.max_queue = settings.ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        self.client_queue = client_queue or settings.ADMISSION_CLIENT_QUEUE
+
+        self._active = 0
+        # 每个优先级: client -> 等待中的 future, OrderedDict 的顺序即轮转顺序
+        self._queues: List["OrderedDict[str, Deque[asyncio.Future]]"] = [
+            OrderedDict() for _ in range(max(PRIORITIES.values()) + 1)
+        ]
+        self._queued = 0
+        self._client_queued: Dict[str, int] = {}
+        # 任务耗时的滑动平均, 用于估算 Retry-After
+        self._job_seconds = 1.0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up, for the Retry-After header."""
+        return max(math.ceil(self._job_seconds * (self._queued + 1) / self.max_active), 1)
+
+    def _reject(self, reason: str, message: str) -> AdmissionError:
+        ADMISSION_REJECTED.inc(reason=reason)
+        return AdmissionError(message, self.retry_after())
+
+    def check(self, client: str = "", priority: str = "full") -> None:
+        """
+        Raise :class:`AdmissionError` if a job of ``priority`` from ``client``
+        would be rejected now. Used before starting a streaming response,
+        whose status code cannot change once the body has started.
+        """
+        if self._active < self.max_active and not self._queued:
+            return
+        if self._queued >= self.max_queue and self._victim(PRIORITIES[priority]) is None:
+            raise self._reject("queue_full", "too many requests, queue is full")
+        if self._client_queued.get(client, 0) >= self.client_queue:
+            raise self._reject("client_queue_full", "too many requests from this client")
+
+    @asynccontextmanager
+    async def admit(self, priority: str, client: str = "") -> AsyncIterator[None]:
+        """
+        Hold one of the ``max_active`` job slots for the duration of the block.
+
+        Args:
+            priority (str): Priority class, one of ``PRIORITIES``.
+            client (str): Identity of the caller, for per-client fairness.
+        Raises:
+            AdmissionError: The queue is full or the request budget ran out
+                while waiting.
+        """
+        if self._active < self.max_active and not self._queued:
+            self._active += 1
+        else:
+            self.check(client, priority)
+            await self._wait(PRIORITIES[priority], client)
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._job_seconds = 0.8 * self._job_seconds + 0.2 * (time.monotonic() - start)
+            self._active -= 1
+            self._dispatch()
+
+    async def _wait(self, level: int, client: str) -> None:
+        if self._queued >= self.max_queue:
+            self._evict(level)
+        waiter = asyncio.get_running_loop().create_future()
+        clients = self._queues[level]
+        clients.setdefault(client, deque()).append(waiter)
+        self._queued += 1
+        self._client_queued[client] = self._client_queued.get(client, 0) + 1
+        try:
+            # 排队时间计入请求预算
+            await asyncio.wait_for(waiter, deadline.remaining())
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # 已经被调度, 归还名额
+                self._active -= 1
+                self._dispatch()
+            else:
+                self._remove(clients, client, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("budget", "request budget exhausted while queued")
+            raise
+
+    def _victim(
+        self, level: int
+    ) -> Optional[Tuple["OrderedDict[str, Deque[asyncio.Future]]", str]]:
+        # 优先级低于 level 的最低一级中, 排队最多的客户端
+        for clients in reversed(self._queues[level + 1 :]):
+            if clients:
+                return clients, max(clients, key=lambda client: len(clients[client]))
+        return None
+
+    def _evict(self, level: int) -> None:
+        # 把低优先级客户端最新排队的任务挤出队列, 腾出位置
+        victim = self._victim(level)
+        if victim is None:
+            return
+        clients, client = victim
+        waiter = clients[client].pop()
+        if not clients[client]:
+            del clients[client]
+        self._dequeued(client)
+        if not waiter.done():
+            waiter.set_exception(
+                self._reject("evicted", "too many requests, preempted by a higher priority job")
+            )
+
+    def _remove(
+        self,
+        clients: "OrderedDict[str, Deque[asyncio.Future]]",
+        client: str,
+        waiter: asyncio.Future,
+    ) -> None:
+        waiters = clients.get(client)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del clients[client]
+        self._dequeued(client)
+
+    def _dequeued(self, client: str) -> None:
+        self._queued -= 1
+        self._client_queued[client] -= 1
+        if not self._client_queued[client]:
+            del self._client_queued[client]
+
+    def _dispatch(self) -> None:
+        while self._active < self.max_active and self._queued:
+            clients = next(clients for clients in self._queues if clients)
+            client, waiters = next(iter(clients.items()))
+            waiter = waiters.popleft()
+            # 轮转: 被调度的客户端移到队尾
+            del clients[client]
+            if waiters:
+                clients[client] = waiters
+            self._dequeued(client)
+            if waiter.done():
+                # 等待方已超时或被取消
+                continue
+            self._active += 1
+            waiter.set_result(None)
+
+
+admission = AdmissionController()
+QUEUED_JOBS.set_function(lambda: admission.queued)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so equivalent spellings share one cache key."""
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join(query.split()).lower()
+
+
+class TTLCache(Generic[T]):
+    """
+    In-process LRU cache with a time-to-live and a memory budget.
+
+    Entries expire ``ttl`` seconds after being stored; the least recently
+    used entries are evicted once the summed entry sizes exceed ``max_bytes``.
+    :meth:`get_or_load` coalesces concurrent misses for the same key into a
+    single call of the loader, which is cancelled once no caller waits for it.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = lambda value: 1,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.size = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, int, T]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # 加载任务 -> 等待它的调用方数量
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, _, value = item
+        if expires < time.monotonic():
+            self.pop(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: T) -> None:
+        if self.ttl <= 0:
+            return
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        self.pop(key)
+        self._data[key] = (time.monotonic() + self.ttl, size, value)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.pop(next(iter(self._data)))
+
+    def pop(self, key: Hashable) -> Optional[T]:
+        item = self._data.pop(key, None)
+        if item is None:
+            return None
+        self.size -= item[1]
+        return item[2]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        bypass: bool = False,
+        cacheable: Callable[[T], bool] = bool,
+    ) -> T:
+        """
+        Return the cached value for ``key`` or load it once.
+
+        Args:
+            key: The cache key.
+            loader: Coroutine factory producing the value on a miss.
+            bypass: Skip the cached value and load a fresh one; the result
+                still refreshes the cache.
+            cacheable: Predicate deciding whether a loaded value is stored,
+                so that empty or failed results are not cached.
+
+        A caller that is cancelled stops waiting without affecting the other
+        callers; the load itself is cancelled when the last caller goes away.
+        """
+        if not bypass:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        # 相同 key 的并发请求共享同一个加载任务
+        task = self._inflight.get(key)
+        if task is None:
+
+            async def load() -> T:
+                try:
+                    value = await loader()
+                    if cacheable(value):
+                        self.set(key, value)
+                    return value
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = self._inflight[key] = asyncio.ensure_future(load())
+
+        # shield: 单个调用方被取消时不影响其他等待者, 最后一个等待者离开时才取消加载
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
@@ -1,21 +1,35 @@
 
 from bs4 import BeautifulSoup  
+from enum import Flag, auto
 from minify_html import minify
 from urllib.parse import urljoin
 from typing import Tuple, List, Any
 
 
+class CleanupOutput(Flag):
+    """Outputs of cleanup_html a caller can ask for."""
+
+    TITLE = auto()
+    BODY = auto()
+    LINKS = auto()
+    IMAGES = auto()
+    ALL = TITLE | BODY | LINKS | IMAGES
+
+
 def cleanup_html(
-    html_content: str, base_url: str
+    html_content: str, base_url: str, outputs: CleanupOutput = CleanupOutput.ALL
 ) -> Tuple[Any, str, List[str], List[str]]:
     """
     Processes HTML content by removing unnecessary tags, minifying the HTML, and extracting the title and body content.
 
     Args:
         html_content (str): The HTML content to be processed.
+        base_url (str): The URL relative links and images are resolved against.
+        outputs (CleanupOutput): The outputs the caller needs. Work for the
+            others is skipped and they are returned empty.
 
     Returns:
-        str: A string combining the parsed title and the minified body content. If no body content is found, it indicates so.
+        Tuple: The title, the minified body, the link URLs and the image URLs.
 
     Example:
         >>> html_content = "<html><head><title>Example</title></head><body><p>Hello World!</p></body></html>"
@@ -28,30 +42,35 @@ def cleanup_html(
     soup = BeautifulSoup(html_content, "html.parser")
 
     # Title Extraction
-    title_tag = soup.find("title")
-    title = title_tag.get_text() if title_tag else ""
+    title = ""
+    if CleanupOutput.TITLE in outputs:
+        title_tag = soup.find("title")
+        title = title_tag.get_text() if title_tag else ""
 
     # Script and Style Tag Removal
     for tag in soup.find_all(["script", "style"]):
         tag.extract()
 
     # Links extraction
-    links = soup.find_all("a")
     link_urls = []
-    for link in links:
-        if "href" in link.attrs:
-            link_urls.append(urljoin(base_url, link["href"]))
+    if CleanupOutput.LINKS in outputs:
+        for link in soup.find_all("a"):
+            if "href" in link.attrs:
+                link_urls.append(urljoin(base_url, link["href"]))
 
     # Images extraction
-    images = soup.find_all("img")
     image_urls = []
-    for image in images:
-        if "src" in image.attrs:
-            # if http or https is not present in the image url, join it with the base url
-            if "http" not in image["src"]:
-                image_urls.append(urljoin(base_url, image["src"]))
-            else:
-                image_urls.append(image["src"])
+    if CleanupOutput.IMAGES in outputs:
+        for image in soup.find_all("img"):
+            if "src" in image.attrs:
+                # if http or https is not present in the image url, join it with the base url
+                if "http" not in image["src"]:
+                    image_urls.append(urljoin(base_url, image["src"]))
+                else:
+                    image_urls.append(image["src"])
+
+    if CleanupOutput.BODY not in outputs:
+        return title, "", link_urls, image_urls
 
     # Body Extraction (if it exists)
     body_content = soup.find("body")
@@ -0,0 +1,56 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# 当前请求的截止时间 (time.monotonic), 随 contextvars 传递到请求内创建的所有任务
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def budget(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Give the code in the block a total latency budget.
+
+    Tasks created inside the block inherit the deadline. A nested budget can
+    only shorten the deadline, never extend it. ``None`` or a non-positive
+    value leaves the current deadline unchanged.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: Optional[float] = None, reserve: float = 0) -> Optional[float]:
+    """
+    Seconds left in the current budget minus ``reserve``, never negative.
+
+    Returns ``default`` when no budget is set, otherwise the smaller of the
+    two when ``default`` is given.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    left = max(deadline - time.monotonic() - reserve, 0)
+    return left if default is None else min(left, default)
+
+
+def timeout_ms(default: float, reserve: float = 0) -> float:
+    """A Playwright timeout in milliseconds bounded by the budget; ``default`` is in seconds."""
+    left = remaining(default, reserve)
+    # playwright 中 0 表示不超时, 至少给 1ms
+    return max(left * 1000, 1)  # type:ignore
+
+
+def expired(reserve: float = 0) -> bool:
+    left = remaining(reserve=reserve)
+    return left is not None and left <= 0
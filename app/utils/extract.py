@@ -0,0 +1,381 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+from lxml import etree
+from lxml import html as lxml_html
+
+# 以下规则参考 readability 的打分规则
+_UNLIKELY = re.compile(
+    r"combx|comment|community|disqus|extra|foot|header|menu|remark|rss|shoutbox|"
+    r"sidebar|sponsor|ad-break|agegate|pagination|pager|popup|tweet|twitter",
+    re.I,
+)
+_MAYBE = re.compile(r"and|article|body|column|main|shadow", re.I)
+_POSITIVE = re.compile(
+    r"article|body|content|entry|hentry|main|page|pagination|post|text|blog|story",
+    re.I,
+)
+_NEGATIVE = re.compile(
+    r"combx|comment|com-|contact|foot|footer|footnote|masthead|media|meta|outbrain|"
+    r"promo|related|scroll|shoutbox|sidebar|sponsor|shopping|tags|tool|widget",
+    re.I,
+)
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>", re.I)
+_WS = re.compile(r"\s+")
+_COMMA = re.compile(r"[,，、]")
+
+# 直接丢弃的标签, 不参与打分和输出
+_DROP_TAGS = (
+    "script", "style", "noscript", "iframe", "template", "svg", "canvas",
+    "object", "embed", "head",
+)
+# 表单控件只从选出的正文中删除; 不少 ASP.NET 和政府网站用 form 包住整个 body
+_FORM_TAGS = ("textarea", "input", "button", "select")
+# div 中含有这些标签时不当作段落打分
+_DIV_BLOCK_TAGS = frozenset(
+    ("a", "blockquote", "dl", "div", "img", "ol", "p", "pre", "table", "ul")
+)
+_TAG_WEIGHT = {
+    "div": 5, "pre": 3, "td": 3, "blockquote": 3,
+    "address": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3,
+    "form": -3, "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_BLOCK_TAGS = frozenset(
+    (
+        "address", "article", "aside", "blockquote", "body", "center", "dd", "details",
+        "dialog", "dir", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+        "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+        "menu", "nav", "ol", "p", "pre", "section", "summary", "table", "tbody",
+        "td", "tfoot", "th", "thead", "tr", "ul",
+    )
+)
+_MIN_ARTICLE_LENGTH = 250
+
+
+class ExtractedContent(NamedTuple):
+    title: str
+    markdown: str
+    link_urls: List[str] = []
+    image_urls: List[str] = []
+
+
+def _tag(element: etree._Element) -> str:
+    tag = element.tag
+    return tag.lower() if isinstance(tag, str) else ""
+
+
+def _text(element: etree._Element) -> str:
+    return _WS.sub(" ", element.text_content()).strip()
+
+
+def _class_weight(element: etree._Element) -> int:
+    weight = 0
+    for attr in (element.get("class"), element.get("id")):
+        if attr:
+            if _NEGATIVE.search(attr):
+                weight -= 25
+            if _POSITIVE.search(attr):
+                weight += 25
+    return weight
+
+
+def _link_density(element: etree._Element, text_length: Optional[int] = None) -> float:
+    if text_length is None:
+        text_length = len(_text(element))
+    if not text_length:
+        return 0.0
+    link_length = sum(len(_text(link)) for link in element.iter("a"))
+    return min(link_length / text_length, 1.0)
+
+
+def strip_xml_declaration(html_content: str) -> str:
+    """Drop a leading ``<?xml ...?>``, which lxml rejects in str input."""
+    return _XML_DECLARATION.sub("", html_content, count=1)
+
+
+def _parse(html_content: str) -> etree._Element:
+    return lxml_html.document_fromstring(strip_xml_declaration(html_content))
+
+
+def _strip_noise(document: etree._Element) -> None:
+    etree.strip_elements(document, *_DROP_TAGS, with_tail=False)
+    for comment in list(document.iter(etree.Comment, etree.ProcessingInstruction)):
+        parent = comment.getparent()
+        if parent is not None:
+            comment.drop_tree()  # type:ignore
+
+
+def _remove_unlikely(body: etree._Element) -> None:
+    for element in list(body.iter()):
+        tag = _tag(element)
+        if not tag or tag in ("html", "body"):
+            continue
+        attrs = f"{element.get('class', '')} {element.get('id', '')}"
+        if attrs.strip() and _UNLIKELY.search(attrs) and not _MAYBE.search(attrs):
+            if element.getparent() is not None:
+                element.drop_tree()  # type:ignore
+
+
+def _score(body: etree._Element) -> Dict[etree._Element, float]:
+    scores: Dict[etree._Element, float] = {}
+
+    def add(element: etree._Element, score: float) -> None:
+        if element not in scores:
+            scores[element] = _class_weight(element) + _TAG_WEIGHT.get(_tag(element), 0)
+        scores[element] += score
+
+    for element in body.iter("p", "pre", "td", "div"):
+        if element.tag == "div" and any(
+            _tag(child) in _DIV_BLOCK_TAGS for child in element.iterdescendants()
+        ):
+            continue
+        parent = element.getparent()
+        if parent is None:
+            continue
+        text = _text(element)
+        if len(text) < 25:
+            continue
+        score = 1 + len(_COMMA.split(text)) + min(len(text) / 100, 3)
+        add(parent, score)
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            add(grandparent, score / 2)
+
+    for element in scores:
+        scores[element] *= 1 - _link_density(element)
+    return scores
+
+
+def _main_content(
+    body: etree._Element, scores: Dict[etree._Element, float]
+) -> etree._Element:
+    if not scores:
+        return body
+    best = max(scores, key=scores.__getitem__)
+    parent = best.getparent()
+    if best is body or parent is None or _tag(parent) == "html":
+        return best
+
+    # 与最佳候选同级、得分足够高或像正文段落的节点一并保留
+    threshold = max(10.0, scores[best] * 0.2)
+    content = lxml_html.Element("div")
+    for sibling in list(parent):
+        append = sibling is best or scores.get(sibling, 0) >= threshold
+        if not append and _tag(sibling) == "p":
+            text = _text(sibling)
+            density = _link_density(sibling, len(text))
+            if len(text) > 80:
+                append = density < 0.25
+            else:
+                append = density == 0 and bool(re.search(r"[.。!！?？]( |$)", text))
+        if append:
+            sibling.tail = None
+            content.append(sibling)
+    return content
+
+
+def _sanitize(content: etree._Element, scores: Dict[etree._Element, float]) -> None:
+    etree.strip_elements(content, *_FORM_TAGS, with_tail=False)
+    for heading in list(content.iter("h1", "h2", "h3", "h4", "h5", "h6")):
+        if _class_weight(heading) < 0 or _link_density(heading) > 0.33:
+            heading.drop_tree()  # type:ignore
+
+    # 自底向上清理链接过多、内容过少的块
+    for element in reversed(list(content.iter("form", "table", "ul", "div"))):
+        if element is content or element.getparent() is None:
+            continue
+        weight = _class_weight(element)
+        if weight + scores.get(element, 0) < 0:
+            element.drop_tree()  # type:ignore
+            continue
+        text = _text(element)
+        if len(_COMMA.findall(text)) >= 10:
+            continue
+        paragraphs = len(element.findall(".//p"))
+        images = len(element.findall(".//img"))
+        items = len(element.findall(".//li")) - 100
+        density = _link_density(element, len(text))
+        tag = _tag(element)
+        if (
+            (images > 1 and images > paragraphs)
+            or (items > paragraphs and tag not in ("ul", "ol"))
+            or (len(text) < 25 and (images == 0 or images > 2) and not element.findall(".//pre"))
+            or (weight < 25 and density > 0.2)
+            or (weight >= 25 and density > 0.5)
+        ):
+            element.drop_tree()  # type:ignore
+
+
+class MarkdownEmitter:
+    """Render an lxml subtree as markdown without re-parsing it."""
+
+    def __init__(self, base_url: str = ""):
+        self.base_url = base_url
+
+    def render(self, element: etree._Element) -> str:
+        blocks = self._blocks(element)
+        return "\n\n".join(blocks) + "\n" if blocks else ""
+
+    def _blocks(self, element: etree._Element) -> List[str]:
+        blocks: List[str] = []
+        inline: List[str] = []
+
+        def flush() -> None:
+            text = "".join(inline)
+            inline.clear()
+            lines = [" ".join(line.split()) for line in text.split("\n")]
+            text = "  \n".join(line for line in lines if line)
+            if text:
+                blocks.append(text)
+
+        if element.text:
+            inline.append(_WS.sub(" ", element.text))
+        for child in element:
+            tag = _tag(child)
+            if tag in _BLOCK_TAGS:
+                flush()
+                blocks.extend(self._block(child, tag))
+            elif tag:
+                inline.append(self._inline(child, tag))
+            if child.tail:
+                inline.append(_WS.sub(" ", child.tail))
+        flush()
+        return blocks
+
+    def _block(self, element: etree._Element, tag: str) -> List[str]:
+        if tag in _HEADINGS:
+            text = " ".join(self._inline_children(element).split())
+            return ["#" * _HEADINGS[tag] + " " + text] if text else []
+        if tag == "hr":
+            return ["* * *"]
+        if tag in ("ul", "ol"):
+            lines: List[str] = []
+            index = 0
+            for item in element:
+                if _tag(item) != "li":
+                    continue
+                index += 1
+                prefix = f"  {index}. " if tag == "ol" else "  * "
+                item_lines = "\n".join(self._blocks(item)).split("\n")
+                lines.append(prefix + item_lines[0])
+                lines.extend("    " + line if line else "" for line in item_lines[1:])
+            return ["\n".join(lines)] if lines else []
+        if tag == "pre":
+            text = element.text_content().strip("\n")
+            return ["\n".join("    " + line for line in text.split("\n"))] if text.strip() else []
+        if tag == "blockquote":
+            inner = "\n\n".join(self._blocks(element))
+            return ["\n".join("> " + line if line else ">" for line in inner.split("\n"))] if inner else []
+        if tag == "table":
+            rows = []
+            for row in element.iter("tr"):
+                cells = [
+                    " ".join(self._inline_children(cell).split())
+                    for cell in row
+                    if _tag(cell) in ("td", "th")
+                ]
+                if any(cells):
+                    rows.append(" | ".join(cells))
+            return ["\n".join(rows)] if rows else []
+        return self._blocks(element)
+
+    def _inline_children(self, element: etree._Element) -> str:
+        parts = [_WS.sub(" ", element.text)] if element.text else []
+        for child in element:
+            tag = _tag(child)
+            if tag:
+                parts.append(self._inline(child, tag))
+            if child.tail:
+                parts.append(_WS.sub(" ", child.tail))
+        return "".join(parts)
+
+    def _inline(self, element: etree._Element, tag: str) -> str:
+        if tag == "br":
+            return "\n"
+        if tag == "img":
+            src = element.get("src") or element.get("data-src")
+            if not src or src.startswith("data:"):
+                return ""
+            return f"![{element.get('alt', '').strip()}]({urljoin(self.base_url, src)})"
+        text = self._inline_children(element)
+        stripped = " ".join(text.split())
+        if not stripped:
+            return text if not text.strip() else ""
+        if tag == "a":
+            href = element.get("href", "")
+            if not href or href.startswith(("#", "javascript:")):
+                return text
+            return f"[{stripped}]({urljoin(self.base_url, href)})"
+        if tag in ("strong", "b"):
+            return f"**{stripped}**"
+        if tag in ("em", "i"):
+            return f"_{stripped}_"
+        if tag == "code":
+            return f"`{stripped}`"
+        return text
+
+
+def _collect_urls(
+    document: etree._Element, base_url: str, links: bool, images: bool
+) -> Tuple[List[str], List[str]]:
+    link_urls = (
+        [urljoin(base_url, href) for href in document.xpath("//a/@href")]
+        if links
+        else []
+    )
+    image_urls = []
+    if images:
+        for src in document.xpath("//img/@src"):
+            # 与 cleanup_html 保持一致: 不含 http 的地址按 base_url 补全
+            image_urls.append(src if "http" in src else urljoin(base_url, src))
+    return link_urls, image_urls
+
+
+def extract_content(
+    html_content: str,
+    base_url: str = "",
+    ruthless: bool = True,
+    links: bool = False,
+    images: bool = False,
+) -> ExtractedContent:
+    """
+    Extract the main content of an HTML page as markdown in a single pass.
+
+    One lxml tree is built per page: script/style and other noise is dropped,
+    the main content block is chosen with readability-style scoring, and the
+    markdown is emitted from that same tree.
+
+    Args:
+        html_content (str): The HTML content to be processed.
+        base_url (str): Base URL used to make links and images absolute.
+        ruthless (bool): Drop blocks whose class/id look like navigation,
+            comments, footers, etc. before scoring. When that leaves too
+            little text the page is re-extracted without it.
+        links (bool): Also collect every link URL of the page.
+        images (bool): Also collect every image URL of the page.
+    Returns:
+        ExtractedContent: The page title, the markdown of the main content and,
+        when asked for, the link and image URLs from the same tree.
+    Raises:
+        ValueError: If the page has no body.
+    """
+    document = _parse(html_content)
+    title = _WS.sub(" ", document.findtext(".//title") or "").strip()
+    body = document.find("body")
+    if body is None or not len(body) and not (body.text or "").strip():
+        raise ValueError("No HTML body content found")
+
+    _strip_noise(document)
+    link_urls, image_urls = _collect_urls(document, base_url, links, images)
+    if ruthless:
+        _remove_unlikely(body)
+    scores = _score(body)
+    content = _main_content(body, scores)
+    _sanitize(content, scores)
+
+    if ruthless and len(_text(content)) < _MIN_ARTICLE_LENGTH:
+        return extract_content(html_content, base_url, False, links, images)
+
+    markdown = MarkdownEmitter(base_url).render(content)
+    return ExtractedContent(title, markdown, link_urls, image_urls)
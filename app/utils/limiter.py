@@ -0,0 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+from app.config.config import settings
+
+
+class FetchLimiter:
+    """
+    Process-wide concurrency limits for page fetches.
+
+    A global semaphore bounds the total number of in-flight fetches and a
+    semaphore per host bounds how hard any single site is hit.
+    """
+
+    def __init__(
+        self, concurrency: Optional[int] = None, per_domain: Optional[int] = None
+    ):
+        self.concurrency = concurrency or settings.FETCH_CONCURRENCY
+        self.per_domain = per_domain or settings.FETCH_PER_DOMAIN
+        self._global: Optional[asyncio.Semaphore] = None
+        self._domains: Dict[str, asyncio.Semaphore] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def limit(self, url: str) -> AsyncIterator[None]:
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.concurrency)
+        domain = urlparse(url).hostname or ""
+        semaphore = self._domains.get(domain)
+        if semaphore is None:
+            semaphore = self._domains[domain] = asyncio.Semaphore(self.per_domain)
+        self._waiters[domain] = self._waiters.get(domain, 0) + 1
+        try:
+            # 先占域名额度, 避免单个域名的请求占满全局额度
+            async with semaphore:
+                async with self._global:
+                    yield
+        finally:
+            self._waiters[domain] -= 1
+            if not self._waiters[domain]:
+                del self._waiters[domain]
+                del self._domains[domain]
+
+
+fetch_limiter = FetchLimiter()
@@ -0,0 +1,274 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+LabelValues = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+# 默认的耗时分桶, 秒
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self._samples(),
+        ]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, per label combination."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """
+    A value that goes up and down. With :meth:`set_function` the value is
+    read from a callback when the metrics are rendered, so hot paths pay
+    nothing for it.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed cumulative buckets, per label combination."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 每个标签组合: [各分桶计数..., +Inf 计数, 总和]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def time(self, **labels: str) -> _Timer:
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        lines = []
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(
+    Histogram(
+        "websearch_stage_seconds",
+        "Latency of each scraping and parsing stage.",
+        ["stage"],
+    )
+)
+REQUEST_SECONDS = registry.register(
+    Histogram(
+        "websearch_request_seconds",
+        "Latency of each WebSearch call.",
+        ["method"],
+    )
+)
+TIMEOUTS = registry.register(
+    Counter(
+        "websearch_timeouts_total",
+        "Waits that ran into a timeout or the request budget.",
+        ["stage"],
+    )
+)
+PARSE_FAILURES = registry.register(
+    Counter("websearch_parse_failures_total", "Pages that failed to parse.", ["stage"])
+)
+FETCHES = registry.register(
+    Counter("websearch_fetches_total", "Pages fetched, by fetch tier.", ["tier"])
+)
+BROWSERS = registry.register(
+    Gauge("websearch_browsers", "Browsers currently launched in the pool.")
+)
+PAGES_IN_USE = registry.register(
+    Gauge("websearch_pages_in_use", "Browser contexts currently leased.")
+)
+STARTUP_SECONDS = registry.register(
+    Gauge(
+        "websearch_startup_seconds",
+        "Duration of each startup phase; ready is the process uptime when warm-up finished.",
+        ["phase"],
+    )
+)
+PROXIES = registry.register(
+    Gauge("websearch_healthy_proxies", "Healthy proxies in the proxy pool.")
+)
+QUEUED_JOBS = registry.register(
+    Gauge("websearch_queued_jobs", "Jobs waiting for admission.")
+)
+ADMISSION_REJECTED = registry.register(
+    Counter(
+        "websearch_admission_rejected_total",
+        "Jobs shed by admission control with a 429.",
+        ["reason"],
+    )
+)
+BLOCKED_REQUESTS = registry.register(
+    Counter(
+        "websearch_blocked_requests_total",
+        "Browser requests aborted by the route policy.",
+        ["type"],
+    )
+)
+ALLOWED_BYTES = registry.register(
+    Counter(
+        "websearch_allowed_bytes_total",
+        "Bytes transferred by browser requests the route policy let through.",
+        ["type"],
+    )
+)
+REDIRECTS = registry.register(
+    Counter(
+        "websearch_redirects_total",
+        "Search engine redirect stubs, by resolution result.",
+        ["result"],
+    )
+)
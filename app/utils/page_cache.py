@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+from loguru import logger
+from app.config.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    validated_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha1(html.encode("utf-8", errors="replace")).hexdigest()
+
+
+class CachedPage(NamedTuple):
+    url: str
+    content: str
+    content_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() - self.validated_at < settings.PAGE_CACHE_FRESH_TTL
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    Persistent URL -> parsed content store backed by SQLite.
+
+    The database runs in WAL mode so several uvicorn workers on one host can
+    share it. Entries keep the ETag/Last-Modified validators and a hash of the
+    raw HTML, so stale entries can be revalidated without re-parsing. When the
+    stored content exceeds ``max_bytes`` the least recently accessed entries
+    are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = settings.PAGE_CACHE_PATH if path is None else path
+        self.max_bytes = max_bytes or settings.PAGE_CACHE_MAX_BYTES
+        self._local = threading.local()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite 连接不能跨线程使用, 每个线程一个连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT url, content, content_hash, etag, last_modified, validated_at "
+            "FROM pages WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return CachedPage(*row)
+
+    def put(
+        self,
+        url: str,
+        content: str,
+        html_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        conn = self._connect()
+        now = time.time()
+        size = len(content.encode("utf-8", errors="replace"))
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, content, content_hash, etag, last_modified, size, validated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, content, html_hash, etag, last_modified, size, now, now),
+            )
+        self._evict(conn)
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as revalidated."""
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "UPDATE pages SET validated_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 淘汰到上限的 90%, 避免每次写入都触发淘汰
+        target = total - int(self.max_bytes * 0.9)
+        removed = 0
+        urls = []
+        for url, size in conn.execute("SELECT url, size FROM pages ORDER BY accessed_at"):
+            urls.append((url,))
+            removed += size
+            if removed >= target:
+                break
+        with conn:
+            conn.executemany("DELETE FROM pages WHERE url = ?", urls)
+        logger.info(f"Page cache evicted {len(urls)} entries")
+
+    async def aget(self, url: str) -> Optional[CachedPage]:
+        if not self.enabled:
+            return None
+        try:
+            return await asyncio.to_thread(self.get, url)
+        except sqlite3.Error as e:
+            logger.warning(f"page cache read error:{e}")
+            return None
+
+    async def aput(
+        self,
+        url: str,
+        content: str,
+        html_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(
+                self.put, url, content, html_hash, etag, last_modified
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"page cache write error:{e}")
+
+    async def atouch(self, url: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self.touch, url)
+        except sqlite3.Error as e:
+            logger.warning(f"page cache write error:{e}")
+
+
+page_cache = PageCache()
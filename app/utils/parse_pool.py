@@ -0,0 +1,108 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+from loguru import logger
+from app.config.config import settings
+from app.utils.metrics import STAGE_SECONDS
+
+T = TypeVar("T")
+
+_SAMPLE_HTML = (
+    "<html><head><title>warm up</title></head><body><div class='content'>"
+    + "<p>warm up paragraph, with some text, for the extractor.</p>" * 10
+    + "</div></body></html>"
+)
+
+
+def prime_parsers() -> None:
+    """Import the parsing modules and run each parser once on a sample page."""
+    # 预先导入解析模块, 并跑一遍抽取, 让首个任务不用承担导入开销
+    from app.chrome_driver.chromium import html_to_markdown
+    from app.chrome_driver.engines import ENGINES, parse_serp
+
+    html_to_markdown(_SAMPLE_HTML, "")
+    for name in ENGINES:
+        parse_serp(_SAMPLE_HTML, name)
+
+
+def _ping() -> None:
+    time.sleep(0.05)
+
+
+class ParsePool:
+    """
+    Process pool for CPU-bound HTML parsing.
+
+    Only the raw HTML string goes to a worker and only the compact result
+    comes back. Pages shorter than ``inline_threshold`` characters are parsed
+    inline, since pickling would cost more than the parse itself. With
+    ``workers`` set to 0 large pages are parsed in a thread instead.
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, inline_threshold: Optional[int] = None
+    ):
+        self.workers = settings.PARSE_WORKERS if workers is None else workers
+        self.inline_threshold = (
+            settings.PARSE_INLINE_THRESHOLD
+            if inline_threshold is None
+            else inline_threshold
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(settings.PARSE_START_METHOD),
+            initializer=prime_parsers,
+        )
+
+    async def start(self) -> None:
+        """Start the workers and wait until every one of them is warm."""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        # 同时提交 workers 个任务, 迫使所有进程都启动并完成初始化
+        await asyncio.gather(
+            *(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers))
+        )
+        logger.info(f"Parse pool started with {self.workers} workers")
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., T], html_content: str, *args: Any) -> T:
+        """
+        Run ``fn(html_content, *args)`` off the event loop.
+
+        Args:
+            fn: A picklable module-level parse function.
+            html_content: The raw HTML to parse.
+            *args: Extra picklable arguments.
+        """
+        with STAGE_SECONDS.time(stage=f"parse:{fn.__name__}"):
+            return await self._run(fn, html_content, *args)
+
+    async def _run(self, fn: Callable[..., T], html_content: str, *args: Any) -> T:
+        if len(html_content) < self.inline_threshold:
+            return fn(html_content, *args)
+        if self._executor is None:
+            return await asyncio.to_thread(fn, html_content, *args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, fn, html_content, *args)
+        except BrokenProcessPool:
+            # 某个 worker 异常退出, 重建进程池, 本次在线程中解析
+            logger.error("Parse pool is broken, restarting")
+            self._executor = self._new_executor()
+            return await asyncio.to_thread(fn, html_content, *args)
+
+
+parse_pool = ParsePool()
@@ -0,0 +1,257 @@
+import asyncio
+import re
+import zlib
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from app.config.config import settings
+from app.exception.exce import VectorError
+from app.utils.cache import TTLCache
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.url import canonical_url
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+# 句末标点之后切分, 保留标点
+_SENTENCE = re.compile(r"(?<=[。！？!?；;])|(?<=\.)\s+")
+# 连续的汉字, 或英文单词和数字
+_TOKEN = re.compile(r"[\u4e00-\u9fff]+|[a-z0-9]+")
+
+
+def _pieces(text: str, size: int) -> List[str]:
+    # 段落过长时按句子切分, 句子仍然过长时按长度硬切
+    pieces = []
+    for paragraph in _PARAGRAPH.split(text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= size:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE.split(paragraph):
+            sentence = sentence.strip()
+            pieces.extend(sentence[i : i + size] for i in range(0, len(sentence), size))
+    return [piece for piece in pieces if piece]
+
+
+def chunk_text(text: str, size: int) -> List[str]:
+    """
+    Split page text into passages of at most ``size`` characters.
+
+    Paragraphs are packed together until the next one would not fit; longer
+    paragraphs are split at sentence ends first.
+    """
+    chunks: List[str] = []
+    current = ""
+    for piece in _pieces(text, size):
+        if current and len(current) + len(piece) + 1 > size:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@lru_cache(maxsize=262144)
+def _hash(token: str) -> int:
+    # crc32 在各进程中结果一致, 不受 PYTHONHASHSEED 影响
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _tokens(text: str) -> List[str]:
+    tokens = []
+    for run in _TOKEN.findall(text.lower()):
+        if run[0] >= "\u4e00":
+            # 中文没有分词, 使用单字和相邻两字
+            tokens.extend(run)
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class HashingEmbedder:
+    """
+    Bag of character n-grams hashed into ``dim`` buckets.
+
+    Needs no model and is fast on CPU: a batch of texts becomes one sparse
+    count matrix built with a single ``np.bincount``. Counts are damped with
+    ``log1p``; :meth:`weigh` applies IDF over the passages of the request and
+    L2-normalizes, so inner product is cosine similarity of TF-IDF vectors.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        rows: List[int] = []
+        buckets: List[int] = []
+        for row, text in enumerate(texts):
+            hashed = [_hash(token) % self.dim for token in _tokens(text)]
+            buckets.extend(hashed)
+            rows.extend([row] * len(hashed))
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(buckets, dtype=np.int64)
+        counts = np.bincount(flat, minlength=len(texts) * self.dim)
+        return np.log1p(counts.reshape(len(texts), self.dim)).astype(np.float32)
+
+    @staticmethod
+    def weigh(vectors: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        df = np.count_nonzero(vectors, axis=0)
+        idf = np.log((len(vectors) + 1) / (df + 1)).astype(np.float32) + 1
+        return _normalize(vectors * idf), _normalize(query * idf)
+
+
+class SentenceEmbedder:
+    """Dense embeddings from a local sentence-transformers model, on CPU."""
+
+    def __init__(self, model: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise VectorError(
+                "sentence-transformers is not installed, "
+                "unset PASSAGE_EMBED_MODEL to use the hashing embedder"
+            ) from e
+        self.model = SentenceTransformer(model, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts,
+            batch_size=settings.PASSAGE_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    @staticmethod
+    def weigh(vectors: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return vectors, query
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> Any:
+    if settings.PASSAGE_EMBED_MODEL:
+        return SentenceEmbedder(settings.PASSAGE_EMBED_MODEL)
+    return HashingEmbedder(settings.PASSAGE_EMBED_DIM)
+
+
+def _page_size(value: Tuple[List[str], np.ndarray]) -> int:
+    chunks, vectors = value
+    return sum(len(chunk) for chunk in chunks) + vectors.nbytes
+
+
+class PassageRetriever:
+    """
+    Passage retrieval over the pages scraped for one request.
+
+    Pages are chunked with :func:`chunk_text` and the chunks embedded in
+    batches of ``PASSAGE_BATCH_SIZE`` in a thread; chunks and vectors are
+    cached per page (canonical URL and content checksum), so pages shared by
+    later queries are not embedded again. The request's vectors go into a
+    flat inner-product FAISS index that is searched for the query.
+    """
+
+    def __init__(self):
+        self.cache: TTLCache[Tuple[List[str], np.ndarray]] = TTLCache(
+            ttl=settings.PASSAGE_CACHE_TTL,
+            max_bytes=settings.PASSAGE_CACHE_MAX_BYTES,
+            sizeof=_page_size,
+        )
+
+    @staticmethod
+    def _key(page: Document) -> Tuple[str, int]:
+        source = page.metadata.get("source") or ""
+        return canonical_url(source), zlib.crc32(page.page_content.encode("utf-8"))
+
+    @staticmethod
+    def _embed_pages(pages: List[Document]) -> List[Tuple[List[str], np.ndarray]]:
+        embedder = get_embedder()
+        chunked = [chunk_text(page.page_content, settings.PASSAGE_CHUNK_SIZE) for page in pages]
+        texts = [chunk for chunks in chunked for chunk in chunks]
+        batch = settings.PASSAGE_BATCH_SIZE
+        vectors = (
+            np.concatenate([embedder.encode(texts[i : i + batch]) for i in range(0, len(texts), batch)])
+            if texts
+            else np.zeros((0, embedder.dim), dtype=np.float32)
+        )
+        embedded = []
+        offset = 0
+        for chunks in chunked:
+            embedded.append((chunks, vectors[offset : offset + len(chunks)]))
+            offset += len(chunks)
+        return embedded
+
+    @staticmethod
+    def _search(query: str, vectors: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        try:
+            import faiss
+        except ImportError as e:
+            raise VectorError("faiss-cpu is not installed") from e
+        embedder = get_embedder()
+        vectors, query_vector = embedder.weigh(vectors, embedder.encode([query]))
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        scores, ids = index.search(np.ascontiguousarray(query_vector, dtype=np.float32), top_k)
+        return scores[0], ids[0]
+
+    async def aretrieve(
+        self, query: str, pages: List[Document], top_k: int
+    ) -> List[Document]:
+        """
+        Return the ``top_k`` passages of ``pages`` most relevant to ``query``.
+
+        Args:
+            query (str): The search query.
+            pages (List[Document]): Parsed pages, with ``source`` metadata.
+            top_k (int): Number of passages to return.
+        Returns:
+            List[Document]: Passages ordered by score, with the metadata of
+            their page plus ``score`` and ``passage``, the index of the
+            passage within the page.
+        Raises:
+            VectorError: The embedder or FAISS is not available.
+        """
+        with STAGE_SECONDS.time(stage="passages"):
+            embedded: List[Optional[Tuple[List[str], np.ndarray]]] = [
+                self.cache.get(self._key(page)) for page in pages
+            ]
+            missing = [i for i, value in enumerate(embedded) if value is None]
+            if missing:
+                loaded = await asyncio.to_thread(self._embed_pages, [pages[i] for i in missing])
+                for i, value in zip(missing, loaded):
+                    embedded[i] = value
+                    self.cache.set(self._key(pages[i]), value)
+
+            # (网页序号, 段落序号), 与向量的行一一对应
+            positions = [
+                (page_index, passage)
+                for page_index, (chunks, _) in enumerate(embedded)  # type: ignore
+                for passage in range(len(chunks))
+            ]
+            if not positions:
+                return []
+            vectors = np.concatenate([value[1] for value in embedded])  # type: ignore
+            scores, ids = await asyncio.to_thread(
+                self._search, query, vectors, min(top_k, len(positions))
+            )
+
+        passages = []
+        for score, row in zip(scores, ids):
+            if row < 0:
+                continue
+            page_index, passage = positions[row]
+            page = pages[page_index]
+            metadata = {**page.metadata, "score": round(float(score), 4), "passage": passage}
+            passages.append(
+                Document(page_content=embedded[page_index][0][passage], metadata=metadata)  # type: ignore
+            )
+        return passages
+
+
+passage_retriever = PassageRetriever()
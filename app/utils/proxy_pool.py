@@ -0,0 +1,195 @@
+import asyncio
+import random
+import re
+import time
+from typing import Dict, List, Optional
+from loguru import logger
+from app.config.config import settings
+from app.utils.metrics import PROXIES
+from app.utils.utils import ProxySettings
+
+# 代理本身或到代理的连接出错; 目标网站超时、选择器等待失败等与代理无关
+_PROXY_ERROR = re.compile(
+    r"ERR_(PROXY|TUNNEL|SOCKS)_\w+|ERR_CONNECTION_REFUSED|ECONNREFUSED", re.I
+)
+
+
+def is_proxy_error(error: BaseException) -> bool:
+    """Whether ``error`` from a proxied browser request is the proxy's fault."""
+    return bool(_PROXY_ERROR.search(str(error)))
+
+
+class ProxyStats:
+    """Health record of one proxy server."""
+
+    def __init__(self, server: str):
+        self.server = server
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency: Optional[float] = None  # 成功请求耗时的滑动平均, 秒
+        self.last_checked = 0.0
+
+    @property
+    def success_rate(self) -> float:
+        # 拉普拉斯平滑, 新代理不会因为一次结果被高估或淘汰
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def healthy(self) -> bool:
+        # 偶发的失败只降低成功率, 连续失败达到上限才停用
+        return (
+            self.successes > 0
+            and self.success_rate >= settings.PROXY_MIN_SUCCESS_RATE
+            and self.consecutive_failures < settings.PROXY_MAX_FAILURES
+        )
+
+    @property
+    def score(self) -> float:
+        """Higher is better: success rate divided by latency."""
+        return self.success_rate / ((self.latency or 1.0) + 0.1)
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if latency is not None:
+                self.latency = (
+                    latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+                )
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+
+class ProxyPool:
+    """
+    Background-maintained pool of egress proxies for the browser contexts.
+
+    Candidates come from ``PROXY_SERVERS`` and, optionally, from free-proxy.
+    Every ``check_interval`` seconds all candidates are health-checked
+    concurrently with a GET of ``PROXY_CHECK_URL`` through the proxy, and
+    scored by latency and success rate. :meth:`pick` is a non-blocking,
+    score-weighted random choice among the healthy proxies, so requests
+    rotate egress IPs without waiting on any check. Scores persist across
+    refreshes; proxies that fail ``max_failures`` times in a row and are no
+    longer offered as candidates are forgotten.
+    """
+
+    def __init__(
+        self,
+        servers: Optional[List[str]] = None,
+        enabled: Optional[bool] = None,
+        check_interval: Optional[float] = None,
+        max_failures: Optional[int] = None,
+    ):
+        self.enabled = settings.PROXY_ENABLED if enabled is None else enabled
+        self.servers = settings.PROXY_SERVERS if servers is None else servers
+        self.check_interval = check_interval or settings.PROXY_CHECK_INTERVAL
+        self.max_failures = max_failures or settings.PROXY_MAX_FAILURES
+
+        self._proxies: Dict[str, ProxyStats] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> List[ProxyStats]:
+        return [stats for stats in self._proxies.values() if stats.healthy]
+
+    async def start(self) -> None:
+        """Start health checks in the background, without waiting for the first one."""
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+                logger.info(f"Proxy pool refreshed, {len(self.healthy)} healthy proxies")
+            except Exception as e:
+                logger.error(f"proxy refresh error:{e}")
+            await asyncio.sleep(self.check_interval)
+
+    async def _candidates(self) -> List[str]:
+        candidates = list(self.servers)
+        if settings.PROXY_FREE_ENABLED:
+            try:
+                # free-proxy 是同步请求, 放到线程中执行
+                candidates += await asyncio.to_thread(_free_proxy_list)
+            except Exception as e:
+                logger.warning(f"free proxy list error:{e}")
+        return list(dict.fromkeys(candidates))
+
+    async def refresh(self) -> None:
+        """Merge in new candidates and health-check every proxy concurrently."""
+        candidates = await self._candidates()
+        for server in candidates:
+            if server not in self._proxies:
+                self._proxies[server] = ProxyStats(server)
+
+        semaphore = asyncio.Semaphore(settings.PROXY_CHECK_CONCURRENCY)
+
+        async def check(stats: ProxyStats) -> None:
+            async with semaphore:
+                await self.check(stats)
+
+        await asyncio.gather(*(check(stats) for stats in list(self._proxies.values())))
+        for server, stats in list(self._proxies.items()):
+            if stats.consecutive_failures >= self.max_failures and server not in candidates:
+                del self._proxies[server]
+                logger.info(f"Proxy dropped after {stats.consecutive_failures} failures: {server}")
+
+    async def check(self, stats: ProxyStats) -> bool:
+        """GET ``PROXY_CHECK_URL`` through the proxy and record the outcome."""
+        import httpx
+
+        start = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(
+                proxy=stats.server, timeout=settings.PROXY_CHECK_TIMEOUT
+            ) as client:
+                response = await client.get(settings.PROXY_CHECK_URL)
+            ok = response.status_code < 400
+        except Exception as e:
+            logger.debug(f"proxy check error:{stats.server} {e}")
+            ok = False
+        stats.record(ok, time.perf_counter() - start)
+        stats.last_checked = time.monotonic()
+        return ok
+
+    def pick(self) -> Optional[ProxySettings]:
+        """
+        Choose a proxy for a new browser context.
+
+        Returns:
+            Optional[ProxySettings]: A healthy proxy, chosen at random weighted
+            by score, or None when the pool is disabled or has none.
+        """
+        healthy = self.healthy
+        if not self.enabled or not healthy:
+            return None
+        stats = random.choices(healthy, [s.score for s in healthy])[0]
+        return ProxySettings(server=stats.server)
+
+    def report(self, server: str, ok: bool) -> None:
+        """Feed back the outcome of real traffic through ``server``."""
+        stats = self._proxies.get(server)
+        if stats is not None:
+            stats.record(ok)
+
+
+def _free_proxy_list() -> List[str]:
+    from fp.fp import FreeProxy  # type:ignore
+
+    broker = FreeProxy(country_id=settings.PROXY_FREE_COUNTRIES or None, elite=True)
+    return [f"http://{address}" for address in broker.get_proxy_list(False)]
+
+
+proxy_pool = ProxyPool()
+PROXIES.set_function(lambda: len(proxy_pool.healthy))
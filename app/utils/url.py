@@ -0,0 +1,34 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 不影响网页内容的跟踪参数
+_TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "spm"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so links to the same page compare equal.
+
+    The scheme and host are lowercased, default ports and fragments are
+    dropped, ``utm_*`` and other tracking parameters are removed, the
+    remaining query parameters are sorted and a trailing slash is stripped.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    netloc = host
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
@@ -1,12 +1,8 @@
 import sys
-import requests
 import ipaddress
 import random
 from typing import List, Optional, Set, TypedDict
 
-from fp.errors import FreeProxyException  # type:ignore
-from fp.fp import FreeProxy  # type:ignore
-
 
 class ProxyBrokerCriteria(TypedDict, total=False):
     """proxy broker criteria"""
@@ -67,6 +63,10 @@ def search_proxy_servers(
             "http://113.20.31.250:8080",
         ]
     """
+    import requests
+    from fp.errors import FreeProxyException  # type:ignore
+    from fp.fp import FreeProxy  # type:ignore
+
     proxybroker = FreeProxy(
         anonym=anonymous,
         country_id=countryset,
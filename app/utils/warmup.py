@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+from loguru import logger
+from app.chrome_driver.browser_pool import browser_pool
+from app.chrome_driver.worker_client import browser_worker
+from app.utils.metrics import STARTUP_SECONDS
+from app.utils.parse_pool import parse_pool, prime_parsers
+
+
+def process_uptime() -> Optional[float]:
+    """Seconds since this process started, from /proc (Linux only)."""
+    try:
+        with open("/proc/self/stat") as f:
+            # 进程名可能包含空格, 从最后一个 ")" 之后开始数, starttime 是第 22 个字段
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Warmup:
+    """
+    Warm-up phase run in the background after the app has started.
+
+    Launches the browser pool and leases a page per browser (or waits for
+    the browser workers to accept jobs), starts the parse workers and primes
+    the in-process parsers, all concurrently. The service
+    accepts requests right away (they wait for the browsers if needed), but
+    only reports ready once warm-up is done. Phase durations, the import
+    time and the time from process start to ready are kept in ``timings``
+    and exported as ``websearch_startup_seconds``.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.timings[phase] = round(seconds, 3)
+        STARTUP_SECONDS.set(seconds, phase=phase)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.ready = False
+
+    async def _phase(self, name: str, awaitable) -> None:
+        start = time.perf_counter()
+        await awaitable
+        self.record(name, time.perf_counter() - start)
+
+    async def run(self) -> None:
+        start = time.perf_counter()
+        # 使用独立的浏览器 worker 时只需等待 worker 就绪
+        browsers = browser_worker.wait_ready() if browser_worker.enabled else browser_pool.warm_up()
+        try:
+            await asyncio.gather(
+                self._phase("browsers", browsers),
+                self._phase("parse_pool", parse_pool.start()),
+                self._phase("parsers", asyncio.to_thread(prime_parsers)),
+            )
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"warm up error:{e}")
+            return
+        self.record("warmup", time.perf_counter() - start)
+        uptime = process_uptime()
+        if uptime is not None:
+            self.record("ready", uptime)
+        self.ready = True
+        logger.info(f"Warm up done: {self.timings}")
+
+
+warmup = Warmup()
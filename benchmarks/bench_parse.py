@@ -0,0 +1,215 @@
+"""
+Offline benchmark of the parsing hot path.
+
+Every stage runs over the pages in ``benchmarks/fixtures`` (article pages
+under ``articles``, search result pages under ``serp``), so no network or
+browser is needed. For each stage the report gives throughput (docs/s,
+MB/s), per-call p50/p99 latency and the peak Python heap allocated during one
+pass over the corpus.
+
+The fixtures are synthetic, not captured from Baidu, Bing or the sites they
+imitate: the pages copy the markup the parsers rely on, and the result pages
+are padded with generated ``.c-N{...}`` CSS rules and ``bds.suN=``
+scripts to reach the size of real ones. Numbers are comparable across
+commits, not a measure of production pages; see ``fixtures/README.md``.
+
+Results are written as JSON so two commits can be compared:
+
+    python -m benchmarks.bench_parse --output before.json
+    git checkout <other commit>
+    python -m benchmarks.bench_parse --output after.json --compare before.json
+
+Usage:
+    python -m benchmarks.bench_parse [--rounds 20] [--stage NAME ...]
+        [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+FIXTURES = Path(__file__).parent / "fixtures"
+RESULTS = Path(__file__).parent / "results"
+
+
+class Fixture(NamedTuple):
+    name: str
+    html: str
+    url: str
+    size: int
+
+
+def load_fixtures(kind: str, prefix: str = "") -> List[Fixture]:
+    fixtures = []
+    for path in sorted((FIXTURES / kind).glob(f"{prefix}*.html")):
+        html = path.read_text(encoding="utf-8")
+        fixtures.append(
+            Fixture(
+                path.name,
+                html,
+                f"https://fixtures.local/{kind}/{path.name}",
+                len(html.encode("utf-8")),
+            )
+        )
+    return fixtures
+
+
+def build_stages() -> Dict[str, Callable[[Fixture], Any]]:
+    """Stage name -> function called once per fixture."""
+    from langchain_core.documents import Document
+    from app.chrome_driver.chromium import (
+        ChromiumLoader,
+        extract_page,
+        legacy_html_to_markdown,
+        parse_keyword_html,
+    )
+    from app.chrome_driver.engines import parse_serp
+    from app.utils.cleanup_html import cleanup_html
+    from app.utils.extract import extract_content
+
+    loader = ChromiumLoader(urls=[])
+
+    def parse_content(fixture: Fixture) -> Any:
+        document = Document(page_content=fixture.html, metadata={"source": fixture.url})
+        return loader.parse_content(document, [{"source": fixture.url}])
+
+    return {
+        "cleanup_html": lambda f: cleanup_html(f.html, f.url),
+        "extract_content": lambda f: extract_content(f.html, f.url),
+        "legacy_html_to_markdown": lambda f: legacy_html_to_markdown(f.html, f.url),
+        "extract_page": lambda f: extract_page(f.html, f.url),
+        "parse_content": parse_content,
+        "parse_keyword_html": lambda f: parse_keyword_html(f.html),
+        "parse_serp_bing": lambda f: parse_serp(f.html, "bing"),
+    }
+
+
+def stage_fixtures() -> Dict[str, List[Fixture]]:
+    articles = load_fixtures("articles")
+    return {
+        "cleanup_html": articles,
+        "extract_content": articles,
+        "legacy_html_to_markdown": articles,
+        "extract_page": articles,
+        "parse_content": articles,
+        "parse_keyword_html": load_fixtures("serp", "baidu_"),
+        "parse_serp_bing": load_fixtures("serp", "bing_"),
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def run_stage(
+    fn: Callable[[Fixture], Any], fixtures: List[Fixture], rounds: int
+) -> Dict[str, Any]:
+    # 预热一轮, 排除首次调用的导入和缓存开销
+    for fixture in fixtures:
+        fn(fixture)
+
+    latencies = []
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for fixture in fixtures:
+            t0 = time.perf_counter()
+            fn(fixture)
+            latencies.append(time.perf_counter() - t0)
+            total_bytes += fixture.size
+    elapsed = time.perf_counter() - start
+
+    # 内存单独测量一轮, tracemalloc 会拖慢计时
+    tracemalloc.start()
+    for fixture in fixtures:
+        fn(fixture)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "docs": len(latencies),
+        "seconds": round(elapsed, 6),
+        "docs_per_s": round(len(latencies) / elapsed, 2),
+        "mb_per_s": round(total_bytes / elapsed / 1e6, 3),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: Dict[str, Dict[str, Any]], base: Optional[dict]) -> None:
+    columns = ["docs_per_s", "mb_per_s", "p50_ms", "p99_ms", "peak_kb"]
+    print(f"{'stage':26}" + "".join(f"{c:>14}" for c in columns))
+    for stage, result in results.items():
+        print(f"{stage:26}" + "".join(f"{result[c]:>14}" for c in columns))
+        previous = (base or {}).get("stages", {}).get(stage)
+        if previous:
+            changes = []
+            for c in columns:
+                change = (result[c] - previous[c]) / previous[c] * 100 if previous[c] else 0
+                changes.append(f"{change:+.1f}%")
+            print(f"{'  vs ' + str(base.get('commit')):26}" + "".join(f"{c:>14}" for c in changes))  # type:ignore
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--stage", action="append", help="run only these stages")
+    parser.add_argument("--output", type=Path, help="JSON file to write")
+    parser.add_argument("--compare", type=Path, help="JSON file of an earlier run")
+    args = parser.parse_args(argv)
+
+    stages = build_stages()
+    fixtures = stage_fixtures()
+    names = args.stage or list(stages)
+    unknown = set(names) - set(stages)
+    if unknown:
+        parser.error(f"unknown stage: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in names:
+        if not fixtures[name]:
+            print(f"skip {name}: no fixtures", file=sys.stderr)
+            continue
+        results[name] = run_stage(stages[name], fixtures[name], args.rounds)
+
+    base = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, base)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rounds": args.rounds,
+        "stages": results,
+    }
+    output = args.output or RESULTS / f"{report['commit'] or 'latest'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
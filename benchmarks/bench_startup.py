@@ -0,0 +1,151 @@
+"""
+Startup benchmark: import time of the app and time to the first ready request.
+
+The import phase runs ``python -X importtime -c "import app.main"`` in a fresh
+interpreter ``--rounds`` times and reports the median total and the
+top-level packages that cost the most. With ``--serve`` the service is also
+started under uvicorn and polled until ``/`` answers (listening) and until
+``/ready`` returns 200 (warm-up done), timed from process spawn; the warm-up
+phase timings reported by ``/ready`` are included.
+
+    python -m benchmarks.bench_startup --serve --output startup.json
+
+Usage:
+    python -m benchmarks.bench_startup [--rounds 5] [--top 15] [--serve]
+        [--port 8765] [--timeout 120] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = Path(__file__).parent.parent
+
+
+def import_profile() -> Tuple[float, Dict[str, float]]:
+    """Total import seconds of app.main and self seconds per top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages: Dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # 表头
+        name = fields[2].strip()
+        packages[name.split(".")[0]] += self_us / 1e6
+        if name == "app.main":
+            total = cumulative_us / 1e6
+    return total, packages
+
+
+def measure_imports(rounds: int, top: int) -> dict:
+    totals = []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(rounds):
+        total, by_package = import_profile()
+        totals.append(total)
+        for name, seconds in by_package.items():
+            packages[name].append(seconds)
+    ranked = sorted(
+        ((name, statistics.median(values)) for name, values in packages.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        "total_s": round(statistics.median(totals), 3),
+        "packages_s": {name: round(seconds, 3) for name, seconds in ranked[:top]},
+    }
+
+
+def wait_for(url: str, deadline: float, status: int = 200) -> Optional[httpx.Response]:
+    while time.perf_counter() < deadline:
+        try:
+            response = httpx.get(url, timeout=1)
+            if response.status_code == status:
+                return response
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def measure_serve(port: int, timeout: float) -> dict:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=ROOT,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = start + timeout
+    base = f"http://127.0.0.1:{port}"
+    try:
+        listening = wait_for(base + "/", deadline)
+        listening_s = time.perf_counter() - start if listening else None
+        ready = wait_for(base + "/ready", deadline)
+        ready_s = time.perf_counter() - start if ready else None
+        try:
+            state = httpx.get(base + "/ready", timeout=1).json()
+        except (httpx.HTTPError, ValueError):
+            state = {}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        "listening_s": listening_s and round(listening_s, 3),
+        "ready_s": ready_s and round(ready_s, 3),
+        "warmup": state.get("timings", {}),
+        "error": state.get("error"),
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--serve", action="store_true", help="also time uvicorn to /ready")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output", type=Path, help="JSON file to write")
+    args = parser.parse_args(argv)
+
+    report = {"imports": measure_imports(args.rounds, args.top)}
+    print(f"import app.main: {report['imports']['total_s']} s (median of {args.rounds})")
+    for name, seconds in report["imports"]["packages_s"].items():
+        print(f"  {name:32}{seconds:>8.3f} s")
+
+    if args.serve:
+        report["serve"] = serve = measure_serve(args.port, args.timeout)
+        print(f"listening after {serve['listening_s']} s, ready after {serve['ready_s']} s")
+        for phase, seconds in serve["warmup"].items():
+            print(f"  {phase:32}{seconds:>8.3f} s")
+        if serve["error"]:
+            print(f"warm up error: {serve['error']}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if not args.serve or report["serve"]["ready_s"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,125 @@
+"""
+Local stand-in for an egress HTTP proxy.
+
+Forwards plain HTTP requests in absolute form (``GET http://host/path``) and
+tunnels ``CONNECT`` requests, so both httpx health checks and Chromium can use
+it. ``--latency`` delays every request and ``--fail-ratio`` answers a share of
+them with 502, to exercise the scoring of the proxy pool:
+
+    python -m benchmarks.loadtest.fake_proxy --port 8899 &
+    python -m benchmarks.loadtest.fake_proxy --port 8898 --fail-ratio 0.5 &
+    PROXY_ENABLED=1 PROXY_SERVERS='["http://127.0.0.1:8899","http://127.0.0.1:8898"]' \\
+        PROXY_CHECK_URL=http://127.0.0.1:8900/ uvicorn app.main:app
+
+Usage:
+    python -m benchmarks.loadtest.fake_proxy [--port 8899] [--latency 0]
+        [--fail-ratio 0]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+config = argparse.Namespace(latency=0.0, fail_ratio=0.0)
+
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[str, List[bytes]]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        headers.append(line)
+    return request_line, headers
+
+
+async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line, headers = await read_head(client_reader)
+        method, target, version = request_line.split(" ", 2)
+    except ValueError:
+        client_writer.close()
+        return
+
+    await asyncio.sleep(random.uniform(0, 2 * config.latency) / 1000)
+    if random.random() < config.fail_ratio:
+        client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+        await client_writer.drain()
+        client_writer.close()
+        return
+
+    try:
+        if method == "CONNECT":
+            host, _, port = target.rpartition(":")
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, int(port))
+            client_writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+            await client_writer.drain()
+        else:
+            url = urlsplit(target)
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                url.hostname, url.port or 80
+            )
+            path = url.path or "/"
+            if url.query:
+                path += "?" + url.query
+            # 转发时改为普通的 origin-form 请求, 并去掉代理相关的请求头
+            upstream_writer.write(f"{method} {path} {version}\r\n".encode("latin-1"))
+            for header in headers:
+                if not header.lower().startswith((b"proxy-", b"connection:")):
+                    upstream_writer.write(header)
+            upstream_writer.write(b"Connection: close\r\n\r\n")
+            await upstream_writer.drain()
+    except OSError:
+        client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+        await client_writer.drain()
+        client_writer.close()
+        return
+
+    await asyncio.gather(
+        pipe(client_reader, upstream_writer), pipe(upstream_reader, client_writer)
+    )
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency", type=float, default=0, help="mean ms per request")
+    parser.add_argument("--fail-ratio", type=float, default=0)
+    args = parser.parse_args(argv)
+
+    config.latency = args.latency
+    config.fail_ratio = args.fail_ratio
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,179 @@
+"""
+Local stand-in for Baidu and the pages it links to.
+
+Serves Baidu-shaped pages so the service can be load-tested without touching
+the real site: a home page with ``input[name="wd"]`` and ``#su``, result pages
+with ``#content_left``, ``se_com_default`` results and an ``a.n`` next-page
+link, and article pages of configurable latency and size. Results link
+straight to the articles, so the HTTP tier can fetch them; ``--spa-ratio`` of
+the articles are JavaScript-rendered shells that force the browser tier.
+With ``--redirects`` results link to ``/link?url=...`` stubs instead, with a
+new token on every result page like Baidu; most stubs answer with a 302, every
+third one with a meta refresh page. The service treats ``/link?`` on the
+``BAIDU_URL`` host as a redirect stub, so it resolves these without changing
+``REDIRECT_STUB_PATTERNS``.
+
+Point the service at it with the ``BAIDU_URL`` setting:
+
+    python -m benchmarks.loadtest.fake_server --port 8900
+    BAIDU_URL=http://127.0.0.1:8900/ uvicorn app.main:app
+
+Usage:
+    python -m benchmarks.loadtest.fake_server [--port 8900]
+        [--serp-latency 200] [--article-latency 300] [--jitter 0.5]
+        [--article-size 40] [--spa-ratio 0.1] [--results 10] [--pages 5]
+        [--redirects]
+"""
+
+import argparse
+import asyncio
+import base64
+import html
+import json
+import random
+import sys
+from typing import List
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+
+PARAGRAPH = (
+    "这是用于压力测试的正文段落，内容由本地服务生成，用来模拟新闻和博客网页的正文。"
+    "The quick brown fox jumps over the lazy dog, repeated to pad the page. "
+)
+
+app = FastAPI()
+config = argparse.Namespace(
+    serp_latency=200.0,
+    article_latency=300.0,
+    jitter=0.5,
+    article_size=40,
+    spa_ratio=0.1,
+    results=10,
+    pages=5,
+    redirects=False,
+)
+
+
+async def delay(mean_ms: float) -> None:
+    # 在均值上下 jitter 比例内随机, 模拟真实网络的抖动
+    spread = mean_ms * config.jitter
+    await asyncio.sleep(max(mean_ms + random.uniform(-spread, spread), 0) / 1000)
+
+
+def search_form(keyword: str = "") -> str:
+    return (
+        '<form id="form" name="f" action="/s">'
+        f'<input id="kw" name="wd" value="{html.escape(keyword)}" autocomplete="off">'
+        '<input type="submit" id="su" value="百度一下"></form>'
+    )
+
+
+@app.get("/", response_class=HTMLResponse)
+async def home() -> str:
+    await delay(config.serp_latency / 4)
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>百度一下</title></head>"
+        f"<body><div id='head'>{search_form()}</div></body></html>"
+    )
+
+
+@app.get("/s", response_class=HTMLResponse)
+async def serp(request: Request, wd: str = "", pn: int = 0) -> str:
+    await delay(config.serp_latency)
+    base = str(request.base_url)
+    keyword = html.escape(wd)
+    items: List[str] = []
+    for i in range(config.results):
+        n = pn + i
+        href = f"{base}article/{n}?q={keyword}"
+        if config.redirects:
+            href = f"{base}link?url={link_token(href)}"
+        items.append(
+            f'<div class="result c-container new-pmd" tpl="se_com_default" id="{n + 1}">'
+            f'<h3 class="t"><a href="{href}">{keyword} 结果 {n}</a></h3>'
+            f'<div class="c-row"><div class="c-span-last">{keyword} 的第 {n} 条摘要，'
+            "用于测试搜索结果解析。</div></div></div>"
+        )
+    next_link = (
+        f'<a class="n" href="/s?wd={keyword}&pn={pn + config.results}">下一页 &gt;</a>'
+        if pn // config.results + 1 < config.pages
+        else ""
+    )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{keyword}_百度搜索</title></head><body>"
+        f"<div id='head'>{search_form(wd)}</div>"
+        f"<div id='content_left'>{''.join(items)}</div>"
+        f"<div id='page'>{next_link}</div></body></html>"
+    )
+
+
+def link_token(target: str) -> str:
+    # 目标地址加上随机前缀, 同一网页每次得到不同的跳转链接
+    salt = "%08x" % random.getrandbits(32)
+    return base64.urlsafe_b64encode(f"{salt}|{target}".encode("utf-8")).decode("ascii")
+
+
+@app.get("/link")
+async def link(url: str):
+    await delay(config.serp_latency / 10)
+    target = base64.urlsafe_b64decode(url.encode("ascii")).decode("utf-8").split("|", 1)[1]
+    if int(url.encode("ascii").hex(), 16) % 3 == 0:
+        return HTMLResponse(
+            f'<meta http-equiv="refresh" content="0;URL=\'{html.escape(target)}\'">'
+            f'<script>window.location.replace("{target}")</script>'
+        )
+    return RedirectResponse(target, status_code=302)
+
+
+@app.get("/article/{article_id}", response_class=HTMLResponse)
+async def article(article_id: int, q: str = "") -> str:
+    await delay(config.article_latency)
+    title = f"{html.escape(q)} 文章 {article_id}"
+    repeat = max(config.article_size * 1024 // len(PARAGRAPH.encode("utf-8")), 1)
+    body = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(repeat))
+    # 按文章编号固定一部分为前端渲染的页面, 保证同一 url 每次结果相同
+    if random.Random(article_id).random() < config.spa_ratio:
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{title}</title></head><body><div id='app'></div>"
+            "<noscript>You need to enable JavaScript to run this app.</noscript>"
+            "<script>document.getElementById('app').innerHTML = "
+            + json.dumps(f"<article><h1>{title}</h1>{body}</article>", ensure_ascii=False)
+            + ";</script>"
+            "</body></html>"
+        )
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{title}</title></head><body>"
+        "<div class='nav'><a href='/'>首页</a> <a href='/s?wd=news'>新闻</a></div>"
+        f"<article><h1>{title}</h1>{body}</article>"
+        "<div class='footer'>load test fixture</div></body></html>"
+    )
+
+
+def main(argv: List[str]) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--serp-latency", type=float, default=200, help="ms")
+    parser.add_argument("--article-latency", type=float, default=300, help="ms")
+    parser.add_argument("--jitter", type=float, default=0.5, help="fraction of latency")
+    parser.add_argument("--article-size", type=int, default=40, help="KB")
+    parser.add_argument("--spa-ratio", type=float, default=0.1)
+    parser.add_argument("--results", type=int, default=10, help="results per page")
+    parser.add_argument("--pages", type=int, default=5, help="result pages per query")
+    parser.add_argument("--redirects", action="store_true", help="link results via /link stubs")
+    args = parser.parse_args(argv)
+
+    for key, value in vars(args).items():
+        if hasattr(config, key):
+            setattr(config, key, value)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
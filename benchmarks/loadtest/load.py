@@ -0,0 +1,207 @@
+"""
+Open-loop load generator for the search API.
+
+Requests are started at a fixed rate (``--rps``) for ``--duration`` seconds,
+regardless of how fast earlier ones finish, spread over the endpoints by
+``--mix``. The report gives throughput, latency percentiles and error rate per
+endpoint, plus the resident memory of all Chromium processes on the host,
+sampled once a second. Run it against a service whose ``BAIDU_URL`` points at
+``benchmarks.loadtest.fake_server``:
+
+    python -m benchmarks.loadtest.fake_server --port 8900 &
+    BAIDU_URL=http://127.0.0.1:8900/ uvicorn app.main:app --port 8000 &
+    python -m benchmarks.loadtest.load --rps 5 --duration 60
+
+Usage:
+    python -m benchmarks.loadtest.load [--target http://127.0.0.1:8000]
+        [--fake http://127.0.0.1:8900] [--rps 5] [--duration 60]
+        [--mix delta=5,full=2,url=3] [--num 5] [--timeout 60] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+import httpx
+
+API = "/api/tali"
+ENDPOINTS = {
+    "delta": "/web_delta_search",
+    "full": "/web_full_search",
+    "url": "/web_url_search",
+}
+KEYWORDS = ["跨海高铁", "python 异步", "新能源汽车", "量子计算", "城市更新", "人工智能"]
+
+
+class Sample(NamedTuple):
+    endpoint: str
+    latency: float
+    ok: bool
+
+
+def chromium_rss() -> int:
+    """Summed RSS in bytes of every Chromium process, read from /proc (Linux only)."""
+    total = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read()
+            if b"chrom" not in cmdline.lower():
+                continue
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    weights = []
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint: {name}")
+        weights.append((name, float(weight or 1)))
+    return weights
+
+
+def build_params(endpoint: str, args: argparse.Namespace) -> Dict[str, object]:
+    if endpoint == "url":
+        article = random.randrange(1000)
+        return {"query": f"{args.fake.rstrip('/')}/article/{article}?q=load"}
+    # 关键词带上随机后缀, 避免全部命中搜索结果缓存
+    keyword = f"{random.choice(KEYWORDS)} {random.randrange(args.keywords)}"
+    return {"query": keyword, "num": args.num}
+
+
+async def call(
+    client: httpx.AsyncClient, endpoint: str, args: argparse.Namespace
+) -> Sample:
+    start = time.perf_counter()
+    try:
+        response = await client.get(
+            API + ENDPOINTS[endpoint], params=build_params(endpoint, args)
+        )
+        ok = response.status_code == 200 and response.json().get("code") == 200
+    except (httpx.HTTPError, ValueError):
+        ok = False
+    return Sample(endpoint, time.perf_counter() - start, ok)
+
+
+async def sample_rss(samples: List[int], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        samples.append(await asyncio.to_thread(chromium_rss))
+        try:
+            await asyncio.wait_for(stop.wait(), 1)
+        except asyncio.TimeoutError:
+            pass
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Dict[str, float]]:
+    groups: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        groups[sample.endpoint].append(sample)
+        groups["all"].append(sample)
+    report = {}
+    for name, group in groups.items():
+        latencies = [s.latency for s in group if s.ok] or [0.0]
+        errors = sum(not s.ok for s in group)
+        report[name] = {
+            "requests": len(group),
+            "throughput_rps": round((len(group) - errors) / elapsed, 3),
+            "error_rate": round(errors / len(group), 4),
+            "p50_s": round(percentile(latencies, 0.5), 3),
+            "p90_s": round(percentile(latencies, 0.9), 3),
+            "p99_s": round(percentile(latencies, 0.99), 3),
+            "max_s": round(max(latencies), 3),
+        }
+    return report
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mix = parse_mix(args.mix)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    rss: List[int] = []
+    stop = asyncio.Event()
+    sampler = asyncio.ensure_future(sample_rss(rss, stop))
+    tasks = []
+    start = time.perf_counter()
+    async with httpx.AsyncClient(
+        base_url=args.target, timeout=args.timeout, limits=limits
+    ) as client:
+        total = int(args.rps * args.duration)
+        for i in range(total):
+            # 开环: 按计划时间发出请求, 不等待之前的请求完成
+            await asyncio.sleep(max(start + i / args.rps - time.perf_counter(), 0))
+            endpoint = random.choices(names, weights)[0]
+            tasks.append(asyncio.ensure_future(call(client, endpoint, args)))
+        samples = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await sampler
+
+    return {
+        "target": args.target,
+        "rps": args.rps,
+        "duration": args.duration,
+        "mix": args.mix,
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": summarize(list(samples), elapsed),
+        "chromium_rss_mb": {
+            "peak": round(max(rss, default=0) / 2**20, 1),
+            "mean": round(sum(rss) / len(rss) / 2**20, 1) if rss else 0,
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    columns = ["requests", "throughput_rps", "error_rate", "p50_s", "p90_s", "p99_s", "max_s"]
+    print(f"{'endpoint':10}" + "".join(f"{c:>16}" for c in columns))
+    for name, result in report["endpoints"].items():
+        print(f"{name:10}" + "".join(f"{result[c]:>16}" for c in columns))
+    rss = report["chromium_rss_mb"]
+    print(f"chromium rss: peak {rss['peak']} MB, mean {rss['mean']} MB")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--fake", default="http://127.0.0.1:8900", help="fake server url")
+    parser.add_argument("--rps", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--mix", default="delta=5,full=2,url=3")
+    parser.add_argument("--num", type=int, default=5)
+    parser.add_argument("--keywords", type=int, default=50, help="distinct keywords")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", type=Path, help="JSON file to write")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if report["endpoints"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Union
+
+import pytest
+
+# settings 在导入 app 时读取环境变量, 必须在导入之前设置
+os.environ.setdefault("IS_DEV", "1")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "websearch-tests.log"))
+os.environ.setdefault("PAGE_CACHE_PATH", "")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ITEM = (
+    '<div tpl="se_com_default"><h3><a href="http://site{0}.com/">标题 {0}</a></h3>'
+    "<div><span>摘要 {0}</span></div></div>"
+)
+ARTICLE = (
+    "<html><head><title>T</title></head><body><article><h1>T</h1>"
+    + "<p>这是正文内容，包含很多文字，用于测试检索。</p>" * 20
+    + "</article></body></html>"
+)
+
+
+def serp_page(ranks, next_page: bool = False) -> str:
+    """A Baidu result page linking to ``http://site{rank}.com/``."""
+    items = "".join(ITEM.format(rank) for rank in ranks)
+    pager = '<div id="page"><a class="n" href="/s?pn=10">下一页 &gt;</a></div>' if next_page else ""
+    return f'<html><body><div id="content_left">{items}</div>{pager}</body></html>'
+
+
+class FakeWeb:
+    """
+    Stands in for the browser: ``results`` search results, ``per_page`` to a
+    result page, and ``ARTICLE`` for every result unless ``pages`` maps its
+    URL to other HTML or to an exception to raise.
+    """
+
+    article = ARTICLE
+    serp_page = staticmethod(serp_page)
+
+    def __init__(self, results: int = 3, per_page: int = 10):
+        self.results = results
+        self.per_page = per_page
+        self.pages: Dict[str, Union[str, BaseException]] = {}
+        self.searched: List[str] = []
+        self.fetched: List[str] = []
+
+    async def scrape_keyword(self, loader, keyword, missing=lambda: 0):
+        self.searched.append(keyword)
+        offset = 0
+        while True:
+            end = min(offset + self.per_page, self.results)
+            yield serp_page(range(offset, end), next_page=end < self.results)
+            offset = end
+            if offset >= self.results or missing() <= 0:
+                return
+
+    async def scrape_url(self, loader, url):
+        self.fetched.append(url)
+        page = self.pages.get(url, ARTICLE)
+        if isinstance(page, BaseException):
+            raise page
+        return page
+
+
+@pytest.fixture
+def web(monkeypatch):
+    from app.chrome_driver.chromium import ChromiumLoader
+    from app.config.config import settings
+
+    fake = FakeWeb()
+    monkeypatch.setattr(
+        ChromiumLoader,
+        "ascrape_keyword_playwright",
+        lambda loader, keyword, missing=lambda: 0: fake.scrape_keyword(loader, keyword, missing),
+    )
+    monkeypatch.setattr(
+        ChromiumLoader, "ascrape_url_playwright", lambda loader, url: fake.scrape_url(loader, url)
+    )
+    # 只走浏览器抓取, 不发出真实的 HTTP 请求
+    monkeypatch.setattr(settings, "HTTP_FETCH_ENABLED", False)
+    return fake
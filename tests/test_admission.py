@@ -0,0 +1,163 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+import pytest
+
+from app.exception.exce import AdmissionError
+from app.utils import deadline
+from app.utils.admission import AdmissionController
+
+
+class Jobs:
+    """Jobs holding an admission slot until released, recording start order."""
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+        self.started: List[str] = []
+        self.release = asyncio.Event()
+
+    def submit(
+        self, name: str, priority: str = "full", client: str = "", budget: Optional[float] = None
+    ) -> asyncio.Task:
+        async def job() -> str:
+            with deadline.budget(budget):
+                async with self.controller.admit(priority, client):
+                    self.started.append(name)
+                    await self.release.wait()
+            return name
+
+        return asyncio.ensure_future(job())
+
+    async def settle(self) -> None:
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def finish(self, *tasks: asyncio.Task) -> List[object]:
+        self.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_queued_jobs_run_by_priority():
+    async def main() -> Tuple[List[str], int]:
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=10, client_queue=10))
+        tasks = [jobs.submit("running")]
+        await jobs.settle()
+        tasks += [jobs.submit("full", "full"), jobs.submit("url", "url"), jobs.submit("delta", "delta")]
+        await jobs.settle()
+        await jobs.finish(*tasks)
+        return jobs.started, jobs.controller.active
+
+    started, active = run(main())
+    assert started == ["running", "delta", "url", "full"]
+    assert active == 0
+
+
+def test_clients_are_served_round_robin():
+    async def main() -> List[str]:
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=10, client_queue=10))
+        tasks = [jobs.submit("running")]
+        await jobs.settle()
+        tasks += [jobs.submit(f"a{i}", client="a") for i in range(3)]
+        tasks += [jobs.submit(f"b{i}", client="b") for i in range(2)]
+        await jobs.settle()
+        await jobs.finish(*tasks)
+        return jobs.started
+
+    assert run(main()) == ["running", "a0", "b0", "a1", "b1", "a2"]
+
+
+def test_full_queue_rejects_with_retry_after():
+    async def main():
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=2, client_queue=10))
+        tasks = [jobs.submit("running"), jobs.submit("q1"), jobs.submit("q2")]
+        await jobs.settle()
+        rejected = jobs.submit("q3")
+        await jobs.settle()
+        assert rejected.done()
+        error = rejected.exception()
+        await jobs.finish(*tasks)
+        return error, jobs.started
+
+    error, started = run(main())
+    assert isinstance(error, AdmissionError)
+    assert error.retry_after >= 1
+    assert started == ["running", "q1", "q2"]
+
+
+def test_client_share_of_queue_is_bounded():
+    async def main():
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=10, client_queue=1))
+        tasks = [jobs.submit("running"), jobs.submit("a0", client="a")]
+        await jobs.settle()
+        rejected = jobs.submit("a1", client="a")
+        other = jobs.submit("b0", client="b")
+        await jobs.settle()
+        results = await jobs.finish(*tasks, rejected, other)
+        return results
+
+    results = run(main())
+    assert isinstance(results[2], AdmissionError)
+    assert results[3] == "b0"
+
+
+def test_higher_priority_arrival_evicts_lowest_priority_waiter():
+    async def main():
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=2, client_queue=10))
+        tasks = [jobs.submit("running")]
+        await jobs.settle()
+        full = [jobs.submit("full0", client="a"), jobs.submit("full1", client="a")]
+        await jobs.settle()
+        delta = jobs.submit("delta", "delta")
+        await jobs.settle()
+        # 队列中只有高优先级任务时, 低优先级的新任务仍被拒绝
+        late = jobs.submit("full2", client="b")
+        await jobs.settle()
+        results = await jobs.finish(*tasks, *full, delta, late)
+        return results, jobs.started, jobs.controller.queued
+
+    results, started, queued = run(main())
+    assert results[1] == "full0"
+    assert isinstance(results[2], AdmissionError)  # 最新排队的 full1 被挤出
+    assert results[3] == "delta"
+    assert isinstance(results[4], AdmissionError)
+    assert started == ["running", "delta", "full0"]
+    assert queued == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=1, client_queue=10))
+        running = jobs.submit("running")
+        await jobs.settle()
+        cancelled = jobs.submit("cancelled")
+        await jobs.settle()
+        cancelled.cancel()
+        await jobs.settle()
+        assert jobs.controller.queued == 0
+        # 取消后腾出的位置可以再次排队
+        waiting = jobs.submit("waiting")
+        await jobs.settle()
+        results = await jobs.finish(running, cancelled, waiting)
+        return results, jobs.started, jobs.controller.active
+
+    results, started, active = run(main())
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert started == ["running", "waiting"]
+    assert active == 0
+
+
+def test_budget_exhausted_while_queued():
+    async def main():
+        jobs = Jobs(AdmissionController(max_active=1, max_queue=10, client_queue=10))
+        running = jobs.submit("running")
+        await jobs.settle()
+        with pytest.raises(AdmissionError):
+            await jobs.submit("late", budget=0.01)
+        assert jobs.controller.queued == 0
+        await jobs.finish(running)
+
+    run(main())
@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.service import web_search
+from app.service.web_search import WebSearch
+
+
+def test_failed_pages_are_replaced_like_full_search(web):
+    web.results = 6
+    web.pages["http://site1.com/"] = "<html><head></head></html>"  # 没有正文, 解析为 "not found"
+    web.pages["http://site2.com/"] = TimeoutError("Timeout 15000ms exceeded")
+
+    search = WebSearch()
+    batch = asyncio.run(search.abatch_search(["query"], num=3))
+    full = asyncio.run(search.afull_search("query", 3))
+
+    results = batch.queries[0].results
+    assert [result.metadata["rank"] for result in results] == [0, 3, 4]
+    assert [result.metadata["rank"] for result in full] == [0, 3, 4]
+    assert [result.content for result in results] == [doc.content for doc in full]
+
+
+def test_pages_shared_by_queries_and_urls_are_fetched_once(web):
+    batch = asyncio.run(
+        WebSearch().abatch_search(["query", "other"], ["http://site0.com/"], num=3)
+    )
+    assert [len(result.results) for result in batch.queries] == [3, 3]
+    assert batch.urls[0].metadata["source"] == "http://site0.com/"
+    assert sorted(web.fetched) == ["http://site0.com/", "http://site1.com/", "http://site2.com/"]
+    assert batch.pages == 3
+
+
+def test_each_query_and_url_takes_an_admission_slot(web, monkeypatch):
+    admitted = []
+    admit = web_search.admission.admit
+
+    @asynccontextmanager
+    async def record(priority, client=""):
+        async with admit(priority, client):
+            admitted.append(priority)
+            yield
+
+    monkeypatch.setattr(web_search.admission, "admit", record)
+    asyncio.run(WebSearch().abatch_search(["a", "b", "c"], ["http://x.com/"], num=2))
+    assert sorted(admitted) == ["full", "full", "full", "url"]
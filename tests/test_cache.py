@@ -0,0 +1,99 @@
+import asyncio
+
+from app.utils.cache import TTLCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  Hello　 World ") == "hello world"
+
+
+def test_get_or_load_coalesces_concurrent_misses():
+    cache: TTLCache[str] = TTLCache(ttl=60, max_bytes=100)
+    calls = 0
+
+    async def loader() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert calls == 1
+    assert cache.get("key") == "value"
+
+
+def test_cancelled_waiter_does_not_cancel_load():
+    cache: TTLCache[str] = TTLCache(ttl=60, max_bytes=100)
+
+    async def loader() -> str:
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_load("key", loader))
+        second = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "value"
+    assert cache.get("key") == "value"
+
+
+def test_uncacheable_values_are_not_stored():
+    cache: TTLCache[list] = TTLCache(ttl=60, max_bytes=100)
+
+    async def loader() -> list:
+        return []
+
+    assert asyncio.run(cache.get_or_load("key", loader)) == []
+    assert cache.get("key") is None
+
+
+def test_expiry_and_size_eviction(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+    cache: TTLCache[str] = TTLCache(ttl=10, max_bytes=10, sizeof=len)
+
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    cache.get("a")  # a 成为最近使用
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.size == 8
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_load_is_cancelled_when_the_last_waiter_leaves():
+    cache: TTLCache[str] = TTLCache(ttl=60, max_bytes=100)
+    cancelled = asyncio.Event()
+
+    async def loader() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "value"
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_load("key", loader))
+        second = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled.is_set()
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        assert not cache._inflight and not cache._waiters
+
+    asyncio.run(main())
+    assert cache.get("key") is None
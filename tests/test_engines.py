@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from app.chrome_driver.engines import get_engine, parse_serp
+
+SERP_FIXTURES = Path(__file__).parent.parent / "benchmarks" / "fixtures" / "serp"
+
+BAIDU = (
+    '<div id="content_left"><div tpl="se_com_default"><h3><a href="http://a/">标题</a></h3>'
+    "<div><span>摘要</span></div></div></div>"
+)
+BING = (
+    '<ol id="b_results"><li class="b_algo"><h2><a href="http://a/">Title</a></h2>'
+    '<div class="b_caption"><p>Summary</p></div></li></ol>'
+)
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>'
+
+
+@pytest.mark.parametrize("engine, body", [("baidu", BAIDU), ("bing", BING)])
+def test_parse_with_xml_declaration(engine, body):
+    html = f"{XML_DECLARATION}<html><body>{body}</body></html>"
+    results = parse_serp(html, engine)
+    assert [metadata["source"] for _, metadata in results] == ["http://a/"]
+
+
+@pytest.mark.parametrize("engine", ["baidu", "bing"])
+def test_unparsable_page_has_no_results(engine):
+    assert parse_serp("", engine) == []
+
+
+BAIDU_NEXT = (SERP_FIXTURES / "baidu_python_p1.html").read_text(encoding="utf-8")
+BING_NEXT = (
+    '<li class="b_pag"><a class="sb_pagN sb_pagN_bp b_widePag sb_bp " title="下一页" '
+    'href="/search?q=python&amp;first=11">下一页</a></li>'
+)
+
+
+@pytest.mark.parametrize("engine, page", [("baidu", BAIDU_NEXT), ("bing", BING_NEXT)])
+def test_next_page_link(engine, page):
+    assert get_engine(engine).has_next_page(page)
+    assert not get_engine(engine).has_next_page(f"<html><body>{BAIDU}{BING}</body></html>")
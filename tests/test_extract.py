@@ -0,0 +1,63 @@
+"""
+The single-pass extractor against the legacy pipeline (cleanup_html ->
+readability -> html2text) on the pages under ``benchmarks/fixtures/articles``.
+
+The fixtures are hand-written pages modelled on common layouts (news,
+encyclopedia, blog, government notice, portal, ASP.NET form page), not
+captured from the sites they imitate.
+"""
+
+import difflib
+import re
+from pathlib import Path
+
+import pytest
+
+from app.chrome_driver.chromium import legacy_html_to_markdown
+from app.utils.extract import extract_content
+
+FIXTURES = Path(__file__).parent.parent / "benchmarks" / "fixtures" / "articles"
+PAGES = sorted(FIXTURES.glob("*.html"), key=lambda path: path.name)
+
+_URL = re.compile(r"\]\([^)]*\)")
+_MARKUP = re.compile(r"[#*_`>|\[\]!\\-]")
+_SPACE = re.compile(r"\s+")
+_BODY = re.compile(r"(<body[^>]*>)(.*)(</body>)", re.S | re.I)
+
+
+def normalize(markdown: str) -> str:
+    # 只比较文字, 忽略 markdown 语法、链接地址和空白
+    markdown = _URL.sub("]", markdown)
+    markdown = _MARKUP.sub("", markdown)
+    return _SPACE.sub("", markdown)
+
+
+def similarity(html_content: str, url: str) -> float:
+    legacy = normalize(legacy_html_to_markdown(html_content, url))
+    current = normalize(extract_content(html_content, url).markdown)
+    assert current, "nothing extracted"
+    return difflib.SequenceMatcher(None, legacy, current, autojunk=False).ratio()
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda path: path.name)
+def test_matches_legacy_pipeline(path):
+    html_content = path.read_text(encoding="utf-8")
+    assert similarity(html_content, f"https://fixtures.local/{path.name}") >= 0.9
+
+
+@pytest.mark.parametrize("path", PAGES, ids=lambda path: path.name)
+def test_body_wrapped_in_a_form(path):
+    html_content = _BODY.sub(
+        r'\1<form id="form1" method="post"><input type="hidden" name="__VIEWSTATE">\2</form>\3',
+        path.read_text(encoding="utf-8"),
+    )
+    assert similarity(html_content, f"https://fixtures.local/{path.name}") >= 0.9
+
+
+def test_form_controls_are_dropped_from_the_content():
+    html_content = (FIXTURES / "aspnet_form_zh.html").read_text(encoding="utf-8")
+    markdown = extract_content(html_content).markdown
+    assert "一、培训对象" in markdown
+    assert "咨询电话" in markdown
+    assert "__VIEWSTATE" not in markdown
+    assert "打印本页" not in markdown
@@ -0,0 +1,48 @@
+import asyncio
+
+from app.config.config import settings
+from app.service.web_search import WebSearch
+
+
+def test_timed_out_page_is_replaced_by_the_next_rank(web, monkeypatch):
+    web.results = 4
+    web.pages["http://site1.com/"] = TimeoutError("Timeout 15000ms exceeded")
+    monkeypatch.setattr(settings, "FULL_SEARCH_SLACK", 0)
+
+    results = asyncio.run(WebSearch().afull_search("query", 2))
+
+    assert [result.metadata["rank"] for result in results] == [0, 2]
+    assert all(not result.content.startswith("Error") for result in results)
+    # 第 1 名失败后只补抓第 2 名, 不会多抓
+    assert "http://site3.com/" not in web.fetched
+
+
+EMPTY = "<html><body><div><span> </span></div></body></html>"
+
+
+def test_empty_page_is_replaced_by_the_next_rank(web, monkeypatch):
+    web.results = 4
+    web.pages["http://site0.com/"] = EMPTY
+    monkeypatch.setattr(settings, "FULL_SEARCH_SLACK", 0)
+
+    results = asyncio.run(WebSearch().afull_search("query", 2))
+
+    assert [result.metadata["rank"] for result in results] == [1, 2]
+    assert all(result.content for result in results)
+
+
+def test_stream_skips_empty_pages(web, monkeypatch):
+    web.results = 4
+    web.pages["http://site0.com/"] = EMPTY
+    monkeypatch.setattr(settings, "FULL_SEARCH_SLACK", 0)
+
+    async def main():
+        return [event async for event in WebSearch().astream_full_search("query", 2)]
+
+    events = asyncio.run(main())
+    data = [event["data"] for event in events if event["event"] == "data"]
+    assert len(data) == 2
+    assert all(item.content for item in data)
+    summary = events[-1]["data"]
+    assert summary["count"] == 2
+    assert summary["failed"] == 1
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from app.chrome_driver import chromium
+from app.chrome_driver.chromium import ChromiumLoader
+from app.config.config import settings
+from app.service import web_search
+from app.service.web_search import WebSearch
+from app.utils.page_cache import PageCache, content_hash
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"))
+    monkeypatch.setattr(chromium, "page_cache", cache)
+    monkeypatch.setattr(web_search, "page_cache", cache)
+    return cache
+
+
+def test_put_get_and_validators(cache):
+    cache.put("http://a/", "content", "hash", etag='"v1"', last_modified="yesterday")
+    page = cache.get("http://a/")
+    assert page.content == "content"
+    assert page.content_hash == "hash"
+    assert page.fresh
+    assert page.validators() == {"If-None-Match": '"v1"', "If-Modified-Since": "yesterday"}
+    assert cache.get("http://b/") is None
+
+
+def test_stale_entry_is_revalidated_by_touch(cache, monkeypatch):
+    cache.put("http://a/", "content", "hash")
+    monkeypatch.setattr(settings, "PAGE_CACHE_FRESH_TTL", 0)
+    assert not cache.get("http://a/").fresh
+    monkeypatch.setattr(settings, "PAGE_CACHE_FRESH_TTL", 3600)
+    cache.touch("http://a/")
+    assert cache.get("http://a/").fresh
+
+
+def test_evicts_least_recently_accessed(tmp_path):
+    cache = PageCache(str(tmp_path / "pages.sqlite3"), max_bytes=25)
+    cache.put("http://a/", "a" * 10, "ha")
+    cache.put("http://b/", "b" * 10, "hb")
+    cache.get("http://a/")
+    cache.put("http://c/", "c" * 10, "hc")
+    assert cache.get("http://b/") is None
+    assert cache.get("http://a/") is not None
+    assert cache.get("http://c/") is not None
+
+
+def test_failed_browser_fetch_is_not_cached(cache, web):
+    web.pages["http://a/"] = TimeoutError("Timeout 15000ms exceeded")
+    loader = ChromiumLoader(urls=[])
+
+    document = asyncio.run(loader.afetch_url("http://a/"))
+    assert document.page_content == ""
+    assert "Timeout" in document.metadata["error"]
+
+    assert asyncio.run(WebSearch()._aload_page(loader, "http://a/")) is None
+    assert cache.get("http://a/") is None
+
+
+def test_browser_fetch_is_cached_and_revalidated(cache, web, monkeypatch):
+    loader = ChromiumLoader(urls=[])
+
+    page = asyncio.run(WebSearch()._aload_page(loader, "http://a/"))
+    assert "正文内容" in page.page_content
+    cached = cache.get("http://a/")
+    assert cached.content == page.page_content
+    assert cached.content_hash == content_hash(web.article)
+
+    # 缓存新鲜时不再抓取
+    monkeypatch.setattr(ChromiumLoader, "ascrape_url_playwright", None)
+    document = asyncio.run(loader.afetch_url("http://a/"))
+    assert document.metadata["tier"] == "cache"
+
+
+def test_empty_markdown_is_not_cached(cache, web):
+    web.pages["http://a/"] = "<html><body><div><span> </span></div></body></html>"
+    loader = ChromiumLoader(urls=[])
+
+    page = asyncio.run(WebSearch()._aload_page(loader, "http://a/"))
+    assert page.page_content == ""
+    assert cache.get("http://a/") is None
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+
+np = pytest.importorskip("numpy")
+
+from app.utils.passages import HashingEmbedder, PassageRetriever, chunk_text  # noqa: E402
+
+
+def test_chunks_respect_size_and_keep_all_text():
+    paragraphs = ["短段落一。", "短段落二。", "这是一个比较长的句子，" * 8 + "结束。" + "第二个句子。" * 5]
+    text = "\n\n".join(paragraphs)
+    chunks = chunk_text(text, 60)
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert "".join("".join(chunks).split()) == "".join(text.split())
+    # 短段落合并为一个块
+    assert chunks[0] == "短段落一。\n短段落二。"
+
+
+def test_long_paragraph_is_split_at_sentence_ends():
+    sentences = ["第一句话说明背景情况。", "第二句话给出主要结论！", "Third sentence here. ", "最后一句？"]
+    chunks = chunk_text("".join(sentences), 14)
+    assert chunks[:2] == ["第一句话说明背景情况。", "第二句话给出主要结论！"]
+    assert all(len(chunk) <= 14 for chunk in chunks)
+
+
+def test_overlong_sentence_is_hard_split():
+    chunks = chunk_text("字" * 25, 10)
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+
+def test_hashing_embedder_shapes_and_normalization():
+    embedder = HashingEmbedder(64)
+    vectors = embedder.encode(["高铁 开通", "python asyncio event loop", ""])
+    assert vectors.shape == (3, 64)
+    assert vectors.dtype == np.float32
+    assert not vectors[2].any()
+    np.testing.assert_array_equal(vectors, embedder.encode(["高铁 开通", "python asyncio event loop", ""]))
+
+    query = embedder.encode(["高铁"])
+    weighted, weighted_query = embedder.weigh(vectors, query)
+    assert weighted.shape == (3, 64)
+    assert weighted_query.shape == (1, 64)
+    np.testing.assert_allclose(np.linalg.norm(weighted[:2], axis=1), 1, rtol=1e-5)
+    np.testing.assert_allclose(np.linalg.norm(weighted_query, axis=1), 1, rtol=1e-5)
+    assert not weighted[2].any()
+
+
+PAGES = [
+    Document(
+        page_content="今天天气晴朗，适合出门散步。\n\n公园里有很多人在锻炼身体。",
+        metadata={"source": "http://a.com/"},
+    ),
+    Document(
+        page_content="福厦高铁跨海大桥进入联调联试阶段。\n\n高铁开通后两地通行时间大幅缩短。",
+        metadata={"source": "http://b.com/"},
+    ),
+    Document(
+        page_content="Python 的 asyncio 提供事件循环。\n\n协程通过 await 让出控制权。",
+        metadata={"source": "http://c.com/"},
+    ),
+]
+
+
+def test_retrieve_ranks_the_matching_passage_first(monkeypatch):
+    pytest.importorskip("faiss")
+    # 网页切分为多个段落
+    monkeypatch.setattr("app.config.config.settings.PASSAGE_CHUNK_SIZE", 20)
+    retriever = PassageRetriever()
+    passages = asyncio.run(retriever.aretrieve("高铁跨海大桥", PAGES, top_k=2))
+
+    assert len(passages) == 2
+    assert passages[0].metadata["source"] == "http://b.com/"
+    assert passages[0].metadata["passage"] == 0
+    assert passages[0].metadata["score"] >= passages[1].metadata["score"]
+
+    # top_k 超出段落数时全部返回
+    total = sum(len(chunk_text(page.page_content, 20)) for page in PAGES)
+    assert len(asyncio.run(retriever.aretrieve("高铁", PAGES, top_k=100))) == total
+
+
+def test_retrieve_reuses_cached_page_vectors(monkeypatch):
+    pytest.importorskip("faiss")
+    retriever = PassageRetriever()
+    embedded = []
+    embed_pages = retriever._embed_pages
+
+    def record(pages):
+        embedded.extend(page.metadata["source"] for page in pages)
+        return embed_pages(pages)
+
+    monkeypatch.setattr(retriever, "_embed_pages", record)
+    asyncio.run(retriever.aretrieve("高铁", PAGES[:2], top_k=1))
+    asyncio.run(retriever.aretrieve("高铁", PAGES, top_k=1))
+    assert embedded == ["http://a.com/", "http://b.com/", "http://c.com/"]
@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.chrome_driver.browser_pool import BrowserPool
+from app.utils.proxy_pool import ProxyPool, ProxyStats, is_proxy_error
+
+SERVER = "http://127.0.0.1:8899"
+
+
+def healthy_stats(server: str = SERVER) -> ProxyStats:
+    stats = ProxyStats(server)
+    for _ in range(5):
+        stats.record(True, 0.1)
+    return stats
+
+
+def test_single_failure_keeps_a_good_proxy_healthy():
+    stats = healthy_stats()
+    stats.record(False)
+    assert stats.healthy
+
+
+def test_consecutive_failures_bench_the_proxy():
+    stats = healthy_stats()
+    for _ in range(3):
+        stats.record(False)
+    assert not stats.healthy
+    stats.record(True)
+    assert stats.healthy
+
+
+def test_new_and_unreliable_proxies_are_unhealthy():
+    assert not ProxyStats(SERVER).healthy
+    stats = ProxyStats(SERVER)
+    stats.record(True)
+    for _ in range(4):
+        stats.record(False)
+        stats.record(False)
+        stats.record(True)
+    assert stats.success_rate < 0.5
+    assert not stats.healthy
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ("net::ERR_PROXY_CONNECTION_FAILED at http://a/", True),
+        ("net::ERR_TUNNEL_CONNECTION_FAILED at https://a/", True),
+        ("net::ERR_SOCKS_CONNECTION_FAILED at https://a/", True),
+        ("net::ERR_CONNECTION_REFUSED at http://a/", True),
+        ("Timeout 15000ms exceeded.", False),
+        ("waiting for selector \"#content_left\" failed", False),
+        ("net::ERR_NAME_NOT_RESOLVED at http://a/", False),
+    ],
+)
+def test_is_proxy_error(message, expected):
+    assert is_proxy_error(RuntimeError(message)) is expected
+
+
+class FakeContext:
+    async def new_page(self):
+        return SimpleNamespace()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr("undetected_playwright.Malenia.apply_stealth", staticmethod(_noop))
+    proxies = ProxyPool(servers=[SERVER], enabled=True)
+    proxies._proxies[SERVER] = healthy_stats()
+    policy = SimpleNamespace(install=_noop)
+    pool = BrowserPool(size=1, policy=policy, proxies=proxies)
+    pool._playwright = object()
+
+    async def new_context(**kwargs):
+        assert kwargs["proxy"]["server"] == SERVER
+        return FakeContext()
+
+    slot = SimpleNamespace(browser=SimpleNamespace(new_context=new_context))
+
+    async def acquire():
+        return slot
+
+    async def release(slot):
+        pass
+
+    monkeypatch.setattr(pool, "_acquire", acquire)
+    monkeypatch.setattr(pool, "_release", release)
+    return pool
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+def lease(pool: BrowserPool, error: Exception = None):
+    async def main():
+        pool._semaphore = asyncio.Semaphore(1)
+        try:
+            async with pool.page():
+                if error is not None:
+                    raise error
+        except type(error) if error is not None else ():
+            pass
+
+    asyncio.run(main())
+
+
+def test_clean_lease_reports_success(pool):
+    stats = pool.proxy_pool._proxies[SERVER]
+    lease(pool)
+    assert stats.successes == 6
+
+
+def test_target_site_errors_do_not_count_against_the_proxy(pool):
+    stats = pool.proxy_pool._proxies[SERVER]
+    for _ in range(5):
+        lease(pool, TimeoutError("Timeout 15000ms exceeded."))
+    assert stats.failures == 0
+    assert stats.healthy
+
+
+def test_proxy_errors_count_against_the_proxy(pool):
+    stats = pool.proxy_pool._proxies[SERVER]
+    lease(pool, RuntimeError("net::ERR_PROXY_CONNECTION_FAILED at http://a/"))
+    assert stats.failures == 1
+    assert stats.healthy
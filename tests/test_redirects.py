@@ -0,0 +1,18 @@
+from app.chrome_driver.redirects import RedirectResolver
+
+
+def test_default_patterns():
+    resolver = RedirectResolver()
+    assert resolver.is_stub("https://www.baidu.com/link?url=abc")
+    assert resolver.is_stub("https://cn.bing.com/ck/a?u=a1aHR0cHM6Ly9hLmNvbS8")
+    assert not resolver.is_stub("https://www.baidu.com/s?wd=python")
+    assert not resolver.is_stub("http://127.0.0.1:8900/link?url=abc")
+
+
+def test_link_stubs_on_the_configured_baidu_host(monkeypatch):
+    monkeypatch.setattr("app.config.config.settings.BAIDU_URL", "http://127.0.0.1:8900/")
+    resolver = RedirectResolver()
+    assert resolver.is_stub("http://127.0.0.1:8900/link?url=abc")
+    assert resolver.is_stub("https://www.baidu.com/link?url=abc")
+    assert not resolver.is_stub("http://127.0.0.1:8900/article/1")
+    assert not resolver.is_stub("http://127.0.0.1:8901/link?url=abc")
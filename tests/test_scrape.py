@@ -0,0 +1,41 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from app.chrome_driver import chromium
+from app.chrome_driver.chromium import ChromiumLoader
+from app.utils.metrics import TIMEOUTS
+
+
+@pytest.fixture
+def goto_error(monkeypatch):
+    error = {}
+
+    async def goto(url, **kwargs):
+        raise error["value"]
+
+    @asynccontextmanager
+    async def page():
+        yield SimpleNamespace(goto=goto)
+
+    monkeypatch.setattr(chromium.browser_pool, "page", page)
+    return error
+
+
+@pytest.mark.parametrize(
+    "error, counted",
+    [
+        (PlaywrightTimeoutError("Timeout 15000ms exceeded."), 1),
+        (asyncio.TimeoutError(), 0),
+        (RuntimeError("net::ERR_NAME_NOT_RESOLVED"), 0),
+    ],
+)
+def test_only_playwright_timeouts_count_as_goto_timeouts(goto_error, error, counted):
+    goto_error["value"] = error
+    before = TIMEOUTS.value(stage="goto")
+    with pytest.raises(type(error)):
+        asyncio.run(ChromiumLoader(urls=[]).ascrape_url_playwright("http://a/"))
+    assert TIMEOUTS.value(stage="goto") - before == counted
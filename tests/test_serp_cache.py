@@ -0,0 +1,150 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.chrome_driver import chromium
+from app.chrome_driver.chromium import ChromiumLoader
+from app.chrome_driver.engines import get_engine
+from app.service.web_search import WebSearch
+from app.utils.admission import admission
+
+ORIGINAL_SCRAPE_KEYWORD = ChromiumLoader.ascrape_keyword_playwright
+
+
+def test_exhausted_entry_serves_larger_num(web):
+    # 只有一页, 3 个结果
+    web_search = WebSearch()
+
+    async def main():
+        first = await web_search._asearch_keyword("query", num=5)
+        second = await web_search._asearch_keyword("query", num=8)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert len(first) == len(second) == 3
+    assert len(web.searched) == 1
+
+
+def test_first_page_entry_is_refreshed_for_deeper_search(web):
+    web.results = 15
+    web_search = WebSearch()
+
+    async def main():
+        first = await web_search._asearch_keyword("query")
+        second = await web_search._asearch_keyword("query", num=20)
+        third = await web_search._asearch_keyword("query", num=20)
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    # 第一页还有下一页, 不能说明结果已到底, 需要重新搜索一次; 翻到最后一页后不再搜索
+    assert [len(first), len(second), len(third)] == [10, 15, 15]
+    assert len(web.searched) == 2
+
+
+def test_no_cache_bypasses_entry(web):
+    web_search = WebSearch()
+
+    async def main():
+        await web_search._asearch_keyword("query", num=2)
+        await web_search._asearch_keyword("query", num=2)
+        await web_search._asearch_keyword("query", num=2, no_cache=True)
+
+    asyncio.run(main())
+    assert len(web.searched) == 2
+
+
+def test_cancelled_request_cancels_the_scrape(monkeypatch):
+    scraping = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def scrape(self, keyword, missing=lambda: 0):
+        scraping.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        yield ""
+
+    monkeypatch.setattr(ChromiumLoader, "ascrape_keyword_playwright", scrape)
+    web_search = WebSearch()
+
+    async def main():
+        request = asyncio.ensure_future(web_search.adelta_search("query", 3))
+        await asyncio.wait_for(scraping.wait(), 1)
+        assert admission.active == 1
+        request.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert admission.active == 0
+        assert not web_search.serp_cache._inflight
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def serp_pages(web, monkeypatch):
+    """Baidu pages served to the real scraper, by offset; an exception fails that page."""
+    pages = {}
+
+    @asynccontextmanager
+    async def page():
+        yield SimpleNamespace(context=SimpleNamespace(new_page=new_tab))
+
+    async def new_tab():
+        return SimpleNamespace(close=_noop)
+
+    async def scrape_page(tab, keyword, offset):
+        page = pages[offset]
+        if isinstance(page, BaseException):
+            raise page
+        return page
+
+    async def scrape(tab, keyword):
+        web.searched.append(keyword)
+        return await scrape_page(tab, keyword, 0)
+
+    engine = get_engine("baidu")
+    monkeypatch.setattr(engine, "scrape", scrape)
+    monkeypatch.setattr(engine, "scrape_page", scrape_page)
+    monkeypatch.setattr(ChromiumLoader, "ascrape_keyword_playwright", ORIGINAL_SCRAPE_KEYWORD)
+    monkeypatch.setattr(chromium.browser_pool, "page", page)
+    return pages
+
+
+async def _noop():
+    pass
+
+
+def test_failed_page_is_not_cached_as_exhausted(web, serp_pages):
+    serp_pages[0] = web.serp_page(range(0, 10), next_page=True)
+    serp_pages[10] = TimeoutError("Timeout 15000ms exceeded")
+    serp_pages[20] = web.serp_page(range(20, 30), next_page=True)
+    web_search = WebSearch()
+
+    async def main():
+        first = await web_search._asearch_keyword("query", num=25)
+        second = await web_search._asearch_keyword("query", num=25)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert len(first) == len(second) == 20
+    # 第 2 页失败, 结果不算到底, 下次仍然重新搜索
+    assert len(web.searched) == 2
+
+
+def test_last_page_without_next_link_is_exhausted(web, serp_pages):
+    serp_pages[0] = web.serp_page(range(0, 10), next_page=True)
+    serp_pages[10] = web.serp_page(range(10, 14))
+    serp_pages[20] = web.serp_page([])  # 超出结果数的偏移返回空页
+    web_search = WebSearch()
+
+    async def main():
+        first = await web_search._asearch_keyword("query", num=25)
+        second = await web_search._asearch_keyword("query", num=40)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert len(first) == len(second) == 14
+    assert len(web.searched) == 1
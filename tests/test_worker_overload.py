@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.chrome_driver.chromium import ChromiumLoader
+from app.exception.exce import AdmissionError
+from app.main import app
+from app.service.web_search import WebSearch
+
+OVERLOADED = AdmissionError("browser worker is overloaded", 3)
+
+
+@pytest.fixture
+def overloaded_serp(web, monkeypatch):
+    async def scrape(self, keyword, missing=lambda: 0):
+        raise OVERLOADED
+        yield
+
+    monkeypatch.setattr(ChromiumLoader, "ascrape_keyword_playwright", scrape)
+
+
+def test_serp_overload_propagates(overloaded_serp):
+    with pytest.raises(AdmissionError):
+        asyncio.run(WebSearch().adelta_search("query", 3))
+
+
+def test_page_overload_propagates(web):
+    web.pages["http://site0.com/"] = OVERLOADED
+    with pytest.raises(AdmissionError):
+        asyncio.run(WebSearch().afull_search("query", 3))
+
+
+def test_batch_overload_propagates(overloaded_serp):
+    with pytest.raises(AdmissionError):
+        asyncio.run(WebSearch().abatch_search(["query"], num=3))
+
+
+@pytest.mark.parametrize("path", ["web_delta_search", "web_full_search"])
+def test_endpoint_answers_429(overloaded_serp, path):
+    response = TestClient(app).get(f"/api/tali/{path}", params={"query": "query"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"